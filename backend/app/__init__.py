@@ -1,6 +1,6 @@
 from flask import Flask
 from flask_cors import CORS
-from app.config import CORS_ORIGINS, SECRET_KEY
+from app.config import CORS_ORIGINS, SECRET_KEY, PRELOAD_MODELS
 from app.routes import health_bp, voice_bp, banking_bp, risk_bp, auth_bp
 
 
@@ -19,6 +19,23 @@ def create_app():
     app.register_blueprint(risk_bp)
     app.register_blueprint(auth_bp)
     
+    # Warm up ML models in the background; /api/ready reports when done
+    if PRELOAD_MODELS:
+        from app.utils.ml_utils import start_warm_up
+        start_warm_up()
+    
+    # Pick up phrase dictionary edits without a restart
+    from app.utils.phrase_dictionary import start_phrase_watcher
+    start_phrase_watcher()
+    
+    # Pick up a rebuilt mule account list the same way
+    from app.utils.mule_accounts import start_mule_watcher
+    start_mule_watcher()
+    
+    # Load enrolled voiceprints here rather than in every pool worker
+    from app.utils.voiceprint import get_voiceprint_index
+    get_voiceprint_index()
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -20,6 +20,111 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:8080").split(",")
 # ML Models
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
 DEVICE = os.getenv("DEVICE", "cpu")
+# "int8" = dynamic int8 quantization of Linear layers (CPU only), "" = fp32
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "").lower()
+# Model cascade: decode with this smaller model first ("" = off) and
+# escalate to WHISPER_MODEL below this confidence
+WHISPER_CASCADE_MODEL = os.getenv("WHISPER_CASCADE_MODEL", "")
+WHISPER_CASCADE_THRESHOLD = float(os.getenv("WHISPER_CASCADE_THRESHOLD", 0.6))
+# Load and warm up models at startup; voice routes return 503 until done
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+# Failed warm-ups are retried with exponential backoff (capped at 60 s);
+# after this many attempts the process exits so it gets restarted (0 = retry forever)
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", 5))
+
+# Transcription worker pool (0 workers = transcribe inline in the request thread)
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", 2))
+TRANSCRIBE_QUEUE_SIZE = int(os.getenv("TRANSCRIBE_QUEUE_SIZE", 16))
+TRANSCRIBE_TIMEOUT = float(os.getenv("TRANSCRIBE_TIMEOUT", 30))
+
+# Voice activity detection before Whisper
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", 30))
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", -45))
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", 15))
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", 200))
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", 150))
+VAD_MAX_PAUSE_MS = int(os.getenv("VAD_MAX_PAUSE_MS", 500))
+
+# Transcription result cache (empty dir = memory tier only)
+TRANSCRIBE_CACHE_SIZE = int(os.getenv("TRANSCRIBE_CACHE_SIZE", 1024))
+TRANSCRIBE_CACHE_DIR = os.getenv("TRANSCRIBE_CACHE_DIR", "")
+TRANSCRIBE_CACHE_DISK_MB = int(os.getenv("TRANSCRIBE_CACHE_DISK_MB", 256))
+TRANSCRIBE_CACHE_TTL = int(os.getenv("TRANSCRIBE_CACHE_TTL", 86400))
+
+# Whisper micro-batching (batch size 1 = decode one clip per call).
+# With a worker pool, clips queued for the pool are grouped into one job
+# per free worker; with TRANSCRIBE_WORKERS=0 request threads batch in-process.
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", 1))
+WHISPER_BATCH_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", 10))
+
+# Challenge-aware liveness decoding from audio
+CHALLENGE_MIN_CONFIDENCE = float(os.getenv("CHALLENGE_MIN_CONFIDENCE", 0.5))
+CHALLENGE_MAX_TOKENS = int(os.getenv("CHALLENGE_MAX_TOKENS", 24))
+
+# Speaker voiceprints ("" = in-memory index only)
+VOICEPRINT_INDEX_PATH = os.getenv("VOICEPRINT_INDEX_PATH", "")
+VOICEPRINT_THRESHOLD = float(os.getenv("VOICEPRINT_THRESHOLD", 0.75))
+
+# Known-fraudster voice blacklist (memory-mapped .npy, "" = disabled)
+VOICE_BLACKLIST_PATH = os.getenv("VOICE_BLACKLIST_PATH", "")
+VOICE_BLACKLIST_THRESHOLD = float(os.getenv("VOICE_BLACKLIST_THRESHOLD", 0.8))
+# Clusters searched per query (0 = scan every row)
+VOICE_BLACKLIST_NPROBE = int(os.getenv("VOICE_BLACKLIST_NPROBE", 8))
+
+# Streaming transcription sessions
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", 10))
+STREAM_STEP_SECONDS = float(os.getenv("STREAM_STEP_SECONDS", 1.0))
+STREAM_SESSION_TTL = int(os.getenv("STREAM_SESSION_TTL", 300))
+STREAM_MAX_SESSIONS = int(os.getenv("STREAM_MAX_SESSIONS", 100))
+
+# Phrase dictionary (scam phrases, stress keywords, filler words); the
+# file is re-read in the background when it changes (0 = never)
+PHRASES_PATH = os.getenv("PHRASES_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "phrases.json"
+)
+PHRASES_RELOAD_INTERVAL = float(os.getenv("PHRASES_RELOAD_INTERVAL", 30))
+# Directory for the compiled phrase matchers ("" = compile on every start)
+PHRASES_CACHE_DIR = os.getenv("PHRASES_CACHE_DIR", "")
+
+# Fuzzy scam-phrase matching for ASR errors ("share o t p", "share 0TP")
+FUZZY_SCAM_MATCHING = os.getenv("FUZZY_SCAM_MATCHING", "true").lower() == "true"
+FUZZY_ERROR_RATE = float(os.getenv("FUZZY_ERROR_RATE", 0.15))
+FUZZY_MAX_ERRORS = int(os.getenv("FUZZY_MAX_ERRORS", 3))
+FUZZY_MAX_CANDIDATES = int(os.getenv("FUZZY_MAX_CANDIDATES", 16))
+
+# Bulk scam-check / risk-evaluate scoring (0 workers = score in the request thread)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 2))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 256))
+
+# Hashed n-gram scam classifier (memory-mapped .npy, "" = disabled)
+SCAM_CLASSIFIER_PATH = os.getenv("SCAM_CLASSIFIER_PATH", "")
+
+# Per-user transfer velocity: window lengths in seconds, transfers kept
+# per user, and how many users are tracked before the idlest are dropped
+VELOCITY_WINDOWS = tuple(int(w) for w in os.getenv("VELOCITY_WINDOWS", "60,600,3600,86400").split(","))
+VELOCITY_MAX_EVENTS = int(os.getenv("VELOCITY_MAX_EVENTS", 16))
+VELOCITY_MAX_USERS = int(os.getenv("VELOCITY_MAX_USERS", 1000000))
+
+# Long-term behavioural profiles (amounts, hours, recipients): how many
+# users are kept before the idlest are dropped
+PROFILE_MAX_USERS = int(os.getenv("PROFILE_MAX_USERS", 5000000))
+
+# Reported mule accounts, one per line ("" = disabled): Bloom filter
+# false-positive rate and how often the file is checked for changes
+MULE_ACCOUNTS_PATH = os.getenv("MULE_ACCOUNTS_PATH", "")
+MULE_BLOOM_FP_RATE = float(os.getenv("MULE_BLOOM_FP_RATE", 0.001))
+MULE_ACCOUNTS_RELOAD_INTERVAL = float(os.getenv("MULE_ACCOUNTS_RELOAD_INTERVAL", 60))
+
+# Replayed decisions for retried risk evaluations and transfer validations
+# (TTL 0 = disabled)
+DECISION_CACHE_SIZE = int(os.getenv("DECISION_CACHE_SIZE", 10000))
+DECISION_CACHE_TTL = float(os.getenv("DECISION_CACHE_TTL", 30))
+
+# Risk scoring rule table (weights, bands and level cut-offs)
+RISK_RULES_PATH = os.getenv("RISK_RULES_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "risk_rules.json"
+)
 
 # Validation
 if not SUPABASE_URL or not SUPABASE_KEY:
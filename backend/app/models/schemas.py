@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation."""
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from enum import Enum
 
 
@@ -40,6 +40,9 @@ class RiskEvaluationRequest(BaseModel):
     amount: Optional[float] = Field(default=0)
     is_liveness_passed: bool = Field(default=False)
     stress_level: Optional[StressLevel] = Field(default="low")
+    voice_blacklist_similarity: Optional[float] = Field(default=None, ge=-1, le=1)
+    user_id: Optional[str] = Field(default=None, description="Adds the user's transfer velocity and profile")
+    recipient_account: Optional[str] = Field(default=None, description="Checks for a first-time or mule recipient")
 
 
 # Response schemas
@@ -83,6 +86,11 @@ class RiskEvaluationResponse(BaseModel):
     factors: List[str]
     requires_additional_verification: bool
     recommendations: Optional[List[str]] = None
+    scam_probability: Optional[float] = None
+    velocity: Optional[Dict[str, Dict[str, float]]] = None
+    profile: Optional[Dict[str, Optional[float]]] = None
+    mule_account: Optional[Dict[str, Any]] = None
+    phrase_version: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
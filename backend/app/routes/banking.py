@@ -7,8 +7,10 @@ from app.utils.banking_utils import (
     get_transactions,
     execute_transfer,
     validate_transfer,
+    transfer_state,
 )
 from app.utils.security_utils import calculate_transaction_risk
+from app.utils.decision_cache import cached_decision
 
 banking_bp = Blueprint("banking", __name__, url_prefix="/api/banking")
 
@@ -58,13 +60,16 @@ def transfer():
             return jsonify({"error": "amount, recipient_account, and recipient_name required"}), 400
         
         # Validate transfer
-        validation = validate_transfer(amount, user_id)
+        validation = validate_transfer(amount, user_id, recipient_account)
         if not validation["valid"]:
-            return jsonify({
+            response = {
                 "success": False,
                 "error": validation["reason"],
                 "timestamp": datetime.now().isoformat(),
-            }), 400
+            }
+            if validation.get("blocked"):
+                response["blocked"] = True
+            return jsonify(response), 400
         
         # Execute transfer
         result = execute_transfer(user_id, amount, recipient_account, recipient_name)
@@ -81,12 +86,26 @@ def validate_transfer_endpoint():
         data = request.get_json()
         amount = data.get("amount")
         user_id = data.get("user_id", "user_123")
+        recipient_account = data.get("recipient_account")
         
         if not amount:
             return jsonify({"error": "amount required"}), 400
         
-        result = validate_transfer(amount, user_id)
-        return jsonify(result)
+        # Retries of the same validation replay the original decision,
+        # until the balance or the mule account list changes
+        result, hit = cached_decision(
+            "transfer_validate",
+            {
+                "amount": amount,
+                "user_id": user_id,
+                "recipient_account": recipient_account,
+                "state": transfer_state(user_id),
+            },
+            lambda: validate_transfer(amount, user_id, recipient_account),
+        )
+        response = jsonify(result)
+        response.headers["X-Decision-Cache"] = "hit" if hit else "miss"
+        return response
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
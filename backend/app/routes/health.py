@@ -2,6 +2,15 @@
 from flask import Blueprint
 from datetime import datetime
 from app.models import HealthResponse
+from app.utils.ml_utils import get_readiness, get_cascade_stats
+from app.utils.transcription_pool import get_pool_stats
+from app.utils.transcription_cache import get_cache_stats
+from app.utils.phrase_dictionary import get_phrase_status
+from app.utils.risk_engine import get_risk_rules
+from app.utils.velocity import get_velocity_stats
+from app.utils.user_profile import get_profile_stats
+from app.utils.mule_accounts import get_mule_status
+from app.utils.decision_cache import get_decision_cache_stats
 
 health_bp = Blueprint("health", __name__, url_prefix="/api")
 
@@ -19,8 +28,12 @@ def health_check():
 @health_bp.route("/status", methods=["GET"])
 def status():
     """Detailed status endpoint."""
+    readiness = get_readiness()
     return {
         "status": "running",
+        "live": True,
+        "ready": readiness["ready"],
+        "readiness": readiness,
         "service": "SentinelPay Backend",
         "version": "1.0.0",
         "timestamp": datetime.now().isoformat(),
@@ -31,4 +44,23 @@ def status():
             "transaction_execution",
             "banking_operations",
         ],
+        "transcription_pool": get_pool_stats(),
+        "transcription_cache": get_cache_stats(),
+        "model_cascade": get_cascade_stats(),
+        "phrase_dictionary": get_phrase_status(),
+        "risk_rules": {"version": get_risk_rules().version, "rules": get_risk_rules().rule_names},
+        "velocity": get_velocity_stats(),
+        "user_profiles": get_profile_stats(),
+        "mule_accounts": get_mule_status(),
+        "decision_cache": get_decision_cache_stats(),
     }
+
+
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe: 200 once ML models are warmed up, 503 before."""
+    readiness = get_readiness()
+    return {
+        **readiness,
+        "timestamp": datetime.now().isoformat(),
+    }, 200 if readiness["ready"] else 503
@@ -1,8 +1,13 @@
 """Risk evaluation endpoints."""
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime
 from app.models import RiskEvaluationRequest, RiskEvaluationResponse
-from app.utils.security_utils import calculate_transaction_risk, detect_scam_phrases
+from app.utils.security_utils import calculate_transaction_risk, detect_scam_phrases, risk_recommendations, risk_state
+from app.utils.phrase_dictionary import reload_phrases
+from app.utils.mule_accounts import reload_mule_accounts
+from app.utils.batch_scoring import score_batch
+from app.utils.decision_cache import cached_decision
 
 risk_bp = Blueprint("risk", __name__, url_prefix="/api/risk")
 
@@ -17,37 +22,38 @@ def evaluate_risk():
         amount = data.get("amount", 0)
         is_liveness_passed = data.get("is_liveness_passed", False)
         stress_level = data.get("stress_level", "low")
+        voice_blacklist_similarity = data.get("voice_blacklist_similarity")
+        user_id = data.get("user_id")
+        recipient_account = data.get("recipient_account")
         
         if not transcript:
             return jsonify({"error": "transcript required"}), 400
         
-        # Calculate risk
-        result = calculate_transaction_risk(
-            amount=amount,
-            transcript=transcript,
-            is_liveness_passed=is_liveness_passed,
-            stress_level=stress_level,
-        )
+        inputs = {
+            "amount": amount,
+            "transcript": transcript,
+            "is_liveness_passed": is_liveness_passed,
+            "stress_level": stress_level,
+            "voice_blacklist_similarity": voice_blacklist_similarity,
+            "user_id": user_id,
+            "recipient_account": recipient_account,
+        }
         
-        # Add recommendations
-        recommendations = []
-        if result["risk_level"] == "CRITICAL":
-            recommendations.append("Block transaction - extreme risk detected")
-            recommendations.append("Contact customer support immediately")
-        elif result["risk_level"] == "HIGH":
-            recommendations.append("Request additional verification (OTP/2FA)")
-            recommendations.append("Confirm transaction details with customer")
-        elif result["risk_level"] == "MEDIUM":
-            recommendations.append("Request verification code")
-        else:
-            recommendations.append("Proceed with transaction")
+        def decide():
+            result = calculate_transaction_risk(**inputs)
+            result["recommendations"] = risk_recommendations(result["risk_level"])
+            return {
+                **result,
+                "timestamp": datetime.now().isoformat(),
+            }
         
-        result["recommendations"] = recommendations
-        
-        return jsonify({
-            **result,
-            "timestamp": datetime.now().isoformat(),
-        })
+        # Retries of the same evaluation replay the original decision,
+        # until a transfer or reload changes what it would be based on
+        key_inputs = {**inputs, "state": risk_state(user_id)}
+        body, hit = cached_decision("risk_evaluate", key_inputs, decide)
+        response = jsonify(body)
+        response.headers["X-Decision-Cache"] = "hit" if hit else "miss"
+        return response
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -71,3 +77,85 @@ def scam_check():
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+def _batch_items(key: str):
+    """
+    Items of a batch request: an NDJSON body (one JSON value per line,
+    read lazily from the stream), a JSON array, or {key: [...]}.
+    
+    Raises:
+        ValueError: the body is neither
+    """
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        return (line for line in request.stream if line.strip())
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key, data.get("items"))
+    if not isinstance(data, list):
+        raise ValueError(f"JSON array, {{\"{key}\": [...]}} or NDJSON body required")
+    return data
+
+
+def _ndjson_response(results) -> Response:
+    """Stream one JSON result per line as each chunk finishes."""
+    lines = (json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+    return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+
+@risk_bp.route("/evaluate/batch", methods=["POST"])
+def evaluate_risk_batch():
+    """
+    Evaluate many transactions; each item is an /evaluate request body.
+    
+    Results stream back as NDJSON in input order, with an "index" field;
+    invalid items get an "error" instead of failing the batch.
+    """
+    try:
+        items = _batch_items("transactions")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _ndjson_response(score_batch("risk", items))
+
+
+@risk_bp.route("/scam-check/batch", methods=["POST"])
+def scam_check_batch():
+    """Check many texts (strings or {"text": ...}); streams NDJSON like /evaluate/batch."""
+    try:
+        items = _batch_items("texts")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _ndjson_response(score_batch("scam", items))
+
+
+@risk_bp.route("/phrases/reload", methods=["POST"])
+def phrases_reload():
+    """Re-read the phrase dictionary now instead of waiting for the watcher."""
+    try:
+        status = reload_phrases(force=True)
+        if status["last_error"]:
+            return jsonify(status), 400
+        return jsonify({
+            **status,
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@risk_bp.route("/mule-accounts/reload", methods=["POST"])
+def mule_accounts_reload():
+    """Rebuild and swap the mule account index now instead of waiting for the watcher."""
+    try:
+        status = reload_mule_accounts(force=True)
+        if status["last_error"]:
+            return jsonify(status), 400
+        return jsonify({
+            **status,
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,39 +1,214 @@
 """Voice processing endpoints."""
+import base64
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 from app.models import VoiceTranscribeRequest, VoiceLivenessRequest, LivenessResponse
-from app.utils.ml_utils import transcribe_audio, verify_speaker, detect_emotion, detect_scam_phrases
+from app.utils.ml_utils import (
+    verify_speaker,
+    detect_emotion,
+    detect_scam_phrases,
+    is_ready,
+)
 from app.utils.security_utils import validate_challenge
+from app.utils.transcription_pool import (
+    submit_transcription,
+    submit_challenge_verification,
+    TranscriptionUnavailable,
+    TranscriptionTimeout,
+)
+from app.utils.streaming import start_session, get_session, end_session
+from app.utils.audio_io import pcm16_to_float32, SAMPLE_RATE
+from app.utils.audio_context import AudioContext
+from app.utils.text_context import TextContext
+from app.utils.voiceprint import enroll_speaker, verify_voiceprint
+from app.utils.voice_blacklist import screen_embedded_caller
 
 voice_bp = Blueprint("voice", __name__, url_prefix="/api/voice")
 
 
+@voice_bp.before_request
+def require_ready():
+    """Refuse voice work until model warm-up has finished."""
+    if not is_ready():
+        response = jsonify({"error": "Voice models are warming up", "ready": False})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
+
+def _read_audio_upload():
+    """
+    Decode audio sent as a multipart "audio" field or as the request body
+    into the request's AudioContext.
+    
+    Raises:
+        ValueError: no audio in the request, or it cannot be decoded
+    """
+    sample_rate = request.args.get("sample_rate", SAMPLE_RATE, type=int)
+    
+    upload = request.files.get("audio")
+    if upload is not None:
+        payload, content_type = upload.read(), upload.mimetype
+    else:
+        payload, content_type = request.get_data(), request.mimetype
+    
+    if not payload:
+        raise ValueError("audio_file_path or audio upload required")
+    
+    return AudioContext.from_bytes(payload, content_type, sample_rate)
+
+
 @voice_bp.route("/transcribe", methods=["POST"])
 def transcribe():
-    """Transcribe audio file using Whisper."""
+    """
+    Transcribe audio using Whisper.
+    
+    Accepts either JSON {"audio_file_path": ...}, a multipart upload in the
+    "audio" field, or the audio itself as the request body (WAV/FLAC/OGG, or
+    raw 16-bit PCM as audio/L16 or application/octet-stream with an optional
+    ?sample_rate=). Uploaded audio is decoded in-process, no temp files.
+    """
     try:
-        data = request.get_json()
-        audio_file_path = data.get("audio_file_path")
-        user_id = data.get("user_id", "user_123")
+        if request.is_json:
+            data = request.get_json()
+            audio = data.get("audio_file_path")
+            user_id = data.get("user_id", "user_123")
+            challenge_phrase = data.get("challenge_phrase")
+            
+            if not audio:
+                return jsonify({"error": "audio_file_path required"}), 400
+            
+            # Decode once; every stage below shares the context
+            try:
+                audio = AudioContext.from_file(audio)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        else:
+            user_id = request.values.get("user_id", "user_123")
+            challenge_phrase = request.values.get("challenge_phrase")
+            
+            try:
+                audio = _read_audio_upload()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         
-        if not audio_file_path:
-            return jsonify({"error": "audio_file_path required"}), 400
-        
-        result = transcribe_audio(audio_file_path)
+        try:
+            result = submit_transcription(audio, challenge_phrase)
+        except TranscriptionUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        except TranscriptionTimeout as e:
+            return jsonify({"error": str(e)}), 504
         
         if "error" in result:
             return jsonify(result), 400
         
-        # Detect emotion from transcription
-        emotion_result = detect_emotion(result["text"])
+        # Normalize and scan the transcript once for every analyzer
+        text = TextContext(result["text"])
+        
+        # Detect emotion from the transcription and the worker's acoustic features
+        emotion_result = detect_emotion(text, acoustic=result.pop("acoustic_stress", None))
         
         # Detect scam phrases
-        scam_result = detect_scam_phrases(result["text"])
+        scam_result = detect_scam_phrases(text)
+        
+        # Screen the caller's voice, embedded by the worker, against known fraudsters
+        blacklist_result = screen_embedded_caller(result)
         
         return jsonify({
             **result,
             "emotion": emotion_result,
             "scam_detection": scam_result,
+            "voice_blacklist": blacklist_result,
+            "audio_context": audio.stats(),
+            "text_context": text.stats(),
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@voice_bp.route("/stream", methods=["POST"])
+def stream_start():
+    """Open a streaming transcription session."""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_id = data.get("user_id", "user_123")
+        
+        session = start_session(user_id)
+        if session is None:
+            return jsonify({"error": "Too many active streaming sessions"}), 503
+        
+        return jsonify({
+            "session_id": session.session_id,
+            "sample_rate": 16000,
+            "format": "pcm_s16le",
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@voice_bp.route("/stream/<session_id>/chunk", methods=["POST"])
+def stream_chunk(session_id):
+    """
+    Append an audio chunk and return the partial transcript.
+
+    Body is raw 16 kHz mono 16-bit PCM (application/octet-stream),
+    or JSON {"audio": "<base64 PCM>"}.
+    """
+    try:
+        session = get_session(session_id)
+        if session is None:
+            return jsonify({"error": "Unknown or expired session"}), 404
+        
+        if request.is_json:
+            audio = request.get_json().get("audio", "")
+            chunk = base64.b64decode(audio)
+        else:
+            chunk = request.get_data()
+        
+        if not chunk:
+            return jsonify({"error": "audio chunk required"}), 400
+        
+        try:
+            samples = pcm16_to_float32(chunk)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        try:
+            result = session.add_chunk(samples)
+        except TranscriptionUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        except TranscriptionTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        return jsonify({
+            **result,
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@voice_bp.route("/stream/<session_id>/finish", methods=["POST"])
+def stream_finish(session_id):
+    """Close a streaming session and return the final transcript."""
+    try:
+        session = get_session(session_id)
+        if session is None:
+            return jsonify({"error": "Unknown or expired session"}), 404
+        
+        # Keep the session open if the final decode is rejected, so it can be retried
+        try:
+            result = session.finish()
+        except TranscriptionUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        except TranscriptionTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        end_session(session_id)
+        return jsonify({
+            **result,
             "timestamp": datetime.now().isoformat(),
         })
     
@@ -43,28 +218,75 @@ def transcribe():
 
 @voice_bp.route("/liveness", methods=["POST"])
 def liveness_check():
-    """Verify voice liveness using challenge-response."""
+    """
+    Verify voice liveness using challenge-response.
+    
+    Either send the client-side transcript, or send the audio itself
+    (JSON "audio_file_path", multipart "audio" field or raw body) to have
+    the server decode it primed with the challenge phrase, stopping as soon
+    as the phrase is confirmed or ruled out.
+    """
     try:
-        data = request.get_json()
-        transcript = data.get("transcript", "").strip()
-        challenge_phrase = data.get("challenge_phrase", "").strip()
-        user_id = data.get("user_id", "user_123")
+        audio = None
+        if request.is_json:
+            data = request.get_json()
+            transcript = data.get("transcript", "").strip()
+            challenge_phrase = data.get("challenge_phrase", "").strip()
+            user_id = data.get("user_id", "user_123")
+            audio = data.get("audio_file_path")
+            if audio and not transcript:
+                try:
+                    audio = AudioContext.from_file(audio)
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+        else:
+            transcript = ""
+            challenge_phrase = request.values.get("challenge_phrase", "").strip()
+            user_id = request.values.get("user_id", "user_123")
+            try:
+                audio = _read_audio_upload()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         
-        if not transcript or not challenge_phrase:
-            return jsonify({"error": "transcript and challenge_phrase required"}), 400
+        if not challenge_phrase or (not transcript and audio is None):
+            return jsonify({"error": "transcript (or audio) and challenge_phrase required"}), 400
         
-        # Verify speaker using challenge response
-        liveness_result = verify_speaker(transcript, challenge_phrase)
+        acoustic = None
+        if transcript:
+            # Verify speaker using challenge response
+            text = TextContext(transcript)
+            liveness_result = verify_speaker(text, challenge_phrase)
+        else:
+            # Decode the audio server-side, primed with the challenge
+            try:
+                liveness_result = submit_challenge_verification(audio, challenge_phrase)
+            except TranscriptionUnavailable as e:
+                return jsonify({"error": str(e)}), 503
+            except TranscriptionTimeout as e:
+                return jsonify({"error": str(e)}), 504
+            
+            if "error" in liveness_result:
+                return jsonify(liveness_result), 400
+            text = TextContext(liveness_result["transcript"])
+            
+            # Screen the caller's voice, embedded by the worker, against known fraudsters
+            liveness_result["voice_blacklist"] = screen_embedded_caller(liveness_result)
+            acoustic = liveness_result.pop("acoustic_stress", None)
         
-        # Detect stress level
-        emotion = detect_emotion(transcript)
+        # Detect stress level (from the voice too when the worker decoded it)
+        if not isinstance(audio, AudioContext):
+            audio = None
+        emotion = detect_emotion(text, acoustic=acoustic)
         
         # Combine results
         response = {
             **liveness_result,
             "stress_level": emotion["stress_level"],
+            "text_context": text.stats(),
             "timestamp": datetime.now().isoformat(),
         }
+        if audio is not None:
+            response["audio_context"] = audio.stats()
         
         return jsonify(response)
     
@@ -72,6 +294,73 @@ def liveness_check():
         return jsonify({"error": str(e)}), 500
 
 
+def _voiceprint_request():
+    """Pull user_id and audio out of a JSON, multipart or raw-body request."""
+    if request.is_json:
+        data = request.get_json()
+        path = data.get("audio_file_path")
+        if not path:
+            raise ValueError("audio_file_path or audio upload required")
+        return data.get("user_id", "user_123"), AudioContext.from_file(path)
+    return request.values.get("user_id", "user_123"), _read_audio_upload()
+
+
+@voice_bp.route("/enroll", methods=["POST"])
+def enroll():
+    """Enrol a sample of the user's voice into their voiceprint."""
+    try:
+        try:
+            user_id, audio = _voiceprint_request()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        try:
+            result = enroll_speaker(user_id, audio)
+        except TranscriptionUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        except TranscriptionTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        if "error" in result:
+            return jsonify(result), 400
+        
+        return jsonify({
+            **result,
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@voice_bp.route("/verify", methods=["POST"])
+def verify():
+    """Verify the speaker against the user's enrolled voiceprint."""
+    try:
+        try:
+            user_id, audio = _voiceprint_request()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        try:
+            result = verify_voiceprint(user_id, audio)
+        except TranscriptionUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        except TranscriptionTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        if not result["enrolled"]:
+            return jsonify(result), 404
+        if "error" in result:
+            return jsonify(result), 400
+        
+        return jsonify({
+            **result,
+            "timestamp": datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @voice_bp.route("/emotion", methods=["POST"])
 def emotion():
     """Detect emotion and stress from text."""
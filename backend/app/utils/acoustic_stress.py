@@ -0,0 +1,103 @@
+"""Acoustic stress features from the decoded PCM buffer.
+
+Works on the same 16 kHz float32 samples that are handed to Whisper, so
+no second decode is needed. Pitch variability, loudness dynamics and
+speaking rate are computed frame-wise with librosa/NumPy and mapped onto a
+0-1 stress score.
+"""
+import time
+import numpy as np
+import librosa
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 1024
+HOP_LENGTH = 256
+
+# Frames quieter than this far below the loudest frame count as silence
+_ACTIVE_RANGE_DB = 35
+
+# (calm, stressed) reference points; features are scaled linearly between them
+PITCH_STD_SEMITONES = (2.0, 6.0)
+ENERGY_STD_DB = (4.0, 12.0)
+SPEAKING_RATE_WPS = (2.5, 4.5)
+
+
+def _scale(value: float, bounds: tuple) -> float:
+    low, high = bounds
+    return float(np.clip((value - low) / (high - low), 0.0, 1.0))
+
+
+def frame_rms(samples: np.ndarray) -> np.ndarray:
+    """Frame RMS at the stress features' frame and hop size."""
+    return librosa.feature.rms(y=samples, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0]
+
+
+def acoustic_stress(samples: np.ndarray, word_count: int = None, rms: np.ndarray = None) -> dict:
+    """
+    Estimate vocal stress from raw audio.
+
+    Args:
+        samples: 16 kHz mono float32 audio
+        word_count: Words in the transcript; if omitted the onset rate is
+            used as a syllable-rate proxy
+        rms: Precomputed frame_rms(samples), e.g. from an AudioContext
+
+    Returns:
+        {
+            "score": 0-1,
+            "pitch_std_semitones": float,
+            "energy_std_db": float,
+            "speaking_rate": float,
+            "speech_seconds": float,
+            "timings_ms": {"energy": ms, "pitch": ms, "rate": ms}
+        }
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    if rms is None:
+        rms = frame_rms(samples)
+    energy_db = 20 * np.log10(rms + 1e-10)
+    active = energy_db > energy_db.max() - _ACTIVE_RANGE_DB if energy_db.size else np.zeros(0, dtype=bool)
+    energy_std = float(np.std(energy_db[active])) if active.any() else 0.0
+    speech_seconds = float(active.sum() * HOP_LENGTH / SAMPLE_RATE)
+    timings["energy"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    pitch_std = 0.0
+    if len(samples) >= FRAME_LENGTH:
+        f0 = librosa.yin(
+            samples,
+            fmin=65,
+            fmax=400,
+            sr=SAMPLE_RATE,
+            frame_length=FRAME_LENGTH,
+            hop_length=HOP_LENGTH,
+        )
+        voiced = f0[active[: len(f0)]] if active.size else f0[:0]
+        if voiced.size >= 5:
+            semitones = 12 * np.log2(voiced / np.median(voiced))
+            pitch_std = float(np.std(semitones))
+    timings["pitch"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    if word_count is None:
+        onsets = librosa.onset.onset_detect(y=samples, sr=SAMPLE_RATE, hop_length=HOP_LENGTH)
+        word_count = len(onsets)
+    speaking_rate = word_count / speech_seconds if speech_seconds > 0 else 0.0
+    timings["rate"] = (time.perf_counter() - start) * 1000
+
+    score = np.mean([
+        _scale(pitch_std, PITCH_STD_SEMITONES),
+        _scale(energy_std, ENERGY_STD_DB),
+        _scale(speaking_rate, SPEAKING_RATE_WPS),
+    ])
+
+    return {
+        "score": round(float(score), 4),
+        "pitch_std_semitones": round(pitch_std, 3),
+        "energy_std_db": round(energy_std, 3),
+        "speaking_rate": round(speaking_rate, 3),
+        "speech_seconds": round(speech_seconds, 2),
+        "timings_ms": {stage: round(ms, 3) for stage, ms in timings.items()},
+    }
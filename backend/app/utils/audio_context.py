@@ -0,0 +1,120 @@
+"""Request-scoped audio context.
+
+A request's audio is decoded once into a 16 kHz mono float32 buffer and
+wrapped in an AudioContext that is handed to every stage (VAD, Whisper,
+challenge decoding, stress features, speaker embedding). Arrays derived
+from the buffer are computed on first use and memoized on the context, so
+e.g. the cascade's two models and the challenge decoder share one log-mel
+spectrogram and the blacklist screen and voiceprint check share one
+embedding.
+
+Contexts are plain objects and pickle cleanly, so they can be sent to the
+transcription workers; anything already derived travels with them, but
+what a worker derives stays in the worker.
+"""
+import time
+from typing import Union
+import numpy as np
+from app.config import VAD_ENABLED, VAD_FRAME_MS
+from app.utils.audio_io import SAMPLE_RATE, decode_audio_bytes, load_audio_file
+from app.utils.vad import frame_energies_db, trim_silence
+from app.utils.acoustic_stress import frame_rms
+
+
+def _nbytes(value) -> int:
+    """Bytes held by arrays (NumPy or torch) inside a derived value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if hasattr(value, "element_size") and hasattr(value, "nelement"):
+        return value.element_size() * value.nelement()
+    return 0
+
+
+class AudioContext:
+    """One decoded clip plus memoized arrays derived from it."""
+
+    def __init__(self, samples: np.ndarray, decode_ms: float = 0.0):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.decode_ms = decode_ms
+        self.reuse_hits = 0
+        self._derived = {}
+        self._derive_ms = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "AudioContext":
+        start = time.perf_counter()
+        samples = load_audio_file(path)
+        return cls(samples, (time.perf_counter() - start) * 1000)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, content_type: str = "", sample_rate: int = SAMPLE_RATE) -> "AudioContext":
+        start = time.perf_counter()
+        samples = decode_audio_bytes(data, content_type, sample_rate)
+        return cls(samples, (time.perf_counter() - start) * 1000)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
+
+    def derive(self, name: str, compute):
+        """Return the memoized value for name, computing it on first use."""
+        if name in self._derived:
+            self.reuse_hits += 1
+            return self._derived[name]
+        start = time.perf_counter()
+        value = compute()
+        self._derive_ms[name] = (time.perf_counter() - start) * 1000
+        self._derived[name] = value
+        return value
+
+    def frame_energies_db(self) -> np.ndarray:
+        """Per-frame energy in dB at the VAD frame size."""
+        frame_len = int(SAMPLE_RATE * VAD_FRAME_MS / 1000)
+        return self.derive("frame_energies_db", lambda: frame_energies_db(self.samples, frame_len))
+
+    def speech(self) -> tuple:
+        """trim_silence() result: (speech samples or None, VAD report)."""
+        return self.derive("speech", lambda: trim_silence(self.samples, self.frame_energies_db()))
+
+    def model_input(self) -> np.ndarray:
+        """The samples the models decode: speech only when VAD is on and found some."""
+        if VAD_ENABLED:
+            speech, _ = self.speech()
+            if speech is not None:
+                return speech
+        return self.samples
+
+    def log_mel(self, n_mels: int = 80):
+        """Whisper's padded 30 s log-mel spectrogram of model_input(), as a torch tensor."""
+        def compute():
+            import torch
+            import whisper
+            audio = whisper.pad_or_trim(torch.from_numpy(self.model_input()))
+            return whisper.log_mel_spectrogram(audio, n_mels=n_mels)
+        return self.derive(f"log_mel_{n_mels}", compute)
+
+    def rms(self) -> np.ndarray:
+        """Frame RMS used by the acoustic stress features."""
+        return self.derive("rms", lambda: frame_rms(self.samples))
+
+    def stats(self) -> dict:
+        """What was decoded and derived for this request, and what it cost."""
+        return {
+            "duration": round(self.duration, 2),
+            "decode_ms": round(self.decode_ms, 3),
+            "allocations": 1 + len(self._derived),
+            "allocated_bytes": self.samples.nbytes + sum(_nbytes(v) for v in self._derived.values()),
+            "reuse_hits": self.reuse_hits,
+            "derived_ms": {name: round(ms, 3) for name, ms in self._derive_ms.items()},
+        }
+
+
+def as_audio_context(audio: Union[str, np.ndarray, AudioContext]) -> AudioContext:
+    """Wrap a path or a decoded buffer; contexts are passed through unchanged."""
+    if isinstance(audio, AudioContext):
+        return audio
+    if isinstance(audio, str):
+        return AudioContext.from_file(audio)
+    return AudioContext(audio)
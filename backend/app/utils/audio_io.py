@@ -0,0 +1,87 @@
+"""In-process audio decoding to Whisper's input format.
+
+Uploaded audio is decoded straight into a 16 kHz mono float32 NumPy
+buffer, without temp files or an ffmpeg subprocess.
+"""
+import io
+from math import gcd
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+SAMPLE_RATE = 16000
+
+# Content types treated as headerless 16-bit little-endian PCM
+RAW_PCM_TYPES = {"audio/l16", "audio/pcm", "application/octet-stream"}
+
+# Container magic bytes; these win over a generic content type
+_CONTAINER_MAGIC = (b"RIFF", b"fLaC", b"OggS")
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1]."""
+    if len(data) % 2:
+        raise ValueError("PCM data must contain whole 16-bit samples")
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Resample mono float32 audio to 16 kHz."""
+    if sample_rate == SAMPLE_RATE:
+        return samples
+    factor = gcd(SAMPLE_RATE, sample_rate)
+    resampled = resample_poly(samples, SAMPLE_RATE // factor, sample_rate // factor)
+    return resampled.astype(np.float32, copy=False)
+
+
+def decode_audio_bytes(data: bytes, content_type: str = "", sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode uploaded audio into a 16 kHz mono float32 buffer.
+
+    Args:
+        data: Encoded file (WAV/FLAC/OGG) or raw 16-bit PCM
+        content_type: MIME type of the upload; raw PCM types skip the container parser
+        sample_rate: Sample rate of raw PCM input
+
+    Returns:
+        1-D float32 array at 16 kHz
+    """
+    if not data:
+        raise ValueError("Empty audio payload")
+
+    mime = content_type.split(";")[0].strip().lower()
+    if mime in RAW_PCM_TYPES and not data.startswith(_CONTAINER_MAGIC):
+        samples, rate = pcm16_to_float32(data), sample_rate
+    else:
+        try:
+            samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        except RuntimeError as e:
+            raise ValueError(f"Unsupported audio format: {e}")
+        samples = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+
+    return np.ascontiguousarray(resample(samples, rate), dtype=np.float32)
+
+
+def load_audio_file(path: str) -> np.ndarray:
+    """
+    Decode an audio file into a 16 kHz mono float32 buffer.
+
+    Formats libsndfile understands are decoded in-process; anything else
+    (mp3, m4a, ...) falls back to Whisper's ffmpeg loader.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise ValueError(f"Cannot read audio file: {e}")
+
+    try:
+        return decode_audio_bytes(data)
+    except ValueError:
+        pass
+
+    import whisper
+    try:
+        return whisper.load_audio(path)
+    except RuntimeError as e:
+        raise ValueError(f"Unsupported audio format: {e}")
@@ -2,6 +2,11 @@
 import random
 import string
 from datetime import datetime, timedelta
+from app.utils.velocity import record_transfer
+from app.utils.user_profile import record_profile
+from app.utils.mule_accounts import check_mule_account, get_mule_index
+
+MULE_ACCOUNT_REASON = "Recipient account has been reported for fraud"
 
 # Mock bank account database
 MOCK_ACCOUNTS = {
@@ -93,6 +98,9 @@ def execute_transfer(
     if account["balance"] < amount:
         return {"success": False, "error": f"Insufficient balance. Available: {account['balance']}"}
     
+    if check_mule_account(recipient_account)["listed"]:
+        return {"success": False, "blocked": True, "error": MULE_ACCOUNT_REASON}
+    
     # Deduct amount
     account["balance"] -= amount
     
@@ -115,6 +123,8 @@ def execute_transfer(
     if user_id not in MOCK_TRANSACTIONS:
         MOCK_TRANSACTIONS[user_id] = []
     MOCK_TRANSACTIONS[user_id].insert(0, transaction)
+    record_transfer(user_id, amount)
+    record_profile(user_id, amount, recipient_account)
     
     return {
         "success": True,
@@ -127,7 +137,7 @@ def execute_transfer(
     }
 
 
-def validate_transfer(amount: float, user_id: str = "user_123") -> dict:
+def validate_transfer(amount: float, user_id: str = "user_123", recipient_account: str = None) -> dict:
     """Validate transfer before execution."""
     if user_id not in MOCK_ACCOUNTS:
         return {"valid": False, "reason": "Account not found"}
@@ -140,7 +150,20 @@ def validate_transfer(amount: float, user_id: str = "user_123") -> dict:
     if amount > account["balance"]:
         return {"valid": False, "reason": f"Insufficient balance. Available: {account['balance']}"}
     
+    if check_mule_account(recipient_account)["listed"]:
+        return {"valid": False, "blocked": True, "reason": MULE_ACCOUNT_REASON}
+    
     if amount > 100000:
         return {"valid": True, "requires_verification": True, "reason": "High-value transfer requires additional verification"}
     
     return {"valid": True, "requires_verification": False}
+
+
+def transfer_state(user_id: str = "user_123") -> dict:
+    """State validate_transfer() reads besides its arguments; part of its decision cache key."""
+    account = MOCK_ACCOUNTS.get(user_id)
+    index = get_mule_index()
+    return {
+        "balance": account["balance"] if account is not None else None,
+        "mule_accounts": index.checksum if index is not None else None,
+    }
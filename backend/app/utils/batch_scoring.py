@@ -0,0 +1,269 @@
+"""Chunked bulk scoring for scam checks and risk evaluation.
+
+Compliance re-scores stored transcripts in bulk whenever rules change.
+Items are cut into chunks of BATCH_CHUNK_SIZE and scored on a pool of
+worker processes. Each worker loads the compiled phrase dictionary once,
+from its pickled cache, and keeps it for every chunk. Results come back in
+input order as soon as each chunk is done, so callers can stream them.
+Only a few chunks per worker are in flight at a time, so memory stays flat
+however long the input is.
+
+Items are plain JSON values. NDJSON lines are passed through as raw bytes
+and parsed in the worker, so a bad line only fails its own item. The scam
+classifier scores each chunk's transcripts in one vectorized pass before
+the per-item rules run.
+
+Risk items may carry user_id and recipient_account. The velocity and
+profile stores they are scored against live in this process, so with a
+pool a risk chunk makes two trips: a worker parses it and returns just
+each item's (user_id, amount, recipient_account), the parent looks those
+up in its stores, and a worker scores the chunk with the results. The
+parent never parses a line, and a worker never scores a user's item
+against its own, empty, stores; an item without its user's state is
+reported as an error.
+"""
+import json
+import atexit
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from app.config import BATCH_WORKERS, BATCH_CHUNK_SIZE
+from app.utils.security_utils import calculate_transaction_risk, detect_scam_phrases, risk_recommendations
+from app.utils.phrase_dictionary import get_phrase_dictionary, reload_phrases
+from app.utils.mule_accounts import get_mule_index, reload_mule_accounts
+from app.utils.velocity import user_velocity
+from app.utils.user_profile import profile_features
+from app.utils.scam_classifier import scam_probabilities
+from app.utils.text_context import TextContext
+
+# Chunks queued per worker before the producer waits for results
+_IN_FLIGHT_PER_WORKER = 2
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _parse(item):
+    if isinstance(item, bytes):
+        try:
+            return json.loads(item)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid JSON line: {e}")
+    return item
+
+
+def _prepare_scam(item) -> dict:
+    item = _parse(item)
+    text = item.get("text", "") if isinstance(item, dict) else item
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("text required")
+    return {"text": TextContext(text.strip())}
+
+
+def _prepare_risk(item) -> dict:
+    item = _parse(item)
+    if not isinstance(item, dict):
+        raise ValueError("transaction object required")
+    transcript = item.get("transcript", "")
+    if not isinstance(transcript, str) or not transcript.strip():
+        raise ValueError("transcript required")
+    return {
+        "amount": item.get("amount", 0),
+        "transcript": TextContext(transcript.strip()),
+        "is_liveness_passed": item.get("is_liveness_passed", False),
+        "stress_level": item.get("stress_level", "low"),
+        "voice_blacklist_similarity": item.get("voice_blacklist_similarity"),
+        "user_id": item.get("user_id"),
+        "recipient_account": item.get("recipient_account"),
+    }
+
+
+def _user_keys(items: list) -> list:
+    """
+    (user_id, amount, recipient_account) of each risk item, or None for
+    items without a user; runs in a worker. Bad items are None here and
+    reported when the chunk is scored.
+    """
+    keys = []
+    for item in items:
+        try:
+            args = _prepare_risk(item)
+        except (ValueError, TypeError, AttributeError):
+            args = {}
+        user_id = args.get("user_id")
+        keys.append((user_id, args["amount"], args["recipient_account"]) if user_id else None)
+    return keys
+
+
+def _user_states(keys: list) -> list:
+    """Velocity and profile for each _user_keys() entry; read where the stores live."""
+    states = []
+    for key in keys:
+        if key is None:
+            states.append(None)
+            continue
+        user_id, amount, recipient_account = key
+        try:
+            states.append({
+                "velocity": user_velocity(user_id),
+                "profile": profile_features(user_id, amount, recipient_account),
+            })
+        except (ValueError, TypeError):
+            states.append(None)  # the worker reports the item
+    return states
+
+
+def _mule_checksum():
+    index = get_mule_index()
+    return index.checksum if index is not None else None
+
+
+def _score_risk(**kwargs) -> dict:
+    result = calculate_transaction_risk(**kwargs)
+    result["recommendations"] = risk_recommendations(result["risk_level"])
+    return result
+
+
+# kind -> (parse and validate one item, its TextContext argument, scorer)
+_SCORERS = {
+    "scam": (_prepare_scam, "text", detect_scam_phrases),
+    "risk": (_prepare_risk, "transcript", _score_risk),
+}
+
+
+def _score_chunk(kind: str, start: int, items: list, checksum: str, mule_checksum: str = None, user_states: list = None) -> list:
+    """
+    Score one chunk; runs in a worker, or inline with no pool.
+
+    user_states holds _user_states() of each item, looked up by the
+    parent; it is None only inline, where the stores are this process's.
+    """
+    # Workers don't run the phrase or mule list watchers; catch up with the parent's versions
+    if get_phrase_dictionary().checksum != checksum:
+        reload_phrases(force=True)
+    if mule_checksum is not None and _mule_checksum() != mule_checksum:
+        reload_mule_accounts(force=True)
+
+    prepare, text_arg, score = _SCORERS[kind]
+    prepared = []
+    for item in items:
+        try:
+            prepared.append(prepare(item))
+        except (ValueError, TypeError, AttributeError) as e:
+            prepared.append(e)
+    if user_states is not None:
+        for offset, (args, state) in enumerate(zip(prepared, user_states)):
+            if not isinstance(args, dict) or not args.get("user_id"):
+                continue
+            if state is None:
+                prepared[offset] = ValueError("velocity and profile state unavailable for user")
+            else:
+                args.update(state)
+
+    # One vectorized classifier pass; results are memoized on each context
+    scam_probabilities([args[text_arg] for args in prepared if isinstance(args, dict)])
+
+    results = []
+    for offset, args in enumerate(prepared):
+        if isinstance(args, Exception):
+            results.append({"index": start + offset, "error": str(args)})
+            continue
+        try:
+            results.append({"index": start + offset, **score(**args)})
+        except (ValueError, TypeError, AttributeError) as e:
+            results.append({"index": start + offset, "error": str(e)})
+    return results
+
+
+def _chunks(items, chunk_size: int):
+    chunk, start = [], 0
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield start, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Start a pool of this size on first use."""
+    with _executor_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            print(f"Starting {workers} batch scoring worker(s)...")
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if not _executors:
+                atexit.register(shutdown_batch_pools)
+            _executors[workers] = executor
+        return executor
+
+
+def score_batch(kind: str, items, workers: int = BATCH_WORKERS, chunk_size: int = BATCH_CHUNK_SIZE):
+    """
+    Score an iterable of items and yield one result per item, in order.
+
+    Args:
+        kind: "scam" (items are texts or {"text"}) or "risk" (items are
+            /api/risk/evaluate bodies)
+        items: Any iterable, consumed lazily; bytes are parsed as JSON
+        workers: Worker processes (0 = score in the calling thread)
+        chunk_size: Items per chunk sent to a worker
+
+    Yields:
+        {"index": i, **result} or {"index": i, "error": message}
+    """
+    if kind not in _SCORERS:
+        raise ValueError(f"Unknown batch kind: {kind}")
+    checksum = get_phrase_dictionary().checksum
+    mule_checksum = _mule_checksum()
+    chunks = _chunks(items, max(chunk_size, 1))
+
+    if workers <= 0:
+        for start, chunk in chunks:
+            yield from _score_chunk(kind, start, chunk, checksum)
+        return
+
+    executor = _get_executor(workers)
+    lookups = deque()  # (start, chunk, _user_keys() future), risk chunks only
+    scoring = deque()  # _score_chunk() futures, in input order
+
+    def advance(block: bool):
+        """Send risk chunks whose user keys are back on to scoring, in order."""
+        while lookups and (block or lookups[0][2].done()):
+            start, chunk, keys = lookups.popleft()
+            states = _user_states(keys.result())
+            scoring.append(executor.submit(_score_chunk, kind, start, chunk, checksum, mule_checksum, states))
+            block = False
+
+    try:
+        for start, chunk in chunks:
+            if kind == "risk":
+                lookups.append((start, chunk, executor.submit(_user_keys, chunk)))
+            else:
+                scoring.append(executor.submit(_score_chunk, kind, start, chunk, checksum, mule_checksum))
+            advance(block=False)
+            while len(lookups) + len(scoring) >= workers * _IN_FLIGHT_PER_WORKER:
+                if scoring and (scoring[0].done() or not lookups):
+                    yield from scoring.popleft().result()
+                else:
+                    advance(block=True)
+        while lookups or scoring:
+            advance(block=not scoring)
+            yield from scoring.popleft().result()
+    finally:
+        # Client went away mid-stream: drop the work nobody will read
+        for future in [keys for _, _, keys in lookups] + list(scoring):
+            future.cancel()
+
+
+def shutdown_batch_pools():
+    with _executor_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
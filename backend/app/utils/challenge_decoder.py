@@ -0,0 +1,139 @@
+"""Challenge-aware liveness decoding.
+
+For liveness we already know the phrase the caller was asked to say, so
+instead of an open-vocabulary transcript we run a short greedy decode
+primed with the phrase and stop as soon as the phrase has been decoded
+with enough confidence, or as soon as the decoded words clearly cannot
+match it. The result uses the verify_speaker() contract.
+"""
+import re
+import math
+import time
+from typing import Union
+import numpy as np
+import torch
+import whisper
+from app.config import CHALLENGE_MIN_CONFIDENCE, CHALLENGE_MAX_TOKENS, VAD_ENABLED
+from app.utils.ml_utils import load_models, verify_speaker
+from app.utils.audio_context import AudioContext, as_audio_context
+
+# Extra completed words allowed (fillers etc.) before giving up on a match
+_REJECT_SLACK_WORDS = 2
+
+
+def _words(text: str) -> list:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def _contains(words: list, target: list) -> bool:
+    n = len(target)
+    return any(words[i:i + n] == target for i in range(len(words) - n + 1))
+
+
+def decode_challenge(model, samples: np.ndarray, challenge_phrase: str, mel=None) -> dict:
+    """
+    Greedy-decode a clip, primed with the challenge phrase, with early exit.
+
+    mel may be the clip's precomputed padded log-mel spectrogram.
+
+    Returns:
+        {
+            "text": decoded text,
+            "confidence": mean token probability,
+            "tokens": tokens decoded,
+            "stop_reason": "matched" | "mismatch" | "end_of_text" | "max_tokens"
+        }
+    """
+    tokenizer = whisper.tokenizer.get_tokenizer(model.is_multilingual, language="en", task="transcribe")
+    target = _words(challenge_phrase)
+
+    if mel is None:
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(samples)), n_mels=model.dims.n_mels)
+    mel = mel.unsqueeze(0).to(model.device)
+
+    prompt = [tokenizer.sot_prev] + tokenizer.encode(" " + challenge_phrase.strip())
+    tokens = prompt + list(tokenizer.sot_sequence_including_notimestamps)
+    generated = []
+    sum_logprob = 0.0
+    stop_reason = "max_tokens"
+
+    with torch.no_grad():
+        audio_features = model.embed_audio(mel)
+        for _ in range(CHALLENGE_MAX_TOKENS):
+            logits = model.logits(torch.tensor([tokens + generated], device=model.device), audio_features)[0, -1]
+            logits[tokenizer.timestamp_begin:] = -math.inf
+            logprobs = torch.log_softmax(logits.float(), dim=-1)
+            token = int(logprobs.argmax())
+
+            if token == tokenizer.eot:
+                stop_reason = "end_of_text"
+                break
+
+            generated.append(token)
+            sum_logprob += float(logprobs[token])
+
+            words = _words(tokenizer.decode(generated))
+            confidence = math.exp(sum_logprob / len(generated))
+            if _contains(words, target) and confidence >= CHALLENGE_MIN_CONFIDENCE:
+                stop_reason = "matched"
+                break
+
+            # The last word may still be growing; judge only completed ones
+            completed = words[:-1]
+            if len(completed) >= len(target) + _REJECT_SLACK_WORDS or (
+                len(completed) >= len(target) and not set(completed) & set(target)
+            ):
+                stop_reason = "mismatch"
+                break
+
+    return {
+        "text": tokenizer.decode(generated).strip(),
+        "confidence": math.exp(sum_logprob / len(generated)) if generated else 0.0,
+        "tokens": len(generated),
+        "stop_reason": stop_reason,
+    }
+
+
+def verify_challenge_audio(audio: Union[str, np.ndarray, AudioContext], challenge_phrase: str) -> dict:
+    """
+    Server-side liveness check straight from audio.
+
+    Args:
+        audio: The request's AudioContext, a path to an audio file, or
+            16 kHz mono float32 samples
+        challenge_phrase: Phrase the caller was asked to say
+
+    Returns:
+        verify_speaker() result plus a "decode" report
+    """
+    try:
+        start = time.perf_counter()
+        ctx = as_audio_context(audio)
+
+        if VAD_ENABLED:
+            speech, vad_info = ctx.speech()
+            if speech is None:
+                result = verify_speaker("", challenge_phrase)
+                result["passed"] = False
+                result["no_speech"] = True
+                result["decode"] = {"stop_reason": "no_speech", "tokens": 0, "decode_ms": 0.0, "vad": vad_info}
+                return result
+
+        model = load_models()
+        decoded = decode_challenge(model, ctx.model_input(), challenge_phrase, mel=ctx.log_mel(model.dims.n_mels))
+        result = verify_speaker(decoded["text"], challenge_phrase)
+
+        # A phrase-primed decoder can echo its prompt; require confidence too
+        if result["passed"] and decoded["confidence"] < CHALLENGE_MIN_CONFIDENCE:
+            result["passed"] = False
+            result["reasons"].append("Low decoding confidence")
+
+        result["decode"] = {
+            **decoded,
+            "confidence": round(decoded["confidence"], 4),
+            "decode_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        return result
+    except Exception as e:
+        print(f"Challenge verification error: {e}")
+        return {"passed": False, "error": str(e), "score": 0, "confidence": 0}
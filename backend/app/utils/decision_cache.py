@@ -0,0 +1,134 @@
+"""Short-lived cache of risk and transfer-validation decisions.
+
+Mobile clients retry /api/risk/evaluate and /api/banking/transfer/validate
+on flaky networks. Decisions are keyed by a SHA-256 of the endpoint and a
+canonical form of its inputs (sorted keys, whole-number floats as ints,
+stripped strings), so a retry gets back the original response body,
+timestamp included, instead of re-running scam detection and scoring.
+
+The inputs include a snapshot of the server-side state the decision
+reads (phrase, rule and mule list versions, the user's transfer count or
+balance), so a reload or a completed transfer changes the key and the
+next request is decided afresh. Entries live DECISION_CACHE_TTL seconds
+in a bounded LRU; the TTL only bounds drift that no state change marks,
+such as transfers ageing out of a velocity window.
+"""
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from app.config import DECISION_CACHE_SIZE, DECISION_CACHE_TTL
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def decision_key(endpoint: str, inputs: dict) -> str:
+    """Hash an endpoint's inputs so equivalent retries share a key."""
+    canonical = json.dumps(_canonical(inputs), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{endpoint}\0{canonical}".encode()).hexdigest()
+
+
+class DecisionCache:
+    """In-memory LRU of decisions with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, JSON-encoded result)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._endpoints = {}  # endpoint -> [hits, misses]
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, endpoint: str, key: str):
+        """The cached decision (a copy) or None."""
+        now = time.time()
+        with self._lock:
+            counts = self._endpoints.setdefault(endpoint, [0, 0])
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    counts[0] += 1
+                    return json.loads(result)
+                del self._entries[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            counts[1] += 1
+            return None
+
+    def put(self, key: str, result: dict):
+        """Store a JSON-serializable decision; it is replayed as a fresh copy."""
+        result = json.dumps(result)
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            endpoints = {name: tuple(counts) for name, counts in self._endpoints.items()}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["endpoints"] = {
+            name: {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+            for name, (hits, misses) in endpoints.items()
+        }
+        stats["ttl"] = self.ttl
+        stats["max_entries"] = self.max_entries
+        return stats
+
+
+_cache = DecisionCache(max_entries=DECISION_CACHE_SIZE, ttl=DECISION_CACHE_TTL)
+
+
+def get_decision_cache() -> DecisionCache:
+    return _cache
+
+
+def cached_decision(endpoint: str, inputs: dict, decide) -> tuple:
+    """
+    Replay the decision for these inputs, or make and cache it.
+
+    Args:
+        endpoint: Name the hit rates are reported under
+        inputs: Everything the decision depends on
+        decide: Callable returning the response body; exceptions are not cached
+
+    Returns:
+        (body, hit)
+    """
+    if not _cache.enabled:
+        return decide(), False
+    key = decision_key(endpoint, inputs)
+    result = _cache.get(endpoint, key)
+    if result is not None:
+        return result, True
+    result = decide()
+    _cache.put(key, result)
+    return result, False
+
+
+def get_decision_cache_stats() -> dict:
+    """Hit/miss counters, overall and per endpoint, for /api/status."""
+    return _cache.stats()
@@ -0,0 +1,189 @@
+"""ASR-error-tolerant phrase matching.
+
+Whisper often garbles short scam cues: "share OTP" comes back as
+"share o t p", "share 0TP" or "shareotp". Text and phrases are normalized
+(lowercase, digit/symbol look-alikes mapped to letters, punctuation and
+spaces dropped), so spelled-out letters and split or merged words line up.
+A trigram index shortlists phrases that share enough trigrams with the
+transcript, and each shortlisted phrase is verified with a bounded
+approximate-substring edit distance around the position its trigrams
+point to.
+
+A match has to start and end on a word boundary of the transcript, so a
+phrase is not read out of a longer word ("click this link" in "click this
+linkedin post"), and the first letter of each phrase word and the last
+letter of the phrase must be matched as they are: a one-letter edit there
+usually makes a different, innocent word ("my account is locked", "your
+passport details", "kyc expires"). Fuzzy matches remain weaker evidence
+than exact hits and are reported and scored separately from them.
+
+Cost per transcript is bounded independently of the phrase count: one
+index lookup per distinct transcript trigram, a vectorized count, a
+positional filter on a bounded shortlist, and at most max_candidates
+small edit-distance checks.
+"""
+import re
+import numpy as np
+
+# Characters ASR output commonly substitutes for letters
+_LOOKALIKES = str.maketrans({"0": "o", "1": "i", "3": "e", "5": "s", "@": "a", "$": "s"})
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+Q = 3
+
+# Shortlisted phrases given the positional filter, per edit-distance check
+_FILTER_FACTOR = 4
+
+
+def normalize(text: str) -> str:
+    """Lowercase, map look-alikes to letters and drop everything else, spaces included."""
+    return _NON_LETTERS.sub("", text.lower().translate(_LOOKALIKES))
+
+
+def _normalize_with_boundaries(text: str) -> tuple:
+    """normalize(text), and a (len + 1,) bool mask of the positions where its words start or end."""
+    words = [word for word in _NON_LETTERS.split(text.lower().translate(_LOOKALIKES)) if word]
+    boundaries = np.zeros(sum(map(len, words)) + 1, dtype=bool)
+    boundaries[np.cumsum([0] + [len(word) for word in words])] = True
+    return "".join(words), boundaries
+
+
+def _approx_substring_distance(pattern: str, text: str, boundaries: np.ndarray, pinned: np.ndarray) -> int:
+    """
+    Smallest edit distance between pattern and any substring of text that
+    starts and ends where boundaries (len(text) + 1,) is set. Pattern
+    characters flagged in pinned have to be matched as they are; edits
+    may only happen around them.
+    """
+    t = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    cols = np.arange(len(t) + 1)
+    unreachable = len(pattern) + len(t) + 1
+    row = np.where(boundaries, 0, unreachable).astype(np.int32)  # a match may start at any boundary
+    for i, ch in enumerate(pattern.encode("ascii"), start=1):
+        best = np.empty_like(row)
+        if pinned[i - 1]:
+            # Match only
+            best[0] = unreachable
+            best[1:] = np.where(t == ch, row[:-1], unreachable)
+        else:
+            # Substitution/match and deletion
+            best[0] = i if boundaries[0] else unreachable
+            best[1:] = np.minimum(row[:-1] + (t != ch), row[1:] + 1)
+        # Insertions as a running min
+        row = np.minimum(np.minimum.accumulate(best - cols) + cols, unreachable)
+    return int(row[boundaries].min()) if boundaries.any() else unreachable
+
+
+class FuzzyPhraseMatcher:
+    """Trigram-shortlisted, edit-distance-verified phrase matcher."""
+
+    def __init__(self, phrases: list, error_rate: float = 0.15, max_errors: int = 3, max_candidates: int = 16):
+        """
+        Args:
+            phrases: Phrases to look for
+            error_rate: Allowed edits per normalized character
+            max_errors: Hard cap on allowed edits per phrase
+            max_candidates: Most phrases verified per transcript
+        """
+        self.phrases = list(phrases)
+        self.max_candidates = max_candidates
+        self._keys, self._pinned = [], []
+        for phrase in self.phrases:
+            key, word_starts = _normalize_with_boundaries(phrase)
+            # The first letter of every word and the phrase's last letter
+            pinned = word_starts[:-1].copy()
+            pinned[-1:] = True
+            self._keys.append(key)
+            self._pinned.append(pinned)
+        self._max_errors = np.array(
+            [min(max_errors, int(len(key) * error_rate)) for key in self._keys], dtype=np.int32
+        )
+
+        # Inverted index: trigram -> ids of the phrases containing it
+        postings = {}
+        n_grams = np.zeros(len(self._keys), dtype=np.int32)
+        for pid, key in enumerate(self._keys):
+            for offset in range(len(key) - Q + 1):
+                postings.setdefault(key[offset:offset + Q], []).append(pid)
+            n_grams[pid] = max(len(key) - Q + 1, 0)
+        self._postings = {gram: np.array(pids, dtype=np.int32) for gram, pids in postings.items()}
+
+        # q-gram lemma: k edits destroy at most Q * k of a key's trigrams
+        self._min_shared = np.maximum(n_grams - Q * self._max_errors, 1)
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def find(self, text: str, exclude=()) -> list:
+        """
+        Phrases that occur in text within their edit budget.
+
+        Args:
+            text: Transcript
+            exclude: Phrases already found exactly; skipped
+
+        Returns:
+            [{"phrase": ..., "window": normalized text checked, "distance": edits}, ...]
+            in phrase-list order
+        """
+        s, boundaries = _normalize_with_boundaries(text)
+        positions = {}
+        for pos in range(len(s) - Q + 1):
+            positions.setdefault(s[pos:pos + Q], []).append(pos)
+
+        # Each (phrase, offset) pair belongs to one trigram, so counting
+        # postings of the distinct transcript trigrams counts distinct
+        # shared key trigrams per phrase
+        lists = [self._postings[gram] for gram in positions if gram in self._postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self._keys))
+
+        candidates = np.flatnonzero(shared >= self._min_shared)
+        skip = set(exclude)
+        candidates = [pid for pid in candidates if self.phrases[pid] not in skip]
+        if not candidates:
+            return []
+        candidates.sort(key=lambda pid: self._min_shared[pid] - shared[pid])
+
+        # Cheap positional filter first, in order of trigram overlap, until
+        # max_candidates phrases are left for the edit-distance check
+        windows = {}
+        for pid in candidates[: self.max_candidates * _FILTER_FACTOR]:
+            window = self._window(s, self._keys[pid], int(self._max_errors[pid]), int(self._min_shared[pid]), positions)
+            if window is not None:
+                windows[pid] = window
+                if len(windows) == self.max_candidates:
+                    break
+
+        found = []
+        for pid in sorted(windows):
+            lo, hi = windows[pid]
+            distance = _approx_substring_distance(self._keys[pid], s[lo:hi], boundaries[lo:hi + 1], self._pinned[pid])
+            if distance <= self._max_errors[pid]:
+                found.append({"phrase": self.phrases[pid], "window": s[lo:hi], "distance": distance})
+        return found
+
+    @staticmethod
+    def _window(s: str, key: str, k: int, min_shared: int, positions: dict):
+        """
+        (start, end) of the stretch of s where key's trigrams say it
+        starts, plus slack.
+
+        Trigram hits are voted by implied start position; k edits shift a
+        match by at most k, so votes are pooled over a 2k+1 band. Returns
+        None when no single spot has enough shared trigrams, i.e. the
+        phrase's pieces are scattered across the transcript.
+        """
+        votes = {}
+        for offset in range(len(key) - Q + 1):
+            for pos in positions.get(key[offset:offset + Q], ()):
+                votes[pos - offset] = votes.get(pos - offset, 0) + 1
+        best_start, best_votes = 0, 0
+        for start in votes:
+            pooled = sum(votes.get(start + d, 0) for d in range(-k, k + 1))
+            if pooled > best_votes:
+                best_start, best_votes = start, pooled
+        if best_votes < min_shared:
+            return None
+        return max(best_start - 2 * k, 0), min(best_start + len(key) + 2 * k, len(s))
@@ -0,0 +1,21 @@
+"""Small helpers for in-process latency and rate metrics."""
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 2)
+
+
+def latency_summary(values: list) -> dict:
+    """p50/p95/p99 and max of a latency sample in milliseconds."""
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else 0.0,
+    }
@@ -1,76 +1,334 @@
 """Machine learning utilities for voice processing."""
 import os
 import io
+import time
+import math
+import threading
+from collections import deque
+from typing import Union
+import torch
 import whisper
 import numpy as np
-from app.config import WHISPER_MODEL, DEVICE
+from app.config import (
+    WHISPER_MODEL,
+    WHISPER_QUANTIZE,
+    WHISPER_CASCADE_MODEL,
+    WHISPER_CASCADE_THRESHOLD,
+    DEVICE,
+    PRELOAD_MODELS,
+    WARMUP_MAX_ATTEMPTS,
+    TRANSCRIBE_WORKERS,
+    VAD_ENABLED,
+)
+from app.utils.whisper_batcher import get_batcher, SAMPLE_RATE, MAX_CLIP_SECONDS
+from app.utils.metrics import latency_summary
+from app.utils.acoustic_stress import acoustic_stress
+from app.utils.audio_context import AudioContext, as_audio_context
+from app.utils.text_context import TextContext, as_text_context
+from app.utils.scam_classifier import scam_probability
 
-# Global model cache
-_whisper_model = None
+# Global model cache, one Whisper instance per model name
+_whisper_models = {}
 _emotion_model = None
+_model_lock = threading.Lock()
 
-SCAM_PHRASES = [
-    "account is blocked",
-    "share otp",
-    "kyc expired",
-    "verification from bank",
-    "urgent action required",
-    "account suspended",
-    "confirm your details",
-    "update your password",
-    "click this link",
-    "verify identity",
-]
+# Warm-up state; without PRELOAD_MODELS the models load lazily and
+# the service counts as ready from the start.
+_readiness = {
+    "ready": not PRELOAD_MODELS,
+    "warming_up": False,
+    "warmup_ms": None,
+    "attempts": 0,
+    "error": None,
+}
 
-FILLER_WORDS = ["uh", "um", "ah", "uh-huh", "like", "you know", "basically", "literally"]
+# Longest wait between warm-up attempts
+_WARMUP_MAX_BACKOFF_SECONDS = 60
 
+# verify_speaker() scores in this range escalate the model cascade
+CASCADE_BORDERLINE_SCORES = (55, 85)
 
-def load_models():
-    """Load ML models on demand."""
-    global _whisper_model
-    if _whisper_model is None:
-        print(f"Loading Whisper model ({WHISPER_MODEL}) on {DEVICE}...")
-        _whisper_model = whisper.load_model(WHISPER_MODEL, device=DEVICE)
-    return _whisper_model
+# Cascade tier counts, fast-tier confidences and per-tier latencies
+_CASCADE_WINDOW = 1000
+_cascade_lock = threading.Lock()
+_cascade_counts = {"fast": 0, "escalated": 0, "low_confidence": 0, "borderline_challenge": 0}
+_cascade_confidences = deque(maxlen=_CASCADE_WINDOW)
+_cascade_latency_ms = {"fast": deque(maxlen=_CASCADE_WINDOW), "escalated": deque(maxlen=_CASCADE_WINDOW)}
 
+# Decode options passed to model.transcribe(); part of the result cache key
+TRANSCRIBE_OPTIONS = {"language": "en", "fp16": DEVICE == "cuda"}
 
-def transcribe_audio(audio_file_path: str) -> dict:
+
+def load_models(model_name: str = WHISPER_MODEL):
+    """Load ML models on demand (one cached instance per Whisper model)."""
+    with _model_lock:
+        model = _whisper_models.get(model_name)
+        if model is None:
+            print(f"Loading Whisper model ({model_name}) on {DEVICE}...")
+            model = whisper.load_model(model_name, device=DEVICE)
+            if WHISPER_QUANTIZE == "int8":
+                model = quantize_model(model)
+            _whisper_models[model_name] = model
+    return model
+
+
+def quantize_model(model):
+    """
+    Apply dynamic int8 quantization to the Linear layers of a Whisper model.
+    
+    Weights are stored as int8 and activations are quantized on the fly,
+    which shrinks the model and speeds up CPU matmuls. Only supported on CPU.
+    """
+    if DEVICE != "cpu":
+        print(f"⚠ WHISPER_QUANTIZE=int8 needs DEVICE=cpu, keeping fp32 on {DEVICE}")
+        return model
+    
+    # whisper.model.Linear only adds a dtype cast in forward(), which is a
+    # no-op in fp32; downcast so torch's dynamic quantizer recognises it.
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    
+    print("Quantizing Whisper Linear layers to int8...")
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def warm_up_models(include_pool: bool = False) -> dict:
+    """
+    Preload Whisper and run one inference on a synthetic clip.
+    
+    Args:
+        include_pool: Warm the transcription worker processes instead when
+            TRANSCRIBE_WORKERS > 0; the calling process then never decodes,
+            so it does not load a model of its own
+        
+    Returns:
+        Readiness state after warm-up
+    """
+    _readiness["warming_up"] = True
+    _readiness["attempts"] += 1
+    start = time.perf_counter()
+    try:
+        if include_pool and TRANSCRIBE_WORKERS > 0:
+            from app.utils.transcription_pool import warm_up_pool
+            warm_up_pool()
+        else:
+            # One second of near-silence exercises the encoder and decoder
+            clip = (np.random.default_rng(0).standard_normal(SAMPLE_RATE) * 1e-4).astype(np.float32)
+            for model_name in filter(None, (WHISPER_CASCADE_MODEL, WHISPER_MODEL)):
+                load_models(model_name).transcribe(clip, **TRANSCRIBE_OPTIONS)
+        
+        _readiness["warmup_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        _readiness["error"] = None
+        _readiness["ready"] = True
+        print(f"✓ Models warmed up in {_readiness['warmup_ms']} ms")
+    except Exception as e:
+        print(f"⚠ Model warm-up failed: {e}")
+        _readiness["error"] = str(e)
+    finally:
+        _readiness["warming_up"] = False
+    return get_readiness()
+
+
+def _warm_up_until_ready():
+    """Retry a failed warm-up with backoff; exit the process after WARMUP_MAX_ATTEMPTS."""
+    delay = 1
+    while warm_up_models(include_pool=True)["error"] is not None:
+        if WARMUP_MAX_ATTEMPTS and _readiness["attempts"] >= WARMUP_MAX_ATTEMPTS:
+            print(f"✗ Model warm-up failed {_readiness['attempts']} times, exiting")
+            os._exit(1)
+        print(f"Retrying model warm-up in {delay} s...")
+        time.sleep(delay)
+        delay = min(delay * 2, _WARMUP_MAX_BACKOFF_SECONDS)
+
+
+def start_warm_up() -> threading.Thread:
+    """Warm up the worker pool (or in-process models) in a background thread."""
+    thread = threading.Thread(target=_warm_up_until_ready, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready() -> bool:
+    """Whether ML-backed routes may accept work."""
+    return _readiness["ready"]
+
+
+def get_readiness() -> dict:
+    """Snapshot of the warm-up state."""
+    return dict(_readiness)
+
+
+def transcribe_audio(audio: Union[str, np.ndarray, AudioContext], challenge_phrase: str = None) -> dict:
     """
     Transcribe audio using OpenAI Whisper.
     
+    With VAD_ENABLED, silence is trimmed first and clips without speech
+    return a "no_speech" result without running the model. With
+    WHISPER_CASCADE_MODEL set, the small model decodes first and the clip
+    is re-decoded with WHISPER_MODEL only when its confidence is low or the
+    challenge check is borderline. Short clips are routed through the
+    micro-batcher when WHISPER_BATCH_SIZE > 1.
+    
     Args:
-        audio_file_path: Path to audio file
+        audio: The request's AudioContext, a path to an audio file, or
+            16 kHz mono float32 samples already decoded in-process
+        challenge_phrase: Expected liveness phrase, used by the cascade
         
     Returns:
         {
             "text": "transcribed text",
             "language": "detected language code",
             "duration": duration_in_seconds,
-            "confidence": confidence_score
+            "confidence": confidence_score,
+            "vad": {...},      # only with VAD_ENABLED
+            "cascade": {...}   # only with WHISPER_CASCADE_MODEL
         }
     """
     try:
-        model = load_models()
-        result = model.transcribe(audio_file_path, language="en")
+        ctx = as_audio_context(audio)
+        extra = {}
         
-        return {
-            "text": result["text"].strip(),
-            "language": result.get("language", "en"),
-            "duration": result.get("duration", 0),
-            "confidence": float(result.get("segments", [{}])[0].get("confidence", 0.5)),
-        }
+        if VAD_ENABLED:
+            speech, vad_info = ctx.speech()
+            extra = {"duration": vad_info["original_duration"], "vad": vad_info}
+            if speech is None:
+                return {
+                    "text": "",
+                    "language": "en",
+                    "confidence": 0.0,
+                    "no_speech": True,
+                    **extra,
+                }
+        
+        if WHISPER_CASCADE_MODEL:
+            return {**_cascade_decode(ctx, challenge_phrase), **extra}
+        
+        return {**_decode(ctx, WHISPER_MODEL), **extra}
     except Exception as e:
         print(f"Transcription error: {e}")
         return {"text": "", "error": str(e), "confidence": 0}
 
 
-def verify_speaker(transcript: str, challenge_phrase: str) -> dict:
+def _result_confidence(result: dict) -> float:
+    """Mean per-segment token probability, exp(avg_logprob), in [0, 1]."""
+    segments = result.get("segments") or []
+    if not segments:
+        return 0.0
+    probs = [math.exp(seg.get("avg_logprob", -math.inf)) for seg in segments]
+    return float(min(sum(probs) / len(probs), 1.0))
+
+
+def _decode(ctx: AudioContext, model_name: str) -> dict:
+    """Decode with one model, batching short clips when enabled."""
+    samples = ctx.model_input()
+    batcher = get_batcher(model_name)
+    if batcher is not None and len(samples) <= MAX_CLIP_SECONDS * SAMPLE_RATE:
+        return batcher.transcribe(samples, mel=ctx.log_mel(batcher.model.dims.n_mels))
+    
+    result = load_models(model_name).transcribe(samples, **TRANSCRIBE_OPTIONS)
+    
+    return {
+        "text": result["text"].strip(),
+        "language": result.get("language", "en"),
+        "duration": round(len(samples) / SAMPLE_RATE, 2),
+        "confidence": _result_confidence(result),
+    }
+
+
+def _cascade_decode(ctx: AudioContext, challenge_phrase: str = None) -> dict:
+    """Decode with the small model, escalating to WHISPER_MODEL when unsure."""
+    start = time.perf_counter()
+    fast = _decode(ctx, WHISPER_CASCADE_MODEL)
+    fast_ms = (time.perf_counter() - start) * 1000
+    
+    reasons = []
+    if fast["confidence"] < WHISPER_CASCADE_THRESHOLD:
+        reasons.append("low_confidence")
+    if challenge_phrase:
+        score = verify_speaker(fast["text"], challenge_phrase)["score"]
+        low, high = CASCADE_BORDERLINE_SCORES
+        if low <= score <= high:
+            reasons.append("borderline_challenge")
+    
+    info = {
+        "tier": "escalated" if reasons else "fast",
+        "model": WHISPER_MODEL if reasons else WHISPER_CASCADE_MODEL,
+        "fast_confidence": round(fast["confidence"], 4),
+        "reasons": reasons,
+        "fast_ms": round(fast_ms, 2),
+    }
+    if not reasons:
+        info["total_ms"] = info["fast_ms"]
+        return {**fast, "cascade": info}
+    
+    full = _decode(ctx, WHISPER_MODEL)
+    info["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return {**full, "cascade": info}
+
+
+def decode_stream_window(samples: np.ndarray, prompt: str = None) -> dict:
+    """
+    Decode one streaming window, primed with the session's committed text.
+
+    Returns:
+        {"segments": [{"start": s, "end": s, "text": str}, ...]}
+    """
+    result = load_models().transcribe(
+        samples,
+        language="en",
+        initial_prompt=prompt or None,
+        condition_on_previous_text=False,
+        fp16=(DEVICE == "cuda"),
+    )
+    return {
+        "segments": [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+            for seg in result.get("segments", [])
+        ]
+    }
+
+
+def record_cascade(info: dict):
+    """Add one transcription's cascade outcome to the tier statistics."""
+    with _cascade_lock:
+        _cascade_counts[info["tier"]] += 1
+        for reason in info.get("reasons", []):
+            _cascade_counts[reason] += 1
+        _cascade_confidences.append(info["fast_confidence"])
+        _cascade_latency_ms[info["tier"]].append(info["total_ms"])
+
+
+def get_cascade_stats() -> dict:
+    """Per-tier hit rates, latency distribution and fast-tier confidence histogram."""
+    with _cascade_lock:
+        counts = dict(_cascade_counts)
+        confidences = list(_cascade_confidences)
+        latencies = {tier: list(values) for tier, values in _cascade_latency_ms.items()}
+    
+    total = counts["fast"] + counts["escalated"]
+    histogram, _ = np.histogram(confidences, bins=10, range=(0.0, 1.0))
+    return {
+        "enabled": bool(WHISPER_CASCADE_MODEL),
+        "fast_model": WHISPER_CASCADE_MODEL,
+        "full_model": WHISPER_MODEL,
+        "threshold": WHISPER_CASCADE_THRESHOLD,
+        **counts,
+        "fast_hit_rate": round(counts["fast"] / total, 4) if total else 0.0,
+        "latency_ms": {tier: latency_summary(values) for tier, values in latencies.items()},
+        "fast_confidence_histogram": {
+            f"{i / 10:.1f}-{(i + 1) / 10:.1f}": int(count) for i, count in enumerate(histogram)
+        },
+    }
+
+
+def verify_speaker(transcript: Union[str, TextContext], challenge_phrase: str) -> dict:
     """
     Verify speaker using challenge-response pattern matching.
-    Enhanced with ML for future speaker verification.
+    Voice biometrics are checked separately by voiceprint.verify_voiceprint().
     
     Args:
-        transcript: User's spoken response
+        transcript: User's spoken response, or its TextContext
         challenge_phrase: Challenge phrase that was asked
         
     Returns:
@@ -81,7 +339,8 @@ def verify_speaker(transcript: str, challenge_phrase: str) -> dict:
             "confidence": 0-1
         }
     """
-    transcript_lower = transcript.lower().strip()
+    ctx = as_text_context(transcript)
+    transcript_lower = ctx.normalized
     challenge_lower = challenge_phrase.lower().strip()
     
     score = 50  # Base score
@@ -99,13 +358,14 @@ def verify_speaker(transcript: str, challenge_phrase: str) -> dict:
         reasons.append(f"Challenge phrase not detected")
     
     # Count filler words (-5 points each)
-    filler_count = sum(1 for word in FILLER_WORDS if f" {word} " in f" {transcript_lower} ")
+    matches = ctx.matches()
+    filler_count = len(matches["filler"])
     if filler_count > 0:
         score -= (filler_count * 5)
         reasons.append(f"Filler words detected: {filler_count}")
     
     # Check for natural speech patterns (+5 points)
-    if len(transcript.split()) >= 3:
+    if len(ctx.tokens) >= 3:
         score += 5
         reasons.append("Natural speech pattern detected")
     
@@ -118,80 +378,121 @@ def verify_speaker(transcript: str, challenge_phrase: str) -> dict:
         "score": score,
         "reasons": reasons,
         "confidence": min(score / 100, 1.0),
-        "transcript": transcript,
+        "transcript": ctx.text,
     }
 
 
-def detect_emotion(text: str) -> dict:
+def measure_acoustic_stress(text: Union[str, TextContext], audio: Union[str, np.ndarray, AudioContext]) -> dict:
+    """
+    acoustic_stress() for the audio a transcript was decoded from.
+
+    Runs in the transcription worker next to the decode; pass the result
+    to detect_emotion(acoustic=...).
+
+    Returns:
+        acoustic_stress() result, or None for empty audio
+    """
+    audio_ctx = as_audio_context(audio)
+    if not len(audio_ctx.samples):
+        return None
+    word_count = len(as_text_context(text).tokens) or None
+    return acoustic_stress(audio_ctx.samples, word_count=word_count, rms=audio_ctx.rms())
+
+
+def detect_emotion(
+    text: Union[str, TextContext],
+    audio: Union[np.ndarray, AudioContext] = None,
+    acoustic: dict = None,
+) -> dict:
     """
     Detect emotion/stress from text using sentiment analysis.
     (Simplified version - can be replaced with SpeechBrain model)
     
+    When acoustic stress (pitch variance, loudness dynamics, speaking rate)
+    is available it is blended in: the combined score is
+    0.5 * text score + 4 * acoustic score, with the same level cut-offs.
+    
     Args:
-        text: Transcribed text
+        text: Transcribed text, or its TextContext
+        audio: Optional AudioContext (or 16 kHz float32 samples) the text
+            was decoded from; measured here unless `acoustic` is given
+        acoustic: measure_acoustic_stress() result computed by the worker
         
     Returns:
         {
             "stress_level": "low" | "medium" | "high",
             "confidence": 0-1,
-            "emotions": {"fear": score, "urgency": score, ...}
+            "emotions": {"fear": score, "urgency": score, ...},
+            "acoustic": {...},     # only with audio
+            "timings_ms": {...}    # only with audio
         }
     """
-    text_lower = text.lower()
+    start = time.perf_counter()
+    text_ctx = as_text_context(text)
+    matches = text_ctx.matches()
     
     # Simple keyword-based stress detection
-    stress_keywords = {
-        "urgent": 3,
-        "immediately": 3,
-        "emergency": 3,
-        "quick": 2,
-        "hurry": 2,
-        "please": 1,
-        "help": 2,
-        "worried": 2,
-        "confused": 1,
-    }
+    weights = text_ctx.phrase_dictionary.stress_keywords
+    stress_score = sum(weights.get(keyword, 0) for keyword in matches["stress"])
+    text_ms = (time.perf_counter() - start) * 1000
     
-    stress_score = sum(score for keyword, score in stress_keywords.items() if keyword in text_lower)
-    stress_level = "high" if stress_score >= 4 else "medium" if stress_score >= 2 else "low"
+    if acoustic is None and audio is not None:
+        acoustic = measure_acoustic_stress(text_ctx, audio)
+    combined_score = stress_score
+    if acoustic is not None:
+        combined_score = 0.5 * stress_score + 4 * acoustic["score"]
     
-    return {
+    stress_level = "high" if combined_score >= 4 else "medium" if combined_score >= 2 else "low"
+    
+    result = {
         "stress_level": stress_level,
-        "confidence": min(stress_score / 10, 1.0),
+        "confidence": min(combined_score / 10, 1.0),
         "emotions": {
             "urgency": min(stress_score / 10, 1.0),
-            "fear": 0.2 if "help" in text_lower else 0.0,
+            "fear": 0.2 if "help" in matches["stress"] else 0.0,
         },
         "raw_score": stress_score,
     }
+    
+    if acoustic is not None:
+        result["combined_score"] = round(combined_score, 3)
+        result["acoustic"] = {k: v for k, v in acoustic.items() if k != "timings_ms"}
+        result["timings_ms"] = {"text": round(text_ms, 3), **acoustic["timings_ms"]}
+    
+    return result
 
 
-def detect_scam_phrases(text: str) -> dict:
+def detect_scam_phrases(text: Union[str, TextContext]) -> dict:
     """
     Detect known scam phrases in text.
     
     Args:
-        text: Transcribed text
+        text: Transcribed text, or its TextContext
         
     Returns:
         {
             "is_scam_suspected": bool,
-            "detected_phrases": [list of detected phrases],
-            "confidence": 0-1
+            "detected_phrases": [list of exactly matched phrases],
+            "fuzzy_matches": [phrases only matched despite ASR errors],
+            "confidence": 0-1,
+            "scam_probability": trained classifier probability, or None,
+            "phrase_version": phrase dictionary version
         }
     """
-    text_lower = text.lower()
-    detected = []
-    
-    for phrase in SCAM_PHRASES:
-        if phrase in text_lower:
-            detected.append(phrase)
+    ctx = as_text_context(text)
+    matches = ctx.matches()
+    detected = matches["scam"]
+    fuzzy = matches["scam_fuzzy"]
     
-    is_scam = len(detected) > 0
-    confidence = min(len(detected) * 0.3, 1.0) if is_scam else 0.0
+    # Fuzzy matches raise suspicion, but count for less than exact phrases
+    is_scam = len(detected) > 0 or len(fuzzy) > 0
+    confidence = min(len(detected) * 0.3 + len(fuzzy) * 0.1, 1.0)
     
     return {
         "is_scam_suspected": is_scam,
         "detected_phrases": detected,
+        "fuzzy_matches": fuzzy,
         "confidence": confidence,
+        "scam_probability": scam_probability(ctx),
+        "phrase_version": matches["version"],
     }
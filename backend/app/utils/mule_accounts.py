@@ -0,0 +1,345 @@
+"""Reported mule-account index, checked on every transfer.
+
+The source is a text file of account numbers, one per line
+(MULE_ACCOUNTS_PATH, "" = disabled; blank lines and # comments are
+skipped). Each version of the file is compiled into its own directory
+next to it, named after the file's checksum so workers and restarts
+reuse it:
+
+    <path>.mule-index/<checksum>/bloom.npy      uint8 Bloom filter bits, MULE_BLOOM_FP_RATE sized
+    <path>.mule-index/<checksum>/accounts.npy   sorted fixed-width byte strings, the exact list
+    <path>.mule-index/<checksum>/index.json     {"checksum", "accounts", "bits", "hashes"}
+
+A build is written to a temporary directory and renamed into place in
+one step, so a reader never pairs one version's Bloom filter with
+another's metadata; the sizes are checked against the metadata on load.
+
+Both arrays are opened with mmap_mode="r", so every worker maps the same
+pages. A lookup hashes the account once and tests a few bits: most
+accounts are not listed and stop there in O(1). A Bloom hit is confirmed
+by binary search in the exact list before anything is blocked, so false
+positives only cost that search.
+
+Like the phrase dictionary, a watcher notices file changes, builds the new
+index off the request path and swaps the module-level reference; in-flight
+lookups finish on the index they started with. A configured list that
+cannot be compiled or mapped at startup stops the app instead of
+silently turning the check off.
+"""
+import os
+import re
+import json
+import math
+import time
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+import numpy as np
+from app.config import MULE_ACCOUNTS_PATH, MULE_BLOOM_FP_RATE, MULE_ACCOUNTS_RELOAD_INTERVAL
+
+_SEPARATORS = b" \t\r-"
+_COMMENTS = re.compile(rb"#[^\n]*")
+
+# Compiled versions kept per list; older ones are removed after a build
+_KEEP_VERSIONS = 2
+
+
+def normalize_account(account) -> bytes:
+    """Account number as compared: no spaces or dashes, upper case."""
+    return str(account).upper().encode().translate(None, _SEPARATORS)
+
+
+def _digest(key: bytes) -> bytes:
+    return hashlib.blake2b(key, digest_size=16).digest()
+
+
+def _hashes(key: bytes, n_bits: int) -> tuple:
+    """Base and step of the key's bit positions, (base + i * step) % n_bits."""
+    digest = _digest(key)
+    return int.from_bytes(digest[:8], "little") % n_bits, int.from_bytes(digest[8:], "little") % (n_bits - 1) + 1
+
+
+def _index_root(path: str) -> str:
+    return f"{os.path.splitext(path)[0]}.mule-index"
+
+
+def _version_dir(path: str, checksum: str) -> str:
+    return os.path.join(_index_root(path), checksum[:32])
+
+
+def _read_accounts(raw: bytes) -> np.ndarray:
+    """Sorted, de-duplicated normalized accounts as a fixed-width byte array."""
+    # normalize_account() over the whole file at once
+    text = _COMMENTS.sub(b"", raw).decode("utf-8").upper().encode().translate(None, _SEPARATORS)
+    accounts = [account for account in text.split(b"\n") if account]
+    if not accounts:
+        return np.array([], dtype="S1")
+    return np.unique(np.array(accounts, dtype=bytes))
+
+
+def build_mule_index(path: str, fp_rate: float = MULE_BLOOM_FP_RATE) -> dict:
+    """
+    Compile an account file into the artifacts described above.
+
+    Returns:
+        The index metadata, as written to index.json, plus its "directory"
+
+    Raises:
+        ValueError: the file is missing or unreadable
+        OSError: the artifacts cannot be written
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        accounts = _read_accounts(raw)
+    except (OSError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cannot load mule account list {path}: {e}")
+
+    n = max(len(accounts), 1)
+    n_bits = max(64, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+    n_hashes = max(1, round(n_bits / n * math.log(2)))
+
+    # _hashes() for every account at once
+    digests = np.frombuffer(b"".join(map(_digest, accounts.tolist())), dtype="<u8").reshape(-1, 2)
+    h1 = digests[:, 0] % np.uint64(n_bits)
+    h2 = digests[:, 1] % np.uint64(n_bits - 1) + np.uint64(1)
+    bits = np.zeros(n_bits, dtype=bool)
+    for i in range(n_hashes):
+        bits[(h1 + np.uint64(i) * h2) % np.uint64(n_bits)] = True
+
+    meta = {
+        "checksum": hashlib.sha256(raw).hexdigest(),
+        "accounts": len(accounts),
+        "bits": n_bits,
+        "hashes": n_hashes,
+    }
+    # Write a complete version under a temporary name and rename the
+    # directory, so readers see all of it or none of it
+    directory = _version_dir(path, meta["checksum"])
+    tmp_dir = f"{directory}.tmp{os.getpid()}.{threading.get_ident()}"
+    os.makedirs(tmp_dir)
+    try:
+        np.save(os.path.join(tmp_dir, "bloom.npy"), np.packbits(bits, bitorder="little"))
+        np.save(os.path.join(tmp_dir, "accounts.npy"), accounts)
+        with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another process built the same version first
+            if not os.path.isdir(directory):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    _prune_versions(path, keep=directory)
+    return {**meta, "directory": directory}
+
+
+def _prune_versions(path: str, keep: str):
+    """Remove all but the newest compiled versions; open mappings stay valid."""
+    root = _index_root(path)
+    versions = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and ".tmp" not in entry.name),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in versions[_KEEP_VERSIONS:]:
+        if entry.path != keep:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class MuleAccountIndex:
+    """Read-only, memory-mapped Bloom filter plus exact list of mule accounts."""
+
+    def __init__(self, directory: str, meta: dict):
+        self.directory = directory
+        self.checksum = meta["checksum"]
+        self.n_bits = meta["bits"]
+        self.n_hashes = meta["hashes"]
+        self.bloom = np.load(os.path.join(directory, "bloom.npy"), mmap_mode="r")
+        self.accounts = np.load(os.path.join(directory, "accounts.npy"), mmap_mode="r")
+        if self.bloom.size != math.ceil(self.n_bits / 8):
+            raise ValueError(f"Bloom filter in {directory} has {self.bloom.size} bytes, metadata says {self.n_bits} bits")
+        if len(self.accounts) != meta["accounts"]:
+            raise ValueError(f"Exact list in {directory} has {len(self.accounts)} accounts, metadata says {meta['accounts']}")
+        self._bits = memoryview(self.bloom)  # plain int indexing, much faster than numpy scalars
+        self.loaded_at = datetime.now().isoformat()
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def might_contain(self, key: bytes) -> bool:
+        """Bloom filter test: False is certain, True may be a false positive."""
+        h1, h2 = _hashes(key, self.n_bits)
+        bits = self._bits
+        for i in range(self.n_hashes):
+            position = (h1 + i * h2) % self.n_bits
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def contains(self, key: bytes) -> bool:
+        """Exact membership, by binary search of the sorted list."""
+        if len(key) > self.accounts.dtype.itemsize:
+            return False
+        i = int(np.searchsorted(self.accounts, key))
+        return i < len(self.accounts) and self.accounts[i] == key
+
+    def check(self, account) -> dict:
+        key = normalize_account(account)
+        bloom_hit = self.might_contain(key)
+        return {"bloom_hit": bloom_hit, "listed": bloom_hit and self.contains(key)}
+
+    def memory_bytes(self) -> dict:
+        return {"bloom": self.bloom.nbytes, "exact": self.accounts.nbytes}
+
+
+def load_mule_index(path: str = MULE_ACCOUNTS_PATH) -> MuleAccountIndex:
+    """
+    Map the compiled index for an account file, building it first when the
+    artifacts are missing or were built from different file content.
+
+    Raises:
+        ValueError: the file or its index is missing, unreadable,
+            unwritable or inconsistent
+    """
+    try:
+        with open(path, "rb") as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+    except OSError as e:
+        raise ValueError(f"Cannot load mule account list {path}: {e}")
+    directory = _version_dir(path, checksum)
+    try:
+        with open(os.path.join(directory, "index.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        meta = {}
+    try:
+        if meta.get("checksum") != checksum:
+            meta = build_mule_index(path)
+        return MuleAccountIndex(directory, meta)
+    except (OSError, KeyError) as e:
+        raise ValueError(f"Cannot build or map mule account index for {path}: {e}")
+
+
+def _load_initial():
+    if not MULE_ACCOUNTS_PATH:
+        return None
+    try:
+        index = load_mule_index(MULE_ACCOUNTS_PATH)
+    except ValueError as e:
+        # Refuse to start rather than let transfers skip the check
+        raise RuntimeError(f"MULE_ACCOUNTS_PATH is set but the mule account index cannot be loaded: {e}") from e
+    print(f"✓ Mapped mule account index: {len(index)} accounts")
+    return index
+
+
+_current = _load_initial()
+_reload_lock = threading.Lock()
+_status = {"reloads": 0, "last_error": None, "mtime": None, "lookups": 0, "bloom_hits": 0, "confirmed": 0}
+_watcher = None
+
+try:
+    _status["mtime"] = os.path.getmtime(MULE_ACCOUNTS_PATH) if MULE_ACCOUNTS_PATH else None
+except OSError:
+    pass
+
+
+def get_mule_index():
+    """The active index, or None when none is configured."""
+    return _current
+
+
+def check_mule_account(account) -> dict:
+    """
+    Look a recipient account up in the mule index.
+
+    Returns:
+        {
+            "checked": bool,
+            "listed": confirmed against the exact list,
+            "bloom_hit": bool,
+            "lookup_us": us
+        }
+    """
+    index = _current
+    if index is None or not account:
+        return {"checked": False, "listed": False, "bloom_hit": False}
+
+    start = time.perf_counter()
+    result = index.check(account)
+    _status["lookups"] += 1
+    _status["bloom_hits"] += result["bloom_hit"]
+    _status["confirmed"] += result["listed"]
+    return {
+        "checked": True,
+        **result,
+        "lookup_us": round((time.perf_counter() - start) * 1e6, 1),
+    }
+
+
+def reload_mule_accounts(force: bool = False) -> dict:
+    """
+    Rebuild and swap the index if the account file changed (or when forced).
+
+    Returns:
+        get_mule_status() after the attempt
+    """
+    global _current
+    if not MULE_ACCOUNTS_PATH:
+        return get_mule_status()
+    with _reload_lock:
+        try:
+            mtime = os.path.getmtime(MULE_ACCOUNTS_PATH)
+            if force or mtime != _status["mtime"]:
+                # Record the mtime first so a broken file is reported once, not every poll
+                _status["mtime"] = mtime
+                index = load_mule_index(MULE_ACCOUNTS_PATH)
+                if _current is None or index.checksum != _current.checksum:
+                    _current = index
+                    _status["reloads"] += 1
+                    print(f"✓ Mule account index swapped: {len(index)} accounts")
+            _status["last_error"] = None
+        except (OSError, ValueError) as e:
+            _status["last_error"] = str(e)
+            print(f"⚠ Mule account reload failed, keeping the current index: {e}")
+    return get_mule_status()
+
+
+def _watch():
+    while True:
+        time.sleep(MULE_ACCOUNTS_RELOAD_INTERVAL)
+        reload_mule_accounts()
+
+
+def start_mule_watcher():
+    """Poll MULE_ACCOUNTS_PATH for changes in a daemon thread (once per process)."""
+    global _watcher
+    if _watcher is None and MULE_ACCOUNTS_PATH and MULE_ACCOUNTS_RELOAD_INTERVAL > 0:
+        _watcher = threading.Thread(target=_watch, name="mule-account-watcher", daemon=True)
+        _watcher.start()
+    return _watcher
+
+
+def get_mule_status() -> dict:
+    index = _current
+    status = {
+        "loaded": index is not None,
+        "reloads": _status["reloads"],
+        "last_error": _status["last_error"],
+        "lookups": _status["lookups"],
+        "bloom_hits": _status["bloom_hits"],
+        "confirmed": _status["confirmed"],
+    }
+    if index is not None:
+        memory = index.memory_bytes()
+        status.update({
+            "accounts": len(index),
+            "checksum": index.checksum[:12],
+            "loaded_at": index.loaded_at,
+            "bloom_mb": round(memory["bloom"] / 2**20, 2),
+            "exact_mb": round(memory["exact"] / 2**20, 2),
+            "hashes": index.n_hashes,
+        })
+    return status
@@ -0,0 +1,257 @@
+"""Versioned, hot-reloadable phrase dictionary.
+
+Scam phrases, stress keyword weights and filler words live in one JSON
+file (PHRASES_PATH):
+
+    {"version": "...", "scam": [...], "stress": {"word": weight}, "filler": [...]}
+
+The file is compiled into a PhraseDictionary snapshot holding a single
+PhraseMatcher, plus a FuzzyPhraseMatcher over the scam phrases. When
+PHRASES_CACHE_DIR is set, the compiled matchers are pickled there, keyed
+by the file's checksum, so a cold start loads them instead of
+recompiling. Importing the module never writes the cache; the app
+writes it when it starts the watcher.
+
+A background watcher notices when the file changes, builds the new
+snapshot off the request path and swaps the module-level reference.
+Readers just take the current reference and never lock, so in-flight
+requests finish on the snapshot they started with. A file that fails to
+load leaves the active version in place.
+"""
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+from datetime import datetime
+from app.config import (
+    PHRASES_PATH,
+    PHRASES_RELOAD_INTERVAL,
+    PHRASES_CACHE_DIR,
+    FUZZY_SCAM_MATCHING,
+    FUZZY_ERROR_RATE,
+    FUZZY_MAX_ERRORS,
+    FUZZY_MAX_CANDIDATES,
+)
+from app.utils.phrase_matcher import PhraseMatcher
+from app.utils.fuzzy_matcher import FuzzyPhraseMatcher
+
+# Bump when the matcher classes change what they pickle, so caches
+# written by older code are rebuilt instead of loaded
+COMPILED_FORMAT = 2
+
+
+class PhraseDictionary:
+    """One immutable version of the phrase vocabularies and their matchers."""
+
+    def __init__(self, version: str, scam: list, stress: dict, filler: list, checksum: str, compiled: dict = None):
+        self.version = version
+        self.scam_phrases = tuple(scam)
+        self.stress_keywords = dict(stress)
+        self.filler_words = tuple(filler)
+        self.checksum = checksum
+        if compiled is None:
+            compiled = {
+                "matcher": PhraseMatcher(
+                    {"scam": scam, "stress": list(stress), "filler": filler},
+                    whole_word=("filler",),
+                ),
+                "fuzzy": FuzzyPhraseMatcher(
+                    scam,
+                    error_rate=FUZZY_ERROR_RATE,
+                    max_errors=FUZZY_MAX_ERRORS,
+                    max_candidates=FUZZY_MAX_CANDIDATES,
+                ) if FUZZY_SCAM_MATCHING else None,
+            }
+        self.matcher = compiled["matcher"]
+        self.fuzzy = compiled["fuzzy"]
+        self.from_cache = "checksum" in compiled
+        self.loaded_at = datetime.now().isoformat()
+
+    def find_fuzzy_scam(self, text: str, exact: list) -> list:
+        """Scam phrases found only approximately; exact hits are skipped."""
+        if self.fuzzy is None:
+            return []
+        return self.fuzzy.find(text, exclude=exact)
+
+
+def _compiled_path(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(PHRASES_CACHE_DIR, f"{name}.matcher.pkl")
+
+
+def _compiled_settings() -> dict:
+    return {
+        "format": COMPILED_FORMAT,
+        "fuzzy": FUZZY_SCAM_MATCHING,
+        "error_rate": FUZZY_ERROR_RATE,
+        "max_errors": FUZZY_MAX_ERRORS,
+        "max_candidates": FUZZY_MAX_CANDIDATES,
+    }
+
+
+def _load_compiled(path: str, checksum: str):
+    """The pickled matchers for this exact file content and settings, or None."""
+    if not PHRASES_CACHE_DIR:
+        return None
+    try:
+        with open(_compiled_path(path), "rb") as f:
+            if os.fstat(f.fileno()).st_mode & 0o022:
+                print(f"⚠ Ignoring group/world-writable phrase matcher cache {f.name}")
+                return None
+            compiled = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(compiled, dict):
+        return None
+    if compiled.get("checksum") != checksum or compiled.get("settings") != _compiled_settings():
+        return None
+    return compiled
+
+
+def _save_compiled(path: str, dictionary: PhraseDictionary):
+    if not PHRASES_CACHE_DIR or dictionary.from_cache:
+        return
+    target = _compiled_path(path)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(PHRASES_CACHE_DIR, mode=0o700, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "checksum": dictionary.checksum,
+                "settings": _compiled_settings(),
+                "matcher": dictionary.matcher,
+                "fuzzy": dictionary.fuzzy,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, target)
+        dictionary.from_cache = True
+    except OSError as e:
+        print(f"⚠ Could not cache compiled phrase matcher: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _validate(path: str, data):
+    """Raise ValueError unless the parsed file has the expected shape and types."""
+    if not isinstance(data, dict):
+        raise ValueError(f"Phrase file {path} must hold a JSON object")
+    scam, stress, filler = data.get("scam"), data.get("stress", {}), data.get("filler", [])
+    if not isinstance(scam, list) or not isinstance(stress, dict) or not isinstance(filler, list):
+        raise ValueError(f"Phrase file {path} needs a 'scam' list, a 'stress' object and a 'filler' list")
+    if not all(isinstance(p, str) and p.strip() for p in scam + filler):
+        raise ValueError(f"Phrase file {path} has a scam phrase or filler word that is not a non-empty string")
+    if not all(isinstance(w, (int, float)) and not isinstance(w, bool) for w in stress.values()):
+        raise ValueError(f"Phrase file {path} has a stress weight that is not a number")
+
+
+def load_phrase_dictionary(path: str = PHRASES_PATH) -> PhraseDictionary:
+    """
+    Read and compile a phrase file, using the compiled cache when it matches.
+
+    Raises:
+        ValueError: the file is missing, unreadable or malformed
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot load phrase file {path}: {e}")
+
+    _validate(path, data)
+
+    checksum = hashlib.sha256(raw).hexdigest()
+    compiled = _load_compiled(path, checksum)
+    return PhraseDictionary(
+        version=str(data.get("version", checksum[:12])),
+        scam=[p.lower() for p in data["scam"]],
+        stress={k.lower(): v for k, v in data.get("stress", {}).items()},
+        filler=[w.lower() for w in data.get("filler", [])],
+        checksum=checksum,
+        compiled=compiled,
+    )
+
+
+_current = load_phrase_dictionary()
+_reload_lock = threading.Lock()
+_status = {"reloads": 0, "last_error": None, "mtime": None}
+_watcher = None
+
+try:
+    _status["mtime"] = os.path.getmtime(PHRASES_PATH)
+except OSError:
+    pass
+
+
+def get_phrase_dictionary() -> PhraseDictionary:
+    """The active snapshot; hold on to it for the whole request."""
+    return _current
+
+
+def reload_phrases(force: bool = False) -> dict:
+    """
+    Rebuild and swap the dictionary if the file changed (or when forced).
+
+    Returns:
+        get_phrase_status() after the attempt
+    """
+    global _current
+    with _reload_lock:
+        try:
+            mtime = os.path.getmtime(PHRASES_PATH)
+            if force or mtime != _status["mtime"]:
+                # Record the mtime first so a broken file is reported once, not every poll
+                _status["mtime"] = mtime
+                dictionary = load_phrase_dictionary(PHRASES_PATH)
+                if dictionary.checksum != _current.checksum:
+                    _save_compiled(PHRASES_PATH, dictionary)
+                    previous = _current.version
+                    _current = dictionary
+                    _status["reloads"] += 1
+                    print(f"✓ Phrase dictionary {previous} -> {dictionary.version}")
+            _status["last_error"] = None
+        except (OSError, ValueError) as e:
+            _status["last_error"] = str(e)
+            print(f"⚠ Phrase reload failed, keeping version {_current.version}: {e}")
+    return get_phrase_status()
+
+
+def _watch():
+    while True:
+        time.sleep(PHRASES_RELOAD_INTERVAL)
+        try:
+            reload_phrases()
+        except Exception as e:
+            # Keep polling; the active version stays in place
+            print(f"⚠ Phrase watcher error: {e}")
+
+
+def start_phrase_watcher():
+    """
+    Cache the compiled startup dictionary and poll PHRASES_PATH for
+    changes in a daemon thread (once per process).
+    """
+    global _watcher
+    _save_compiled(PHRASES_PATH, _current)
+    if _watcher is None and PHRASES_RELOAD_INTERVAL > 0:
+        _watcher = threading.Thread(target=_watch, name="phrase-watcher", daemon=True)
+        _watcher.start()
+    return _watcher
+
+
+def get_phrase_status() -> dict:
+    dictionary = _current
+    return {
+        "version": dictionary.version,
+        "checksum": dictionary.checksum[:12],
+        "loaded_at": dictionary.loaded_at,
+        "scam_phrases": len(dictionary.scam_phrases),
+        "stress_keywords": len(dictionary.stress_keywords),
+        "filler_words": len(dictionary.filler_words),
+        "fuzzy_scam_matching": dictionary.fuzzy is not None,
+        "reloads": _status["reloads"],
+        "last_error": _status["last_error"],
+    }
@@ -0,0 +1,120 @@
+"""Multi-pattern phrase matching with an Aho-Corasick automaton.
+
+All vocabularies (scam phrases, stress keywords, filler words, ...) are
+compiled into one automaton, so a transcript is scanned once no matter how
+many phrases there are. Matching keeps the semantics of the substring
+checks it replaces: patterns match anywhere in the lowercased text, except
+whole-word vocabularies, which must be bounded by spaces or the ends of the
+text.
+"""
+from collections import deque
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over several named vocabularies."""
+
+    def __init__(self, vocabularies: dict, whole_word: tuple = ()):
+        """
+        Args:
+            vocabularies: {category: [phrase, ...]}; phrases are lowercased
+            whole_word: Categories whose phrases must match whole words
+        """
+        self.categories = list(vocabularies)
+        self._patterns = []  # (category, phrase, length, whole_word)
+        for category, phrases in vocabularies.items():
+            for phrase in phrases:
+                phrase = phrase.lower()
+                if phrase:
+                    self._patterns.append((category, phrase, len(phrase), category in whole_word))
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._build()
+
+    def __len__(self):
+        return len(self._patterns)
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def _build(self):
+        goto, out = self._goto, self._out
+        for index, (_, phrase, _, _) in enumerate(self._patterns):
+            state = 0
+            for ch in phrase:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    self._fail.append(0)
+                    out.append(())
+                state = nxt
+            out[state] += (index,)
+
+        # Breadth-first failure links; each state inherits its fallback's outputs
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = goto[fallback].get(ch, 0)
+                out[nxt] += out[self._fail[nxt]]
+
+    def _resolve(self, state: int, ch: str) -> int:
+        """
+        Follow failure links for a missing transition.
+
+        find() caches the answer as a direct edge, so the automaton turns
+        into a DFA over the characters actually seen and each character
+        costs one dict lookup. The cached edge is deterministic, so
+        concurrent scans may race to write it harmlessly.
+        """
+        goto, fail = self._goto, self._fail
+        while state and ch not in goto[state]:
+            state = fail[state]
+        return goto[state].get(ch, 0)
+
+    def find(self, text: str, lowered: bool = False) -> dict:
+        """
+        Scan text once and report every vocabulary hit.
+
+        Args:
+            text: Text to scan; it is lowercased here
+            lowered: The caller already lowercased text
+
+        Returns:
+            {category: [phrase, ...]} with each phrase reported once, in
+            vocabulary order; every category is present
+        """
+        if not lowered:
+            text = text.lower()
+        goto, out, patterns = self._goto, self._out, self._patterns
+        last = len(text) - 1
+        hits = set()
+        state = 0
+        for pos, ch in enumerate(text):
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = goto[state][ch] = self._resolve(state, ch)
+            state = nxt
+            for index in out[state]:
+                if index in hits:
+                    continue
+                _, _, length, whole = patterns[index]
+                if whole:
+                    start = pos - length + 1
+                    if (start > 0 and text[start - 1] != " ") or (pos < last and text[pos + 1] != " "):
+                        continue
+                hits.add(index)
+
+        found = {category: [] for category in self.categories}
+        for index in sorted(hits):
+            category, phrase, _, _ = patterns[index]
+            found[category].append(phrase)
+        return found
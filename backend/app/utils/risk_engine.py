@@ -0,0 +1,381 @@
+"""Table-driven transaction risk scoring.
+
+The weights and cut-offs behind calculate_transaction_risk() live in a
+JSON rule table (RISK_RULES_PATH):
+
+    {
+        "version": "...",
+        "amount_bands": [{"above", "points", "factor"}, ...],
+        "scam_phrases": {"points_each", "max_points", "factor"},
+        "scam_fuzzy": {"points_each", "max_points", "factor"},
+        "scam_classifier": {"max_points", "min_probability", "factor"},
+        "liveness_failed": {"points", "factor"},
+        "stress": {"<level>": {"points", "factor"}, ...},
+        "voice_blacklist": {"points", "min_similarity", "factor"},
+        "mule_account": {"points", "factor"},
+        "velocity": [{"window", "min_count" and/or "min_amount", "points", "factor"}, ...],
+        "profile": {
+            "min_transfers": 5,
+            "amount_zscore": {"min_z", "points", "factor"},
+            "new_recipient": {"points", "factor"},
+            "unusual_hour": {"max_share", "points", "factor"}
+        },
+        "levels": [{"min_score", "level"}, ...],
+        "additional_verification_score": 50,
+        "max_score": 100
+    }
+
+The highest amount band the amount is strictly above applies, and the
+highest level whose min_score the score reaches. A null min_probability
+or min_similarity falls back to the loaded classifier's threshold and
+VOICE_BLACKLIST_THRESHOLD. scam_fuzzy scores phrases only matched despite
+ASR errors, which are weaker evidence than exact ones. mule_account applies when the recipient is
+confirmed on the mule account list. Each velocity rule fires on its own when the
+user's transfers in that window (one of VELOCITY_WINDOWS) reach all of
+its minimums. Profile rules only apply once the user's behavioural profile
+holds min_transfers transfers: amount_zscore when the amount is at least
+min_z standard deviations above their usual, new_recipient on a first
+transfer to the recipient, and unusual_hour when at most max_share of
+their past transfers were within an hour of now. Levels and verification
+use the uncapped score; the reported score is capped at max_score.
+
+A table compiles into a RiskRules evaluator with two entry points that
+share those semantics: evaluate() for one transaction, with factor texts,
+and evaluate_batch() for NumPy columns of any length, with a bitmask of
+the rules each row triggered.
+"""
+import json
+import numpy as np
+from app.config import RISK_RULES_PATH, VOICE_BLACKLIST_THRESHOLD, VELOCITY_WINDOWS
+from app.utils.scam_classifier import get_scam_classifier
+from app.utils.velocity import window_label
+
+
+# Profile rules in evaluation order, with the fields each one needs
+_PROFILE_RULES = (
+    ("amount_zscore", ("min_z", "points", "factor")),
+    ("new_recipient", ("points", "factor")),
+    ("unusual_hour", ("max_share", "points", "factor")),
+)
+
+
+def _rule(table: dict, key: str, fields: tuple) -> dict:
+    rule = table.get(key)
+    if not isinstance(rule, dict) or any(field not in rule for field in fields):
+        raise ValueError(f"Risk rule '{key}' needs {', '.join(fields)}")
+    return rule
+
+
+def _profile_rule_fires(name: str, rule: dict, profile: dict) -> bool:
+    if name == "amount_zscore":
+        return profile["amount_z"] is not None and profile["amount_z"] >= rule["min_z"]
+    if name == "new_recipient":
+        return bool(profile["new_recipient"])
+    return profile["hour_share"] is not None and profile["hour_share"] <= rule["max_share"]
+
+
+class RiskRules:
+    """A compiled rule table."""
+
+    def __init__(self, table: dict):
+        self.version = str(table.get("version", "default"))
+        try:
+            bands = sorted(table["amount_bands"], key=lambda band: -band["above"])
+            self.amount_bands = [(band["above"], band["points"], band["factor"]) for band in bands]
+            self.levels = [
+                (level["min_score"], level["level"])
+                for level in sorted(table["levels"], key=lambda level: -level["min_score"])
+            ]
+            self.stress = [(name, rule["points"], rule["factor"]) for name, rule in table.get("stress", {}).items()]
+            self.velocity = [
+                (rule["window"], rule.get("min_count"), rule.get("min_amount"), rule["points"], rule["factor"])
+                for rule in table.get("velocity", [])
+            ]
+            profile = table.get("profile", {})
+            self.profile_min_transfers = profile.get("min_transfers", 0)
+            self.profile = [(name, _rule(profile, name, fields)) for name, fields in _PROFILE_RULES if name in profile]
+            self.verification_score = table["additional_verification_score"]
+            self.max_score = table["max_score"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed risk rule table: {e}")
+        if not self.levels or self.levels[-1][0] > 0:
+            raise ValueError("Risk levels need one with min_score 0")
+        for window, min_count, min_amount, _, _ in self.velocity:
+            if window not in VELOCITY_WINDOWS:
+                raise ValueError(f"Velocity rule window {window} is not one of VELOCITY_WINDOWS")
+            if min_count is None and min_amount is None:
+                raise ValueError(f"Velocity rule for window {window} needs min_count or min_amount")
+
+        self.scam_phrases = _rule(table, "scam_phrases", ("points_each", "max_points", "factor"))
+        self.scam_fuzzy = (
+            _rule(table, "scam_fuzzy", ("points_each", "max_points", "factor")) if "scam_fuzzy" in table else None
+        )
+        self.scam_classifier = _rule(table, "scam_classifier", ("max_points", "factor"))
+        self.liveness_failed = _rule(table, "liveness_failed", ("points", "factor"))
+        self.voice_blacklist = _rule(table, "voice_blacklist", ("points", "factor"))
+        self.mule_account = _rule(table, "mule_account", ("points", "factor")) if "mule_account" in table else None
+        self.min_similarity = self.voice_blacklist.get("min_similarity")
+        if self.min_similarity is None:
+            self.min_similarity = VOICE_BLACKLIST_THRESHOLD
+        self.min_probability = self.scam_classifier.get("min_probability")
+        if self.min_probability is None:
+            classifier = get_scam_classifier()
+            self.min_probability = classifier.threshold if classifier is not None else 0.0
+
+        # Bit i of evaluate_batch()'s "rules_fired" is rule_names[i]
+        self.rule_names = (
+            [f"amount_above_{above}" for above, _, _ in self.amount_bands]
+            + ["scam_phrases"]
+            + (["scam_fuzzy"] if self.scam_fuzzy is not None else [])
+            + ["scam_classifier", "liveness_failed"]
+            + [f"stress_{name}" for name, _, _ in self.stress]
+            + ["voice_blacklist"]
+            + (["mule_account"] if self.mule_account is not None else [])
+            + [
+                f"velocity_{window_label(window)}_{'count' if min_count is not None else 'amount'}"
+                for window, min_count, _, _, _ in self.velocity
+            ]
+            + [f"profile_{name}" for name, _ in self.profile]
+        )
+        if len(self.rule_names) > 64:
+            raise ValueError("Risk rule table has more than 64 rules")
+
+    def scam_points(self, count: int) -> int:
+        """Points for count detected scam phrases."""
+        return min(count * self.scam_phrases["points_each"], self.scam_phrases["max_points"])
+
+    def fuzzy_points(self, count: int) -> int:
+        """Points for count scam phrases matched only despite ASR errors."""
+        if self.scam_fuzzy is None:
+            return 0
+        return min(count * self.scam_fuzzy["points_each"], self.scam_fuzzy["max_points"])
+
+    def _level(self, score) -> str:
+        for min_score, level in self.levels:
+            if score >= min_score:
+                return level
+        return self.levels[-1][1]
+
+    def evaluate(
+        self,
+        amount: float,
+        scam_phrases: list,
+        is_liveness_passed: bool,
+        stress_level: str,
+        scam_probability: float = None,
+        voice_blacklist_similarity: float = None,
+        velocity: dict = None,
+        profile: dict = None,
+        mule_account: bool = False,
+        fuzzy_phrases: list = (),
+    ) -> dict:
+        """
+        Score one transaction.
+
+        velocity is the user's {window seconds: (count, amount)}, as from
+        VelocityStore.query(), and profile how the transfer compares with
+        their history, as from ProfileStore.features(); without them no
+        velocity or profile rule fires.
+
+        Returns:
+            {"risk_score", "risk_level", "factors", "requires_additional_verification"}
+        """
+        risk_score = 0
+        factors = []
+
+        for above, points, factor in self.amount_bands:
+            if amount > above:
+                risk_score += points
+                factors.append(factor)
+                break
+
+        risk_score += self.scam_points(len(scam_phrases))
+        if scam_phrases:
+            factors.append(self.scam_phrases["factor"].format(phrases=", ".join(scam_phrases)))
+
+        if fuzzy_phrases and self.scam_fuzzy is not None:
+            risk_score += self.fuzzy_points(len(fuzzy_phrases))
+            factors.append(self.scam_fuzzy["factor"].format(phrases=", ".join(fuzzy_phrases)))
+
+        if scam_probability is not None and scam_probability >= self.min_probability:
+            risk_score += round(self.scam_classifier["max_points"] * scam_probability)
+            factors.append(self.scam_classifier["factor"].format(probability=scam_probability))
+
+        if not is_liveness_passed:
+            risk_score += self.liveness_failed["points"]
+            factors.append(self.liveness_failed["factor"])
+
+        for name, points, factor in self.stress:
+            if stress_level == name:
+                risk_score += points
+                factors.append(factor)
+                break
+
+        if voice_blacklist_similarity is not None and voice_blacklist_similarity >= self.min_similarity:
+            risk_score += self.voice_blacklist["points"]
+            factors.append(self.voice_blacklist["factor"].format(similarity=voice_blacklist_similarity))
+
+        if mule_account and self.mule_account is not None:
+            risk_score += self.mule_account["points"]
+            factors.append(self.mule_account["factor"])
+
+        if velocity is not None:
+            for window, min_count, min_amount, points, factor in self.velocity:
+                count, amount_sum = velocity[window]
+                if (min_count is None or count >= min_count) and (min_amount is None or amount_sum >= min_amount):
+                    risk_score += points
+                    factors.append(factor.format(count=count, amount=amount_sum))
+
+        if profile is not None and profile["transfers"] >= self.profile_min_transfers:
+            for name, rule in self.profile:
+                if _profile_rule_fires(name, rule, profile):
+                    risk_score += rule["points"]
+                    factors.append(rule["factor"].format(z=profile["amount_z"], hour=profile["hour"]))
+
+        return {
+            "risk_score": min(risk_score, self.max_score),
+            "risk_level": self._level(risk_score),
+            "factors": factors,
+            "requires_additional_verification": risk_score >= self.verification_score,
+        }
+
+    def evaluate_batch(
+        self,
+        amount,
+        scam_count,
+        is_liveness_passed,
+        stress_level,
+        scam_probability=None,
+        voice_blacklist_similarity=None,
+        velocity=None,
+        profile=None,
+        mule_account=None,
+        fuzzy_count=None,
+    ) -> dict:
+        """
+        Score columns of transactions; evaluate() row by row, vectorized.
+
+        Args:
+            amount: (N,) amounts
+            scam_count: (N,) detected scam phrase counts
+            is_liveness_passed: (N,) truthy values
+            stress_level: (N,) stress level strings
+            scam_probability: (N,) classifier probabilities, NaN for none
+            voice_blacklist_similarity: (N,) similarities, NaN for none
+            velocity: {window seconds: ((N,) counts, (N,) amount sums)}
+            profile: {"transfers": (N,) counts, "amount_z", "hour_share": (N,)
+                floats with NaN for none, "new_recipient": (N,) bools}
+            mule_account: (N,) bools, recipient confirmed as a mule account
+            fuzzy_count: (N,) scam phrase counts matched only despite ASR errors
+
+        Returns:
+            {
+                "risk_score": (N,) int64, "risk_level": (N,) str,
+                "requires_additional_verification": (N,) bool,
+                "rules_fired": (N,) uint64 bitmask over rule_names
+            }
+        """
+        amount = np.asarray(amount, dtype=np.float64)
+        n = len(amount)
+        score = np.zeros(n, dtype=np.int64)
+        fired = np.zeros(n, dtype=np.uint64)
+        bit = 0
+
+        def add(mask, points):
+            nonlocal score, fired, bit
+            score += np.where(mask, points, 0).astype(np.int64)
+            fired |= mask.astype(np.uint64) << np.uint64(bit)
+            bit += 1
+
+        # First matching band only, as in evaluate()
+        unmatched = np.ones(n, dtype=bool)
+        for above, points, _ in self.amount_bands:
+            mask = unmatched & (amount > above)
+            unmatched &= ~mask
+            add(mask, points)
+
+        scam_count = np.asarray(scam_count, dtype=np.int64)
+        score += np.minimum(scam_count * self.scam_phrases["points_each"], self.scam_phrases["max_points"])
+        add(scam_count > 0, 0)
+
+        if self.scam_fuzzy is not None:
+            fuzzy_count = np.zeros(n, dtype=np.int64) if fuzzy_count is None else np.asarray(fuzzy_count, dtype=np.int64)
+            add(fuzzy_count > 0, np.minimum(fuzzy_count * self.scam_fuzzy["points_each"], self.scam_fuzzy["max_points"]))
+
+        probability = np.full(n, np.nan) if scam_probability is None else np.asarray(scam_probability, dtype=np.float64)
+        mask = probability >= self.min_probability  # NaN compares False
+        add(mask, np.round(self.scam_classifier["max_points"] * np.where(mask, probability, 0.0)))
+
+        add(~np.asarray(is_liveness_passed, dtype=bool), self.liveness_failed["points"])
+
+        stress_level = np.asarray(stress_level)
+        for name, points, _ in self.stress:
+            add(stress_level == name, points)
+
+        similarity = (
+            np.full(n, np.nan) if voice_blacklist_similarity is None
+            else np.asarray(voice_blacklist_similarity, dtype=np.float64)
+        )
+        add(similarity >= self.min_similarity, self.voice_blacklist["points"])
+
+        if self.mule_account is not None:
+            mule = np.zeros(n, dtype=bool) if mule_account is None else np.asarray(mule_account, dtype=bool)
+            add(mule, self.mule_account["points"])
+
+        for window, min_count, min_amount, points, _ in self.velocity:
+            mask = np.zeros(n, dtype=bool)
+            if velocity is not None:
+                counts, amount_sums = velocity[window]
+                mask[:] = True
+                if min_count is not None:
+                    mask &= np.asarray(counts) >= min_count
+                if min_amount is not None:
+                    mask &= np.asarray(amount_sums, dtype=np.float64) >= min_amount
+            add(mask, points)
+
+        for name, rule in self.profile:
+            mask = np.zeros(n, dtype=bool)
+            if profile is not None:
+                if name == "amount_zscore":
+                    mask = np.asarray(profile["amount_z"], dtype=np.float64) >= rule["min_z"]
+                elif name == "new_recipient":
+                    mask = np.asarray(profile["new_recipient"], dtype=bool)
+                else:
+                    mask = np.asarray(profile["hour_share"], dtype=np.float64) <= rule["max_share"]
+                mask = mask & (np.asarray(profile["transfers"]) >= self.profile_min_transfers)
+            add(mask, rule["points"])
+
+        levels = np.array([level for _, level in self.levels])
+        cut_offs = np.array([min_score for min_score, _ in self.levels])
+        # Levels are sorted by descending min_score: count the cut-offs the score misses
+        level_index = np.minimum((score[:, None] < cut_offs[None, :]).sum(axis=1), len(levels) - 1)
+
+        return {
+            "risk_score": np.minimum(score, self.max_score),
+            "risk_level": levels[level_index],
+            "requires_additional_verification": score >= self.verification_score,
+            "rules_fired": fired,
+        }
+
+
+def load_risk_rules(path: str = RISK_RULES_PATH) -> RiskRules:
+    """
+    Read and compile a rule table.
+
+    Raises:
+        ValueError: the file is missing, unreadable or malformed
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot load risk rules {path}: {e}")
+    return RiskRules(table)
+
+
+_rules = load_risk_rules()
+
+
+def get_risk_rules() -> RiskRules:
+    """The process-wide compiled rule table."""
+    return _rules
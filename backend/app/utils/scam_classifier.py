@@ -0,0 +1,176 @@
+"""Linear scam classifier over hashed word n-grams.
+
+Keyword lists only catch scripts someone has already written down. This
+logistic-regression model scores a transcript from its word unigrams and
+bigrams, hashed into a fixed-size weight vector, so new wordings of known
+scam scripts still score high.
+
+The weights are a float32 .npy opened with mmap_mode="r", so the web
+process and every batch-scoring worker map the same read-only pages.
+Scoring one transcript is one hash per n-gram and a gather-sum over the
+mapped weights; a batch is a single gather plus a bincount.
+
+Files for a model at <path>.npy:
+    <path>.npy            (n_features,) float32 weights
+    <path>.meta.json      {"version", "n_features", "bias", "threshold", "examples"}
+"""
+import os
+import json
+import zlib
+from datetime import datetime
+from typing import Optional, Union
+import numpy as np
+from app.config import SCAM_CLASSIFIER_PATH
+from app.utils.text_context import TextContext, as_text_context
+
+# TextContext key holding this model's probability for the transcript
+_PROBABILITY_KEY = "scam_probability"
+
+
+def _sidecar(path: str, suffix: str) -> str:
+    return f"{path[:-4] if path.endswith('.npy') else path}.{suffix}"
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def hashed_features(text: Union[str, TextContext], n_features: int) -> np.ndarray:
+    """Sorted, distinct weight indices of the text's word unigrams and bigrams."""
+    ctx = as_text_context(text)
+
+    def compute():
+        words = ctx.words
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        mask = n_features - 1
+        hashed = np.fromiter((zlib.crc32(g.encode()) & mask for g in grams), dtype=np.int64, count=len(grams))
+        return np.unique(hashed)
+
+    return ctx.derive(f"hashed_features_{n_features}", compute)
+
+
+def _sparse_rows(texts: list, n_features: int):
+    """Concatenated feature indices plus the row each one belongs to."""
+    rows = [hashed_features(text, n_features) for text in texts]
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    return indices, np.repeat(np.arange(len(rows)), lengths)
+
+
+def train_scam_classifier(
+    texts: list,
+    labels: list,
+    path: str,
+    n_features: int = 2 ** 18,
+    epochs: int = 300,
+    learning_rate: float = 2.0,
+    l2: float = 1e-5,
+    threshold: float = 0.5,
+    version: str = None,
+):
+    """
+    Fit the model with full-batch gradient descent and write it to path.
+
+    Args:
+        texts: Transcripts
+        labels: 1 for scam, 0 for legitimate, one per text
+        path: Target .npy path
+        n_features: Hashed feature space; a power of two
+        epochs: Gradient steps
+        learning_rate: Step size
+        l2: L2 penalty on the weights
+        threshold: Probability above which calculate_transaction_risk
+            counts the transcript as scam-like
+        version: Label stored with the model (default: training time)
+    """
+    if n_features <= 0 or n_features & (n_features - 1):
+        raise ValueError("n_features must be a power of two")
+    y = np.asarray(labels, dtype=np.float64)
+    if len(y) != len(texts) or not len(y):
+        raise ValueError("need one label per text")
+
+    indices, row_ids = _sparse_rows(texts, n_features)
+    weights = np.zeros(n_features, dtype=np.float64)
+    bias = 0.0
+    for _ in range(epochs):
+        z = bias + np.bincount(row_ids, weights=weights[indices], minlength=len(y))
+        error = _sigmoid(z) - y
+        grad = np.bincount(indices, weights=error[row_ids], minlength=n_features) / len(y)
+        weights -= learning_rate * (grad + l2 * weights)
+        bias -= learning_rate * error.mean()
+
+    np.save(path, weights.astype(np.float32))
+    meta = {
+        "version": version or datetime.now().strftime("%Y%m%d%H%M%S"),
+        "n_features": n_features,
+        "bias": bias,
+        "threshold": threshold,
+        "examples": len(y),
+    }
+    with open(_sidecar(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+class ScamClassifier:
+    """Read-only, memory-mapped hashed n-gram logistic regression."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.weights = np.load(path, mmap_mode="r")
+        with open(_sidecar(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.n_features = meta["n_features"]
+        self.bias = float(meta["bias"])
+        self.threshold = float(meta["threshold"])
+        if self.weights.shape != (self.n_features,):
+            raise ValueError(f"{path}: expected {self.n_features} weights, found {self.weights.shape}")
+
+    def predict_proba(self, text: Union[str, TextContext]) -> float:
+        """Probability that one transcript is a scam; memoized on its context."""
+        ctx = as_text_context(text)
+
+        def compute():
+            features = hashed_features(ctx, self.n_features)
+            return float(_sigmoid(self.bias + float(self.weights[features].sum(dtype=np.float64))))
+
+        return ctx.derive(_PROBABILITY_KEY, compute)
+
+    def predict_proba_batch(self, texts: list) -> np.ndarray:
+        """
+        Probabilities for many transcripts with one gather over the weights.
+        Contexts passed in get their probability memoized for later analyzers.
+        """
+        indices, row_ids = _sparse_rows(texts, self.n_features)
+        z = self.bias + np.bincount(row_ids, weights=self.weights[indices], minlength=len(texts))
+        probabilities = _sigmoid(z)
+        for text, p in zip(texts, probabilities):
+            if isinstance(text, TextContext):
+                text.derive(_PROBABILITY_KEY, lambda p=p: float(p))
+        return probabilities
+
+
+def _load_classifier():
+    if not SCAM_CLASSIFIER_PATH or not os.path.exists(SCAM_CLASSIFIER_PATH):
+        return None
+    classifier = ScamClassifier(SCAM_CLASSIFIER_PATH)
+    print(f"✓ Mapped scam classifier {classifier.version}: {classifier.n_features} hashed features")
+    return classifier
+
+
+_classifier = _load_classifier()
+
+
+def get_scam_classifier() -> Optional[ScamClassifier]:
+    """The process-wide classifier, or None when none is configured."""
+    return _classifier
+
+
+def scam_probability(text: Union[str, TextContext]) -> Optional[float]:
+    """Classifier probability for a transcript, or None without a model."""
+    return None if _classifier is None else _classifier.predict_proba(text)
+
+
+def scam_probabilities(texts: list) -> Optional[np.ndarray]:
+    """Vectorized scam_probability() for a batch, or None without a model."""
+    return None if _classifier is None else _classifier.predict_proba_batch(texts)
@@ -1,23 +1,15 @@
 """Security and validation utilities."""
 import re
 import hashlib
+from typing import Union
 from datetime import datetime, timedelta
-
-# List of scam/suspicious phrases
-SCAM_PHRASES = [
-    "account is blocked",
-    "share otp",
-    "kyc expired",
-    "verification from bank",
-    "urgent action required",
-    "account suspended",
-    "confirm your details",
-    "update your password",
-    "click this link",
-    "verify identity",
-    "click here immediately",
-    "unusual activity detected",
-]
+from app.utils.text_context import TextContext, as_text_context
+from app.utils.scam_classifier import scam_probability
+from app.utils.risk_engine import get_risk_rules
+from app.utils.velocity import user_velocity, label_velocity, user_transfers_recorded
+from app.utils.user_profile import profile_features
+from app.utils.mule_accounts import check_mule_account, get_mule_index
+from app.utils.phrase_dictionary import get_phrase_dictionary
 
 # Challenge phrases for liveness verification
 LIVENESS_CHALLENGES = [
@@ -32,12 +24,12 @@ LIVENESS_CHALLENGES = [
 ]
 
 
-def validate_challenge(transcript: str, challenge_phrase: str) -> dict:
+def validate_challenge(transcript: Union[str, TextContext], challenge_phrase: str) -> dict:
     """
-    Validate if transcript contains the challenge phrase.
+    Validate if transcript (text or TextContext) contains the challenge phrase.
     Returns confidence score and whether verification passed.
     """
-    transcript_normalized = transcript.lower().strip()
+    transcript_normalized = as_text_context(transcript).normalized
     challenge_normalized = challenge_phrase.lower().strip()
     
     score = 0
@@ -67,32 +59,42 @@ def validate_challenge(transcript: str, challenge_phrase: str) -> dict:
     }
 
 
-def detect_scam_phrases(text: str) -> dict:
+def detect_scam_phrases(text: Union[str, TextContext]) -> dict:
     """
-    Detect known scam phrases in text.
+    Detect known scam phrases in text (or a TextContext). Phrases only matched
+    despite ASR errors are listed under "fuzzy_matches", not "phrases", and
+    scored with the lower-weighted scam_fuzzy rule. The trained classifier's
+    probability is reported alongside when one is loaded.
     """
-    text_lower = text.lower()
-    detected = []
-    
-    for phrase in SCAM_PHRASES:
-        if phrase in text_lower:
-            detected.append(phrase)
+    ctx = as_text_context(text)
+    matches = ctx.matches()
+    fuzzy = matches["scam_fuzzy"]
+    detected = matches["scam"]
     
-    risk_score = min(len(detected) * 25, 100)
+    rules = get_risk_rules()
+    risk_score = rules.scam_points(len(detected)) + rules.fuzzy_points(len(fuzzy))
     
     return {
         "detected": len(detected) > 0,
         "phrases": detected,
         "count": len(detected),
+        "fuzzy_matches": fuzzy,
         "risk_score": risk_score,
+        "scam_probability": scam_probability(ctx),
+        "phrase_version": matches["version"],
     }
 
 
 def calculate_transaction_risk(
     amount: float,
-    transcript: str,
+    transcript: Union[str, TextContext],
     is_liveness_passed: bool,
     stress_level: str,
+    voice_blacklist_similarity: float = None,
+    user_id: str = None,
+    recipient_account: str = None,
+    velocity: dict = None,
+    profile: dict = None,
 ) -> dict:
     """
     Calculate overall risk score for a transaction.
@@ -100,60 +102,85 @@ def calculate_transaction_risk(
     Factors:
     - Amount (larger amounts = higher risk)
     - Scam phrases detected
+    - Trained scam classifier probability (when a model is loaded)
     - Liveness verification passed
     - Stress/emotion indicators
-    """
-    risk_score = 0
-    factors = []
-    
-    # Amount-based risk (0-30 points)
-    if amount > 100000:
-        risk_score += 30
-        factors.append("High-value transfer (>₹100k)")
-    elif amount > 50000:
-        risk_score += 20
-        factors.append("Medium-high value transfer (>₹50k)")
-    elif amount > 10000:
-        risk_score += 10
-        factors.append("Medium value transfer (>₹10k)")
+    - Caller voice matching the fraudster blacklist
+    - The user's recent transfer velocity (when user_id is given)
+    - How the amount, time and recipient compare with the user's history
+    - The recipient account being a reported mule account
     
-    # Scam phrase detection (0-40 points)
+    Weights, bands and level cut-offs come from the risk rule table.
+    velocity and profile are the user's user_velocity() and
+    profile_features(); they are looked up here unless given, as batch
+    workers are, by the process that owns the stores.
+    """
     scam_check = detect_scam_phrases(transcript)
-    risk_score += scam_check["risk_score"]
-    if scam_check["detected"]:
-        factors.append(f"Scam phrases detected: {', '.join(scam_check['phrases'])}")
-    
-    # Liveness verification (0-20 points)
-    if not is_liveness_passed:
-        risk_score += 20
-        factors.append("Failed voice liveness verification")
-    
-    # Stress indicators (0-10 points)
-    if stress_level == "high":
-        risk_score += 10
-        factors.append("High stress detected in voice")
-    elif stress_level == "medium":
-        risk_score += 5
-        factors.append("Moderate stress detected")
-    
-    # Determine risk level
-    if risk_score >= 70:
-        risk_level = "CRITICAL"
-    elif risk_score >= 50:
-        risk_level = "HIGH"
-    elif risk_score >= 30:
-        risk_level = "MEDIUM"
-    else:
-        risk_level = "LOW"
-    
+    if user_id and velocity is None:
+        velocity = user_velocity(user_id)
+    if user_id and profile is None:
+        profile = profile_features(user_id, amount, recipient_account)
+    mule = check_mule_account(recipient_account)
+    result = get_risk_rules().evaluate(
+        amount=amount,
+        scam_phrases=scam_check["phrases"],
+        is_liveness_passed=is_liveness_passed,
+        stress_level=stress_level,
+        scam_probability=scam_check["scam_probability"],
+        voice_blacklist_similarity=voice_blacklist_similarity,
+        velocity=velocity,
+        profile=profile,
+        mule_account=mule["listed"],
+        fuzzy_phrases=[m["phrase"] for m in scam_check["fuzzy_matches"]],
+    )
+    if velocity is not None:
+        result["velocity"] = label_velocity(velocity)
+    if profile is not None:
+        result["profile"] = {
+            "transfers": profile["transfers"],
+            "amount_z": None if profile["amount_z"] is None else round(profile["amount_z"], 2),
+            "new_recipient": profile["new_recipient"],
+            "hour_share": None if profile["hour_share"] is None else round(profile["hour_share"], 3),
+        }
+    if mule["checked"]:
+        result["mule_account"] = mule
+    result["scam_probability"] = scam_check["scam_probability"]
+    result["phrase_version"] = scam_check["phrase_version"]
+    return result
+
+
+def risk_state(user_id: str = None) -> dict:
+    """
+    Versions of the state calculate_transaction_risk() reads besides its
+    arguments: phrase dictionary, rule table, mule index and, for a user,
+    how many transfers they have made. Part of its decision cache key.
+    """
+    index = get_mule_index()
     return {
-        "risk_score": min(risk_score, 100),
-        "risk_level": risk_level,
-        "factors": factors,
-        "requires_additional_verification": risk_score >= 50,
+        "phrases": get_phrase_dictionary().checksum,
+        "rules": get_risk_rules().version,
+        "mule_accounts": index.checksum if index is not None else None,
+        "transfers": user_transfers_recorded(user_id) if user_id else None,
     }
 
 
+def risk_recommendations(risk_level: str) -> list:
+    """Suggested next steps for a risk level."""
+    if risk_level == "CRITICAL":
+        return [
+            "Block transaction - extreme risk detected",
+            "Contact customer support immediately",
+        ]
+    if risk_level == "HIGH":
+        return [
+            "Request additional verification (OTP/2FA)",
+            "Confirm transaction details with customer",
+        ]
+    if risk_level == "MEDIUM":
+        return ["Request verification code"]
+    return ["Proceed with transaction"]
+
+
 def generate_otp(length: int = 6) -> str:
     """Generate a random OTP."""
     import random
@@ -0,0 +1,62 @@
+"""Key -> row mapping for fixed-stride per-user arrays.
+
+Per-user stores (velocity, behavioural profiles) keep every user's state
+in flat arrays at a fixed stride and only need to know which row belongs
+to which user. SlotIndex hands out rows, asks the owner to grow its
+arrays by doubling until max_slots, and past that recycles the row of the
+least recently active key. Callers hold their own lock.
+"""
+from collections import OrderedDict
+
+_INITIAL_SLOTS = 1024
+
+
+class SlotIndex:
+    """LRU-recycled row numbers for up to max_slots keys."""
+
+    def __init__(self, max_slots: int, grow, initial: int = _INITIAL_SLOTS):
+        """
+        Args:
+            max_slots: Most keys held at once
+            grow: Callback grow(n_slots) that extends the owner's arrays
+            initial: Rows allocated up front
+        """
+        self.max_slots = max_slots
+        self.capacity = 0
+        self._grow = grow
+        self._slots = OrderedDict()  # key -> row, least recently active first
+        self._free = []
+        self._extend(min(initial, max_slots))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _extend(self, n_slots: int):
+        self._grow(n_slots)
+        self._free.extend(range(n_slots - 1, self.capacity - 1, -1))
+        self.capacity = n_slots
+
+    def get(self, key):
+        """The key's row, or None; does not count as activity."""
+        return self._slots.get(key)
+
+    def acquire(self, key) -> tuple:
+        """
+        The key's row, marked most recently active.
+
+        Returns:
+            (row, new) where new means the row must be reset by the caller
+        """
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+            return slot, False
+        if not self._free:
+            if self.capacity < self.max_slots:
+                self._extend(min(self.capacity * 2, self.max_slots))
+            else:
+                _, slot = self._slots.popitem(last=False)
+                self._free.append(slot)
+        slot = self._free.pop()
+        self._slots[key] = slot
+        return slot, True
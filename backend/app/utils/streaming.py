@@ -0,0 +1,165 @@
+"""Streaming transcription sessions with partial results.
+
+Audio arrives as 16 kHz mono 16-bit PCM chunks. Once enough new audio has
+accumulated, the uncommitted tail of the stream (at most a sliding window)
+is decoded. Whisper segments that are followed by another segment are
+treated as stable and committed; the last one stays tentative until more
+audio arrives. Scam-phrase and stress checks run on every partial.
+
+Window decodes run on the transcription worker pool, so streams share its
+queue limits and a busy pool rejects a chunk instead of blocking on it.
+"""
+import time
+import uuid
+import threading
+import numpy as np
+from app.config import (
+    STREAM_WINDOW_SECONDS,
+    STREAM_STEP_SECONDS,
+    STREAM_SESSION_TTL,
+    STREAM_MAX_SESSIONS,
+)
+from app.utils.ml_utils import detect_emotion, detect_scam_phrases
+from app.utils.transcription_pool import submit_stream_window
+from app.utils.audio_io import SAMPLE_RATE
+from app.utils.text_context import TextContext
+
+# Text carried over as decoding prompt between windows
+_PROMPT_CHARS = 200
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class StreamingSession:
+    """Incrementally decoded audio stream for one caller."""
+
+    def __init__(self, user_id: str):
+        self.session_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        self.committed_text = ""
+        self.tentative_text = ""
+        self.total_samples = 0
+        self.first_risk_signal_at = None
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._pending_samples = 0
+        self._lock = threading.Lock()
+
+    @property
+    def text(self) -> str:
+        return " ".join(part for part in (self.committed_text, self.tentative_text) if part)
+
+    def add_chunk(self, samples: np.ndarray) -> dict:
+        """
+        Append audio and decode the window if a full step has arrived.
+
+        Raises:
+            TranscriptionUnavailable, TranscriptionTimeout: the decode was not
+                run; the chunk is dropped so the client can resend it
+        """
+        with self._lock:
+            self.last_seen = time.time()
+            previous = (self._audio, self.total_samples, self._pending_samples)
+            self._audio = np.concatenate([self._audio, samples])
+            self.total_samples += len(samples)
+            self._pending_samples += len(samples)
+
+            decode_ms = None
+            if self._pending_samples >= STREAM_STEP_SECONDS * SAMPLE_RATE:
+                try:
+                    decode_ms = self._decode(final=False)
+                except Exception:
+                    self._audio, self.total_samples, self._pending_samples = previous
+                    raise
+
+            return self._result(final=False, decode_ms=decode_ms)
+
+    def finish(self) -> dict:
+        """Decode whatever audio is left and return the final transcript."""
+        with self._lock:
+            decode_ms = self._decode(final=True) if len(self._audio) else 0.0
+            return self._result(final=True, decode_ms=decode_ms)
+
+    def _decode(self, final: bool) -> float:
+        start = time.perf_counter()
+        result = submit_stream_window(self._audio, self.committed_text[-_PROMPT_CHARS:])
+        segments = result["segments"]
+        self._pending_samples = 0
+
+        window_seconds = len(self._audio) / SAMPLE_RATE
+        if final or (window_seconds >= STREAM_WINDOW_SECONDS and len(segments) <= 1):
+            stable, tentative = segments, []
+        else:
+            stable, tentative = segments[:-1], segments[-1:]
+
+        if final or (not segments and window_seconds >= STREAM_WINDOW_SECONDS):
+            # Nothing left to decode, or a full window of silence or noise
+            self._audio = np.zeros(0, dtype=np.float32)
+        else:
+            if stable:
+                # Drop committed audio
+                cut = min(int(stable[-1]["end"] * SAMPLE_RATE), len(self._audio))
+                self._audio = self._audio[cut:]
+            # Keep at most a window of uncommitted audio so decodes stay bounded
+            self._audio = self._audio[-int(STREAM_WINDOW_SECONDS * SAMPLE_RATE):]
+
+        stable_text = " ".join(seg["text"].strip() for seg in stable).strip()
+        if stable_text:
+            self.committed_text = f"{self.committed_text} {stable_text}".strip()
+        self.tentative_text = " ".join(seg["text"].strip() for seg in tentative).strip()
+
+        return round((time.perf_counter() - start) * 1000, 2)
+
+    def _result(self, final: bool, decode_ms) -> dict:
+        text = TextContext(self.text)
+        emotion = detect_emotion(text)
+        scam = detect_scam_phrases(text)
+
+        if self.first_risk_signal_at is None and (scam["is_scam_suspected"] or emotion["stress_level"] != "low"):
+            self.first_risk_signal_at = round(self.total_samples / SAMPLE_RATE, 2)
+
+        return {
+            "session_id": self.session_id,
+            "final": final,
+            "text": text.text,
+            "committed_text": self.committed_text,
+            "tentative_text": self.tentative_text,
+            "audio_seconds": round(self.total_samples / SAMPLE_RATE, 2),
+            "decoded": decode_ms is not None,
+            "decode_ms": decode_ms,
+            "emotion": emotion,
+            "scam_detection": scam,
+            "first_risk_signal_at": self.first_risk_signal_at,
+        }
+
+
+def _expire_sessions(now: float):
+    expired = [sid for sid, s in _sessions.items() if now - s.last_seen > STREAM_SESSION_TTL]
+    for sid in expired:
+        del _sessions[sid]
+
+
+def start_session(user_id: str) -> StreamingSession:
+    """Open a new streaming session, or None when the server is at capacity."""
+    with _sessions_lock:
+        _expire_sessions(time.time())
+        if len(_sessions) >= STREAM_MAX_SESSIONS:
+            return None
+        session = StreamingSession(user_id)
+        _sessions[session.session_id] = session
+        return session
+
+
+def get_session(session_id: str) -> StreamingSession:
+    """Look up a live session by id."""
+    with _sessions_lock:
+        _expire_sessions(time.time())
+        return _sessions.get(session_id)
+
+
+def end_session(session_id: str) -> StreamingSession:
+    """Remove a session and return it."""
+    with _sessions_lock:
+        return _sessions.pop(session_id, None)
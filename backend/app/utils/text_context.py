@@ -0,0 +1,91 @@
+"""Request-scoped transcript context.
+
+The same transcript goes through detect_emotion, detect_scam_phrases,
+verify_speaker, validate_challenge and the risk score. A TextContext
+lowercases and tokenizes it once. Token sets, n-grams and the phrase
+matcher results are memoized, so every analyzer reads the same objects
+instead of rebuilding its own copies. The phrase dictionary snapshot is
+pinned on first use, so all analyzers of one request agree on the
+vocabulary version even if a reload lands mid-request.
+"""
+import re
+from typing import Union
+from app.utils.phrase_dictionary import PhraseDictionary, get_phrase_dictionary
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+class TextContext:
+    """One transcript plus memoized normalizations of it."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.reuse_hits = 0
+        self._derived = {}
+
+    def derive(self, name: str, compute):
+        """Return the memoized value for name, computing it on first use."""
+        if name in self._derived:
+            self.reuse_hits += 1
+            return self._derived[name]
+        value = self._derived[name] = compute()
+        return value
+
+    @property
+    def lower(self) -> str:
+        return self.derive("lower", self.text.lower)
+
+    @property
+    def normalized(self) -> str:
+        """Lowercased and stripped."""
+        return self.derive("normalized", self.lower.strip)
+
+    @property
+    def tokens(self) -> list:
+        return self.derive("tokens", self.normalized.split)
+
+    @property
+    def words(self) -> list:
+        """Lowercased alphanumeric words, punctuation dropped."""
+        return self.derive("words", lambda: _WORD.findall(self.lower))
+
+    @property
+    def token_set(self) -> frozenset:
+        return self.derive("token_set", lambda: frozenset(self.tokens))
+
+    def ngrams(self, n: int) -> frozenset:
+        """Set of n-token tuples."""
+        tokens = self.tokens
+        return self.derive(f"ngrams_{n}", lambda: frozenset(zip(*(tokens[i:] for i in range(n)))))
+
+    @property
+    def phrase_dictionary(self) -> PhraseDictionary:
+        return self.derive("phrase_dictionary", get_phrase_dictionary)
+
+    def matches(self) -> dict:
+        """
+        Scam phrases, stress keywords and fillers from one automaton pass,
+        plus ASR-garbled scam phrases the exact pass missed.
+
+        Returns:
+            {
+                "scam": [...], "stress": [...], "filler": [...],
+                "scam_fuzzy": [{"phrase", "window", "distance"}, ...],
+                "version": phrase dictionary version
+            }
+        """
+        def compute():
+            dictionary = self.phrase_dictionary
+            found = dictionary.matcher.find(self.lower, lowered=True)
+            found["scam_fuzzy"] = dictionary.find_fuzzy_scam(self.lower, found["scam"])
+            found["version"] = dictionary.version
+            return found
+        return self.derive("matches", compute)
+
+    def stats(self) -> dict:
+        return {"derived": len(self._derived), "reuse_hits": self.reuse_hits}
+
+
+def as_text_context(text: Union[str, TextContext]) -> TextContext:
+    """Wrap a string; contexts are passed through unchanged."""
+    return text if isinstance(text, TextContext) else TextContext(text)
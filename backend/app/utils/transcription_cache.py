@@ -0,0 +1,183 @@
+"""Content-addressed cache for transcription results.
+
+Results are keyed by a SHA-256 of the audio bytes plus the model name and
+decode options, so retries and replays of identical recordings skip the
+Whisper decode. A bounded in-memory LRU sits in front of an optional
+on-disk tier with a size cap and TTL.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from app.config import (
+    TRANSCRIBE_CACHE_SIZE,
+    TRANSCRIBE_CACHE_DIR,
+    TRANSCRIBE_CACHE_DISK_MB,
+    TRANSCRIBE_CACHE_TTL,
+)
+
+
+def cache_key(audio_bytes: bytes, model_name: str, options: dict) -> str:
+    """Hash audio content together with everything that affects the decode."""
+    digest = hashlib.sha256(audio_bytes)
+    digest.update(b"\0" + model_name.encode())
+    digest.update(b"\0" + json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """Two-tier (memory LRU + optional disk) transcription cache."""
+
+    def __init__(self, max_entries: int = 1024, disk_dir: str = "", disk_max_bytes: int = 0, ttl: float = 86400):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    def get(self, key: str):
+        """Return a cached result or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if now - stored_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return dict(result)
+                del self._memory[key]
+
+        result = self._disk_get(key, now)
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._memory_put(key, result, now)
+        return dict(result)
+
+    def put(self, key: str, result: dict):
+        """Store a successful transcription result."""
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, result, now)
+            self._stats["stores"] += 1
+        self._disk_put(key, result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["disk_enabled"] = bool(self.disk_dir)
+        return stats
+
+    def _memory_put(self, key: str, result: dict, now: float):
+        self._memory[key] = (now, dict(result))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_entries(self) -> list:
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.disk_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+        return entries
+
+    def _disk_get(self, key: str, now: float):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            if now - os.path.getmtime(path) > self.ttl:
+                self._disk_remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key: str, result: dict):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            size = os.path.getsize(tmp_path)
+            # Replace under the lock so an overwritten file's size is
+            # subtracted exactly once, even with concurrent writers
+            with self._lock:
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                self._disk_bytes += size - replaced
+        except OSError as e:
+            print(f"Transcription cache write failed: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        if self._disk_bytes > self.disk_max_bytes:
+            self._disk_evict()
+
+    def _disk_remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+            self._stats["evictions"] += 1
+
+    def _disk_evict(self):
+        """Drop expired files, then the oldest ones until under the size cap."""
+        now = time.time()
+        for mtime, name, _ in sorted(self._disk_entries()):
+            if self._disk_bytes <= self.disk_max_bytes and now - mtime <= self.ttl:
+                break
+            self._disk_remove(os.path.join(self.disk_dir, name))
+
+
+_cache = TranscriptionCache(
+    max_entries=TRANSCRIBE_CACHE_SIZE,
+    disk_dir=TRANSCRIBE_CACHE_DIR,
+    disk_max_bytes=TRANSCRIBE_CACHE_DISK_MB * 1024 * 1024,
+    ttl=TRANSCRIBE_CACHE_TTL,
+)
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    return _cache
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters and tier sizes for /api/status."""
+    return _cache.stats()
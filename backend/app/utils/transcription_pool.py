@@ -0,0 +1,583 @@
+"""Process pool for CPU-bound Whisper transcription.
+
+Each worker process loads its own Whisper model once and then serves jobs
+from a bounded queue, so request threads only wait on a future instead of
+running the decode themselves. If a worker dies (e.g. OOM-killed) the
+broken pool is discarded, the affected requests fail, and the next job
+starts a fresh pool.
+
+A worker runs one job at a time, so with WHISPER_BATCH_SIZE > 1 clips are
+grouped before they reach it: a dispatcher thread waits until a worker is
+free of any job (transcription, challenge or stream window),
+gathers the transcriptions queued by then (or arriving within
+WHISPER_BATCH_WAIT_MS), and sends them as one job that the worker's
+micro-batcher decodes together.
+
+Transcription and liveness jobs also compute the caller's voice embedding
+for the fraudster blacklist and the acoustic stress features while the
+worker has the audio, so request threads only run the blacklist search
+and combine the stress scores.
+"""
+import os
+import time
+import queue
+import pickle
+import atexit
+import threading
+import multiprocessing
+from collections import deque
+from functools import partial
+from typing import Union
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from app.config import (
+    WHISPER_MODEL,
+    WHISPER_QUANTIZE,
+    WHISPER_CASCADE_MODEL,
+    WHISPER_BATCH_SIZE,
+    WHISPER_BATCH_WAIT_MS,
+    VAD_ENABLED,
+    TRANSCRIBE_WORKERS,
+    TRANSCRIBE_QUEUE_SIZE,
+    TRANSCRIBE_TIMEOUT,
+)
+from app.utils.ml_utils import (
+    TRANSCRIBE_OPTIONS,
+    transcribe_audio,
+    measure_acoustic_stress,
+    decode_stream_window,
+    record_cascade,
+)
+from app.utils.challenge_decoder import verify_challenge_audio
+from app.utils.voice_blacklist import get_voice_blacklist, embed_caller
+from app.utils.audio_context import AudioContext
+from app.utils.transcription_cache import get_transcription_cache, cache_key
+from app.utils.metrics import percentile
+
+# Number of recent jobs kept for latency percentiles
+_WINDOW = 500
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(TRANSCRIBE_WORKERS, 1) + TRANSCRIBE_QUEUE_SIZE)
+# Jobs handed to the executor and not yet finished, of every kind
+_busy = 0
+_busy_changed = threading.Condition()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "timed_out": 0,
+    "in_flight": 0,
+    "batches": 0,
+    "batched_clips": 0,
+    "pool_restarts": 0,
+}
+_wait_ms = deque(maxlen=_WINDOW)
+_latency_ms = deque(maxlen=_WINDOW)
+
+
+class TranscriptionUnavailable(Exception):
+    """Base for jobs that were not run and can be retried later."""
+
+
+class TranscriptionQueueFull(TranscriptionUnavailable):
+    """Raised when the job queue has no free slots."""
+
+
+class TranscriptionWorkerLost(TranscriptionUnavailable):
+    """Raised when a worker process died while the job was queued or running."""
+
+
+class TranscriptionTimeout(Exception):
+    """Raised when a job does not finish before its deadline."""
+
+
+def _init_worker():
+    """Load and warm up the Whisper model (and speaker encoder) once per worker process."""
+    from app.utils.ml_utils import warm_up_models
+    warm_up_models()
+    if get_voice_blacklist() is not None:
+        from app.utils.voiceprint import load_voice_encoder
+        load_voice_encoder()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _run_job(fn, submitted_at: float, *args) -> dict:
+    """Run one model job inside a worker process and time it."""
+    started_at = time.time()
+    result = fn(*args)
+    finished_at = time.time()
+
+    result["timing"] = {
+        "queue_wait_ms": round((started_at - submitted_at) * 1000, 2),
+        "inference_ms": round((finished_at - started_at) * 1000, 2),
+    }
+    return result
+
+
+def _voice_features(audio, text: str) -> dict:
+    """The caller's voice embedding and the acoustic stress features; failures leave them out."""
+    try:
+        acoustic = measure_acoustic_stress(text, audio)
+    except Exception as e:
+        print(f"⚠ Acoustic stress features failed: {e}")
+        acoustic = None
+    return {**embed_caller(audio), "acoustic_stress": acoustic}
+
+
+def _transcribe_job(audio, challenge_phrase: str = None) -> dict:
+    """transcribe_audio() plus _voice_features()."""
+    result = transcribe_audio(audio, challenge_phrase)
+    if "error" not in result:
+        result.update(_voice_features(audio, result["text"]))
+    return result
+
+
+def _challenge_job(audio, challenge_phrase: str) -> dict:
+    """verify_challenge_audio() plus _voice_features()."""
+    result = verify_challenge_audio(audio, challenge_phrase)
+    if "error" not in result:
+        result.update(_voice_features(audio, result["transcript"]))
+    return result
+
+
+def _run_batch(jobs: list, submitted_at: list) -> list:
+    """
+    Run a group of transcriptions as one worker job and time each.
+
+    The jobs run in concurrent threads, so with WHISPER_BATCH_SIZE > 1 the
+    worker's micro-batcher decodes their clips in shared passes. A clip
+    that raises gets its exception in place of a result, so the rest of
+    the batch is still delivered.
+    """
+    started_at = time.time()
+    if len(jobs) == 1:
+        results = [_batch_clip(jobs[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="transcribe-batch") as threads:
+            results = list(threads.map(_batch_clip, jobs))
+    finished_at = time.time()
+
+    for result, submitted in zip(results, submitted_at):
+        if isinstance(result, Exception):
+            continue
+        result["timing"] = {
+            "queue_wait_ms": round((started_at - submitted) * 1000, 2),
+            "inference_ms": round((finished_at - started_at) * 1000, 2),
+            "batch_size": len(jobs),
+        }
+    return results
+
+
+def _batch_clip(job: tuple):
+    """One clip of a batch: its result, or the exception it raised (picklable)."""
+    try:
+        return _transcribe_job(*job)
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        return e
+
+
+class _ClipBatcher:
+    """Groups queued transcriptions into one job per free worker."""
+
+    def __init__(self, workers: int, max_batch_size: int, max_wait_ms: float):
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="transcription-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, args: tuple, submitted_at: float) -> Future:
+        future = Future()
+        self._queue.put((args, submitted_at, future))
+        return future
+
+    def _collect(self) -> list:
+        """Block for the first job, then gather more until full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        # Drop jobs whose caller already gave up
+        return [job for job in batch if job[2].set_running_or_notify_cancel()]
+
+    def _loop(self):
+        while True:
+            # Collect only once a worker is free, so a backlog becomes full batches
+            _claim_worker(self.workers)
+            batch = self._collect()
+            if not batch:
+                _job_finished()
+                continue
+            try:
+                job = _executor_submit(
+                    _run_batch,
+                    [args for args, _, _ in batch],
+                    [submitted_at for _, submitted_at, _ in batch],
+                )
+            except Exception as e:
+                _job_finished()
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            job.add_done_callback(_job_finished)
+            job.add_done_callback(partial(self._deliver, batch))
+
+    def _deliver(self, batch: list, job: Future):
+        try:
+            results = job.result()
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        with _stats_lock:
+            _stats["batches"] += 1
+            _stats["batched_clips"] += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_clip_batcher = None
+_clip_batcher_lock = threading.Lock()
+
+
+def _get_clip_batcher():
+    """The pool-level batcher, or None when batching or the pool is disabled."""
+    global _clip_batcher
+    if WHISPER_BATCH_SIZE <= 1 or TRANSCRIBE_WORKERS <= 0:
+        return None
+    with _clip_batcher_lock:
+        if _clip_batcher is None:
+            _clip_batcher = _ClipBatcher(TRANSCRIBE_WORKERS, WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT_MS)
+        return _clip_batcher
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Start the worker pool on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            print(f"Starting {TRANSCRIBE_WORKERS} transcription worker(s)...")
+            _executor = ProcessPoolExecutor(
+                max_workers=TRANSCRIBE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            atexit.register(shutdown_pool)
+        return _executor
+
+
+def _claim_worker(workers: int):
+    """Wait until fewer than `workers` jobs are on the executor, then count one more."""
+    global _busy
+    with _busy_changed:
+        _busy_changed.wait_for(lambda: _busy < workers)
+        _busy += 1
+
+
+def _job_started():
+    global _busy
+    with _busy_changed:
+        _busy += 1
+
+
+def _job_finished(_future=None):
+    global _busy
+    with _busy_changed:
+        _busy -= 1
+        _busy_changed.notify_all()
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next job starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not executor:
+            return
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+    with _stats_lock:
+        _stats["pool_restarts"] += 1
+    print("⚠ Transcription worker died; restarting the pool on the next job")
+
+
+def _executor_submit(fn, *args) -> Future:
+    """
+    Submit to the pool, replacing it once if it is already broken.
+
+    A job whose worker dies later fails with BrokenProcessPool, and the
+    pool it ran on is discarded.
+    """
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            future = executor.submit(fn, *args)
+            break
+        except RuntimeError:
+            # Broken, or shut down by a concurrent discard
+            _discard_executor(executor)
+            if attempt:
+                raise TranscriptionWorkerLost("Transcription workers are restarting, retry later")
+    future.add_done_callback(partial(_discard_if_broken, executor))
+    return future
+
+
+def _discard_if_broken(executor: ProcessPoolExecutor, future: Future):
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        _discard_executor(executor)
+
+
+def warm_up_pool():
+    """Start every worker and wait until their initializers have finished."""
+    if TRANSCRIBE_WORKERS <= 0:
+        return
+    futures = [_executor_submit(_ping) for _ in range(TRANSCRIBE_WORKERS)]
+    for future in futures:
+        future.result()
+
+
+def shutdown_pool():
+    """Stop the worker pool, dropping queued jobs."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _record(result: dict, submitted_at: float):
+    timing = result.get("timing", {})
+    with _stats_lock:
+        _stats["completed"] += 1
+        if "queue_wait_ms" in timing:
+            _wait_ms.append(timing["queue_wait_ms"])
+        _latency_ms.append((time.time() - submitted_at) * 1000)
+    if "cascade" in result:
+        record_cascade(result["cascade"])
+
+
+def _release_slot(_future=None):
+    _slots.release()
+    with _stats_lock:
+        _stats["in_flight"] -= 1
+
+
+def submit_transcription(
+    audio: Union[str, np.ndarray, AudioContext],
+    challenge_phrase: str = None,
+    timeout: float = TRANSCRIBE_TIMEOUT,
+) -> dict:
+    """
+    Transcribe audio on the worker pool and wait for the result.
+
+    Identical audio already decoded with the same model and options is
+    served from the transcription cache without using a worker.
+
+    Args:
+        audio: The request's AudioContext, a path to an audio file, or
+            16 kHz mono float32 samples
+        challenge_phrase: Expected liveness phrase, used by the model cascade
+        timeout: Seconds to wait before giving up on the job
+
+    Returns:
+        transcribe_audio() result with added "timing" and "cached" entries,
+        the embed_caller() entries for screen_embedded_caller() and the
+        "acoustic_stress" features for detect_emotion()
+
+    Raises:
+        TranscriptionQueueFull: all worker and queue slots are taken
+        TranscriptionWorkerLost: the worker running the job died
+        TranscriptionTimeout: the job missed its deadline
+    """
+    key = _cache_key_for(audio, challenge_phrase)
+    cache = get_transcription_cache()
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True, "timing": {"queue_wait_ms": 0.0, "inference_ms": 0.0}}
+
+    batcher = _get_clip_batcher()
+    if batcher is not None:
+        result = _submit_batched(batcher, (audio, challenge_phrase), timeout)
+    else:
+        result = _submit(_transcribe_job, (audio, challenge_phrase), timeout)
+    if key is not None and "error" not in result:
+        cache.put(key, {k: v for k, v in result.items() if k != "timing"})
+    return {**result, "cached": False}
+
+
+def _cache_key_for(audio: Union[str, np.ndarray, AudioContext], challenge_phrase: str = None):
+    """Cache key for a file or buffer, or None if the file cannot be read here."""
+    if isinstance(audio, AudioContext):
+        audio_bytes = audio.samples.tobytes()
+    elif isinstance(audio, np.ndarray):
+        audio_bytes = audio.tobytes()
+    else:
+        try:
+            with open(audio, "rb") as f:
+                audio_bytes = f.read()
+        except OSError:
+            return None
+    options = {
+        **TRANSCRIBE_OPTIONS,
+        "batched": WHISPER_BATCH_SIZE > 1,
+        "vad": VAD_ENABLED,
+        "quantize": WHISPER_QUANTIZE,
+        "cascade": WHISPER_CASCADE_MODEL,
+        "challenge": challenge_phrase if WHISPER_CASCADE_MODEL else None,
+        "voice_embedding": get_voice_blacklist() is not None,
+    }
+    return cache_key(audio_bytes, WHISPER_MODEL, options)
+
+
+def submit_challenge_verification(
+    audio: Union[str, np.ndarray, AudioContext],
+    challenge_phrase: str,
+    timeout: float = TRANSCRIBE_TIMEOUT,
+) -> dict:
+    """
+    Run the challenge-aware liveness decode on the worker pool.
+
+    Returns:
+        verify_challenge_audio() result with an added "timing" entry, the
+        embed_caller() entries for screen_embedded_caller() and the
+        "acoustic_stress" features for detect_emotion()
+
+    Raises:
+        TranscriptionQueueFull: all worker and queue slots are taken
+        TranscriptionWorkerLost: the worker running the job died
+        TranscriptionTimeout: the job missed its deadline
+    """
+    return _submit(_challenge_job, (audio, challenge_phrase), timeout)
+
+
+def submit_voice_embedding(audio: Union[str, np.ndarray, AudioContext], timeout: float = TRANSCRIBE_TIMEOUT) -> dict:
+    """
+    Compute a speaker embedding for voiceprint enrolment or verification on the worker pool.
+
+    Returns:
+        embed_voice_job() result with an added "timing" entry
+
+    Raises:
+        TranscriptionQueueFull: all worker and queue slots are taken
+        TranscriptionWorkerLost: the worker running the job died
+        TranscriptionTimeout: the job missed its deadline
+    """
+    from app.utils.voiceprint import embed_voice_job
+    return _submit(embed_voice_job, (audio,), timeout)
+
+
+def submit_stream_window(samples: np.ndarray, prompt: str = None, timeout: float = TRANSCRIBE_TIMEOUT) -> dict:
+    """
+    Decode a streaming session's window on the worker pool.
+
+    Returns:
+        decode_stream_window() result with an added "timing" entry
+
+    Raises:
+        TranscriptionQueueFull: all worker and queue slots are taken
+        TranscriptionWorkerLost: the worker running the job died
+        TranscriptionTimeout: the job missed its deadline
+    """
+    return _submit(decode_stream_window, (samples, prompt), timeout)
+
+
+def _take_slot() -> float:
+    """Reserve a worker or queue slot and return the submission time."""
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        raise TranscriptionQueueFull("Transcription queue is full, retry later")
+
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _stats["in_flight"] += 1
+    return time.time()
+
+
+def _wait(future: Future, submitted_at: float, timeout: float) -> dict:
+    try:
+        result = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        with _stats_lock:
+            _stats["timed_out"] += 1
+        raise TranscriptionTimeout(f"Voice job did not finish within {timeout}s")
+    except BrokenProcessPool:
+        raise TranscriptionWorkerLost("Transcription worker died, retry later")
+
+    _record(result, submitted_at)
+    return result
+
+
+def _submit_batched(batcher: _ClipBatcher, args: tuple, timeout: float) -> dict:
+    submitted_at = _take_slot()
+    future = batcher.submit(args, submitted_at)
+    future.add_done_callback(_release_slot)
+    return _wait(future, submitted_at, timeout)
+
+
+def _submit(fn, args: tuple, timeout: float) -> dict:
+    submitted_at = _take_slot()
+
+    if TRANSCRIBE_WORKERS <= 0:
+        # Inline mode: no pool, transcribe in the request thread
+        try:
+            result = _run_job(fn, submitted_at, *args)
+        finally:
+            _release_slot()
+        _record(result, submitted_at)
+        return result
+
+    _job_started()
+    try:
+        future = _executor_submit(_run_job, fn, submitted_at, *args)
+    except Exception:
+        _job_finished()
+        _release_slot()
+        raise
+    future.add_done_callback(_job_finished)
+    future.add_done_callback(_release_slot)
+    return _wait(future, submitted_at, timeout)
+
+
+def get_pool_stats() -> dict:
+    """Report queue depth, queue wait and job latency for the pool."""
+    with _stats_lock:
+        stats = dict(_stats)
+        waits = list(_wait_ms)
+        latencies = list(_latency_ms)
+
+    workers = max(TRANSCRIBE_WORKERS, 0)
+    return {
+        **stats,
+        "workers": workers,
+        "queue_capacity": TRANSCRIBE_QUEUE_SIZE,
+        "queue_depth": max(stats["in_flight"] - workers, 0),
+        "busy_workers": min(_busy, workers),
+        "mean_batch_size": round(stats["batched_clips"] / stats["batches"], 2) if stats["batches"] else None,
+        "queue_wait_ms": {"p50": percentile(waits, 50), "p95": percentile(waits, 95)},
+        "latency_ms": {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95)},
+    }
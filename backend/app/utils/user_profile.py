@@ -0,0 +1,171 @@
+"""Long-term behavioural profile per user.
+
+Built incrementally from every completed transfer and read by the risk
+score to spot transfers that don't look like the user's own:
+
+- amount: streaming mean and variance (Welford) of log(1 + amount), so a
+  transfer gets a z-score against the user's usual amounts in O(1);
+- time of day: a 24-bin histogram of transfer hours (local time);
+- recipients: a 128-bit Bloom filter of past recipient accounts, so "first
+  transfer to this recipient" is three bit tests. It never misses a known
+  recipient; with 10 past recipients about 1% of new ones look known,
+  with 20 about 5%.
+
+Every user is a fixed 84-byte row in flat arrays indexed by a SlotIndex,
+so millions of profiles fit in one worker. Past PROFILE_MAX_USERS the
+least recently active user's row is reused.
+"""
+import math
+import time
+import zlib
+import threading
+from array import array
+from app.config import PROFILE_MAX_USERS
+from app.utils.slot_index import SlotIndex
+
+_HOURS = 24
+_HOUR_MAX = 0xFFFF
+_BLOOM_WORDS = 2
+_BLOOM_BITS = 64 * _BLOOM_WORDS
+_BLOOM_HASHES = 3
+_EMPTY_HOURS = array("H", bytes(2 * _HOURS))
+_EMPTY_BLOOM = array("Q", bytes(8 * _BLOOM_WORDS))
+
+# Floor for the amount spread, in log units, so a user who always sends
+# the same amount doesn't make every small change look extreme
+_MIN_STD = 0.25
+
+
+def _bloom_bits(recipient: str) -> list:
+    """Bit positions of a recipient, by double hashing."""
+    key = recipient.encode()
+    h1 = zlib.crc32(key)
+    h2 = zlib.adler32(key) | 1
+    return [(h1 + i * h2) % _BLOOM_BITS for i in range(_BLOOM_HASHES)]
+
+
+class ProfileStore:
+    """Array-backed behavioural profiles for many users."""
+
+    bytes_per_user = 4 + 8 + 8 + 2 * _HOURS + 8 * _BLOOM_WORDS
+
+    def __init__(self, max_users: int = PROFILE_MAX_USERS):
+        self.max_users = max_users
+        self._counts = array("I")
+        self._means = array("d")
+        self._m2 = array("d")
+        self._hours = array("H")
+        self._recipients = array("Q")
+        self._capacity = 0
+        self._slots = SlotIndex(max_users, self._grow)
+        self._lock = threading.Lock()
+
+    def _grow(self, n_slots: int):
+        added = n_slots - self._capacity
+        self._counts.frombytes(bytes(4 * added))
+        self._means.frombytes(bytes(8 * added))
+        self._m2.frombytes(bytes(8 * added))
+        self._hours.frombytes(bytes(2 * _HOURS * added))
+        self._recipients.frombytes(bytes(8 * _BLOOM_WORDS * added))
+        self._capacity = n_slots
+
+    def _reset(self, slot: int):
+        self._counts[slot] = 0
+        self._means[slot] = 0.0
+        self._m2[slot] = 0.0
+        self._hours[slot * _HOURS:(slot + 1) * _HOURS] = _EMPTY_HOURS
+        self._recipients[slot * _BLOOM_WORDS:(slot + 1) * _BLOOM_WORDS] = _EMPTY_BLOOM
+
+    def record(self, user_id: str, amount: float, recipient_account: str = None, now: float = None):
+        """Fold one completed transfer into the user's profile."""
+        x = math.log1p(max(amount, 0))
+        hour = time.localtime(time.time() if now is None else now).tm_hour
+        with self._lock:
+            slot, new = self._slots.acquire(user_id)
+            if new:
+                self._reset(slot)
+            n = self._counts[slot] + 1
+            delta = x - self._means[slot]
+            self._means[slot] += delta / n
+            self._m2[slot] += delta * (x - self._means[slot])
+            self._counts[slot] = n
+
+            cell = slot * _HOURS + hour
+            if self._hours[cell] < _HOUR_MAX:
+                self._hours[cell] += 1
+
+            if recipient_account:
+                for bit in _bloom_bits(recipient_account):
+                    self._recipients[slot * _BLOOM_WORDS + bit // 64] |= 1 << (bit % 64)
+
+    def features(self, user_id: str, amount: float, recipient_account: str = None, now: float = None) -> dict:
+        """
+        How a prospective transfer compares with the user's history.
+
+        Returns:
+            {
+                "transfers": transfers seen,
+                "amount_z": z-score of the amount, or None under 2 transfers,
+                "new_recipient": bool, or None without a recipient,
+                "hour": local hour of now,
+                "hour_share": share of past transfers within an hour of it
+            }
+            This is the profile argument of RiskRules.evaluate().
+        """
+        hour = time.localtime(time.time() if now is None else now).tm_hour
+        with self._lock:
+            slot = self._slots.get(user_id)
+            if slot is None:
+                return {"transfers": 0, "amount_z": None, "new_recipient": None, "hour": hour, "hour_share": None}
+            n = self._counts[slot]
+            amount_z = None
+            if n >= 2:
+                std = max(math.sqrt(self._m2[slot] / (n - 1)), _MIN_STD)
+                amount_z = (math.log1p(max(amount, 0)) - self._means[slot]) / std
+
+            new_recipient = None
+            if recipient_account:
+                new_recipient = not all(
+                    self._recipients[slot * _BLOOM_WORDS + bit // 64] >> (bit % 64) & 1
+                    for bit in _bloom_bits(recipient_account)
+                )
+
+            nearby = sum(self._hours[slot * _HOURS + (hour + d) % _HOURS] for d in (-1, 0, 1))
+            return {
+                "transfers": n,
+                "amount_z": amount_z,
+                "new_recipient": new_recipient,
+                "hour": hour,
+                "hour_share": nearby / n if n else None,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._slots),
+                "capacity": self._capacity,
+                "max_users": self.max_users,
+                "bytes_per_user": self.bytes_per_user,
+                "allocated_mb": round(self._capacity * self.bytes_per_user / 2**20, 2),
+            }
+
+
+_store = ProfileStore()
+
+
+def get_profile_store() -> ProfileStore:
+    return _store
+
+
+def record_profile(user_id: str, amount: float, recipient_account: str = None):
+    """Fold a completed transfer into the user's behavioural profile."""
+    _store.record(user_id, float(amount), recipient_account)
+
+
+def profile_features(user_id: str, amount: float, recipient_account: str = None) -> dict:
+    """ProfileStore.features() for a transfer about to happen now."""
+    return _store.features(user_id, float(amount), recipient_account)
+
+
+def get_profile_stats() -> dict:
+    return _store.stats()
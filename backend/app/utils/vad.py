@@ -0,0 +1,107 @@
+"""Energy-based voice activity detection.
+
+Runs before Whisper to cut leading/trailing silence and long pauses out
+of a clip, and to skip inference entirely when nothing was said. All
+frame work is vectorized with NumPy.
+"""
+import numpy as np
+from app.config import (
+    VAD_FRAME_MS,
+    VAD_THRESHOLD_DB,
+    VAD_MARGIN_DB,
+    VAD_PADDING_MS,
+    VAD_MIN_SPEECH_MS,
+    VAD_MAX_PAUSE_MS,
+)
+
+SAMPLE_RATE = 16000
+
+_EPS = 1e-10
+
+
+def frame_energies_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """Mean energy in dB for consecutive non-overlapping frames."""
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    return 10 * np.log10(np.mean(frames * frames, axis=1) + _EPS)
+
+
+def _regions(mask: np.ndarray) -> np.ndarray:
+    """(start, end) frame index pairs for runs of True in mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)], axis=1)
+
+
+def detect_speech(samples: np.ndarray, energies_db: np.ndarray = None) -> list:
+    """
+    Find speech regions in a 16 kHz mono clip.
+
+    A frame is speech when it is above both the absolute threshold and the
+    clip's noise floor plus a margin. Short blips are dropped and regions
+    are padded so word onsets and tails are kept.
+
+    Returns:
+        List of (start_sample, end_sample) tuples
+    """
+    frame_len = int(SAMPLE_RATE * VAD_FRAME_MS / 1000)
+    if energies_db is None:
+        energies_db = frame_energies_db(samples, frame_len)
+    if energies_db.size == 0:
+        return []
+
+    noise_floor = np.percentile(energies_db, 10)
+    threshold = max(VAD_THRESHOLD_DB, noise_floor + VAD_MARGIN_DB)
+    mask = energies_db > threshold
+
+    regions = _regions(mask)
+    min_frames = max(1, int(VAD_MIN_SPEECH_MS / VAD_FRAME_MS))
+    regions = regions[(regions[:, 1] - regions[:, 0]) >= min_frames]
+    if regions.size == 0:
+        return []
+
+    pad = int(VAD_PADDING_MS / VAD_FRAME_MS)
+    starts = np.maximum(regions[:, 0] - pad, 0) * frame_len
+    ends = np.minimum(regions[:, 1] + pad, len(energies_db)) * frame_len
+    return [(int(s), int(e)) for s, e in zip(starts, ends)]
+
+
+def trim_silence(samples: np.ndarray, energies_db: np.ndarray = None) -> tuple:
+    """
+    Cut a clip down to its speech regions.
+
+    Pauses between regions are shortened to at most VAD_MAX_PAUSE_MS so
+    word boundaries survive. Returns the trimmed samples (None when there is
+    no speech) and a report of original vs trimmed duration.
+    """
+    regions = detect_speech(samples, energies_db)
+    original = len(samples) / SAMPLE_RATE
+
+    if not regions:
+        return None, {
+            "speech_detected": False,
+            "original_duration": round(original, 2),
+            "trimmed_duration": 0.0,
+            "speech_regions": 0,
+        }
+
+    max_pause = int(SAMPLE_RATE * VAD_MAX_PAUSE_MS / 1000)
+    pieces = []
+    prev_end = None
+    for start, end in regions:
+        if prev_end is not None and start < prev_end + max_pause:
+            start = max(prev_end, start)
+            pieces.append(samples[prev_end:start])
+        elif prev_end is not None:
+            pieces.append(samples[prev_end:prev_end + max_pause])
+        pieces.append(samples[start:end])
+        prev_end = end
+
+    trimmed = np.concatenate(pieces)
+    return trimmed, {
+        "speech_detected": True,
+        "original_duration": round(original, 2),
+        "trimmed_duration": round(len(trimmed) / SAMPLE_RATE, 2),
+        "speech_regions": len(regions),
+    }
@@ -0,0 +1,192 @@
+"""Sliding-window transfer velocity per user.
+
+Counts and amount sums of each user's transfers over several windows
+(VELOCITY_WINDOWS seconds, e.g. 1 min, 10 min, 1 h, 24 h), so the risk
+score can see bursts such as five transfers in ten minutes.
+
+Each user keeps a ring of their last VELOCITY_MAX_EVENTS transfers
+(time, amount) plus, per window, the position of the oldest transfer
+still inside it and a running amount sum. Recording or querying first
+advances each window's start past transfers that have aged out; every
+transfer enters and leaves each window once, so both are O(1) amortized
+and the counts are exact. A user with more transfers than the ring holds
+inside a window has that window saturate at VELOCITY_MAX_EVENTS.
+
+All users share flat, fixed-stride arrays indexed by a SlotIndex row, so
+every user costs the same number of bytes. The arrays grow by doubling up
+to VELOCITY_MAX_USERS; past that the least recently active user's row is
+reused.
+"""
+import time
+import threading
+from array import array
+from app.config import VELOCITY_WINDOWS, VELOCITY_MAX_EVENTS, VELOCITY_MAX_USERS
+from app.utils.slot_index import SlotIndex
+
+
+def window_label(seconds: int) -> str:
+    """60 -> "1m", 600 -> "10m", 86400 -> "24h"."""
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+class VelocityStore:
+    """Exact sliding-window transfer counters for many users."""
+
+    def __init__(self, windows=VELOCITY_WINDOWS, max_events: int = VELOCITY_MAX_EVENTS, max_users: int = VELOCITY_MAX_USERS):
+        """
+        Args:
+            windows: Window lengths in seconds
+            max_events: Transfers remembered per user
+            max_users: Most users tracked at once
+        """
+        if max_events < 1 or not windows:
+            raise ValueError("Velocity store needs at least one window and one event")
+        self.windows = tuple(int(w) for w in windows)
+        self.max_events = max_events
+        self.max_users = max_users
+
+        # Per slot: ring of event times and amounts, events ever recorded,
+        # and per window the index of its oldest event and its amount sum
+        self._times = array("d")
+        self._amounts = array("d")
+        self._heads = array("q")
+        self._starts = array("q")
+        self._sums = array("d")
+        self._capacity = 0
+        self._slots = SlotIndex(max_users, self._grow)
+        self._lock = threading.Lock()
+
+    @property
+    def bytes_per_user(self) -> int:
+        return 16 * self.max_events + 8 + 16 * len(self.windows)
+
+    def _grow(self, n_slots: int):
+        added = n_slots - self._capacity
+        n_windows = len(self.windows)
+        self._times.frombytes(bytes(8 * self.max_events * added))
+        self._amounts.frombytes(bytes(8 * self.max_events * added))
+        self._heads.frombytes(bytes(8 * added))
+        self._starts.frombytes(bytes(8 * n_windows * added))
+        self._sums.frombytes(bytes(8 * n_windows * added))
+        self._capacity = n_slots
+
+    def _slot_for(self, user_id: str) -> int:
+        slot, new = self._slots.acquire(user_id)
+        if new:
+            self._heads[slot] = 0
+            base = slot * len(self.windows)
+            for w in range(len(self.windows)):
+                self._starts[base + w] = 0
+                self._sums[base + w] = 0.0
+        return slot
+
+    def _expire(self, slot: int, now: float):
+        """Move each window's start past events that have aged out of it."""
+        ring = slot * self.max_events
+        head = self._heads[slot]
+        base = slot * len(self.windows)
+        times, amounts, starts, sums = self._times, self._amounts, self._starts, self._sums
+        for w, window in enumerate(self.windows):
+            start = starts[base + w]
+            cutoff = now - window
+            while start < head and times[ring + start % self.max_events] <= cutoff:
+                sums[base + w] -= amounts[ring + start % self.max_events]
+                start += 1
+            if start == head:
+                sums[base + w] = 0.0  # drop float drift once the window is empty
+            starts[base + w] = start
+
+    def record(self, user_id: str, amount: float, now: float = None):
+        """Add one transfer to every window."""
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slot_for(user_id)
+            self._expire(slot, now)
+            head = self._heads[slot]
+            position = slot * self.max_events + head % self.max_events
+            base = slot * len(self.windows)
+            for w in range(len(self.windows)):
+                # Ring full: the transfer about to be overwritten leaves this window
+                if head - self._starts[base + w] == self.max_events:
+                    self._sums[base + w] -= self._amounts[position]
+                    self._starts[base + w] += 1
+                self._sums[base + w] += amount
+            self._times[position] = now
+            self._amounts[position] = amount
+            self._heads[slot] = head + 1
+
+    def query(self, user_id: str, now: float = None) -> dict:
+        """
+        Transfers per window.
+
+        Returns:
+            {window seconds: (count, amount sum)}; zeros for unknown users.
+            This is the velocity argument of RiskRules.evaluate().
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slots.get(user_id)
+            if slot is None:
+                return {window: (0, 0.0) for window in self.windows}
+            self._expire(slot, now)
+            head = self._heads[slot]
+            base = slot * len(self.windows)
+            return {
+                window: (head - self._starts[base + w], self._sums[base + w])
+                for w, window in enumerate(self.windows)
+            }
+
+    def recorded(self, user_id: str) -> int:
+        """Transfers ever recorded for the user since their row was assigned; 0 if unknown."""
+        with self._lock:
+            slot = self._slots.get(user_id)
+            return 0 if slot is None else self._heads[slot]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._slots),
+                "capacity": self._capacity,
+                "max_users": self.max_users,
+                "windows": [window_label(w) for w in self.windows],
+                "bytes_per_user": self.bytes_per_user,
+                "allocated_mb": round(self._capacity * self.bytes_per_user / 2**20, 2),
+            }
+
+
+_store = VelocityStore()
+
+
+def get_velocity_store() -> VelocityStore:
+    return _store
+
+
+def record_transfer(user_id: str, amount: float):
+    """Count a completed transfer towards the user's velocity."""
+    _store.record(user_id, float(amount))
+
+
+def user_velocity(user_id: str) -> dict:
+    """{window seconds: (count, amount sum)} for a user's recent transfers."""
+    return _store.query(user_id)
+
+
+def user_transfers_recorded(user_id: str) -> int:
+    """VelocityStore.recorded(): changes whenever the user makes a transfer."""
+    return _store.recorded(user_id)
+
+
+def label_velocity(velocity: dict) -> dict:
+    """user_velocity() as {"1m": {"count", "amount"}, ...} for responses."""
+    return {
+        window_label(window): {"count": count, "amount": round(amount, 2)}
+        for window, (count, amount) in velocity.items()
+    }
+
+
+def get_velocity_stats() -> dict:
+    return _store.stats()
@@ -0,0 +1,198 @@
+"""1:N search of caller voices against known fraudster voiceprints.
+
+The blacklist is a float32 matrix of unit-length speaker embeddings saved
+as .npy and opened with mmap_mode="r", so every worker process maps the
+same read-only pages instead of holding its own copy. Search is a single
+matmul plus argpartition. If the file was built with clusters, rows are
+stored grouped by cluster and only the rows of the closest clusters are
+scored.
+
+Files for a blacklist at <path>.npy:
+    <path>.npy            (N, 256) float32 embeddings, grouped by cluster
+    <path>.ids.json       list of N labels (case or account references)
+    <path>.centroids.npy  optional (C, 256) float32 cluster centroids
+    <path>.offsets.npy    optional (C + 1,) int64 row offsets per cluster
+"""
+import os
+import json
+import time
+import numpy as np
+from app.config import VOICE_BLACKLIST_PATH, VOICE_BLACKLIST_THRESHOLD, VOICE_BLACKLIST_NPROBE
+
+
+def _sidecar(path: str, suffix: str) -> str:
+    return f"{path[:-4] if path.endswith('.npy') else path}.{suffix}"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + 1e-10)
+
+
+def _kmeans(matrix: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means; returns the cluster assignment for each row."""
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, matrix)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+    return np.argmax(matrix @ centroids.T, axis=1)
+
+
+def build_blacklist(embeddings: np.ndarray, ids: list, path: str, n_clusters: int = 0):
+    """
+    Write a blacklist in the on-disk layout described above.
+
+    Args:
+        embeddings: (N, 256) speaker embeddings
+        ids: N labels, one per embedding
+        path: Target .npy path
+        n_clusters: Number of coarse clusters for the pre-filter (0 = none)
+    """
+    matrix = _normalize(np.asarray(embeddings, dtype=np.float32))
+    ids = list(ids)
+
+    if n_clusters > 0:
+        assignment = _kmeans(matrix, n_clusters)
+        order = np.argsort(assignment, kind="stable")
+        matrix, assignment = matrix[order], assignment[order]
+        ids = [ids[i] for i in order]
+        counts = np.bincount(assignment, minlength=n_clusters)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        centroids = np.zeros((n_clusters, matrix.shape[1]), dtype=np.float32)
+        np.add.at(centroids, assignment, matrix)
+        np.save(_sidecar(path, "centroids.npy"), _normalize(centroids).astype(np.float32))
+        np.save(_sidecar(path, "offsets.npy"), offsets)
+
+    np.save(path, matrix)
+    with open(_sidecar(path, "ids.json"), "w", encoding="utf-8") as f:
+        json.dump(ids, f)
+
+
+class VoiceBlacklist:
+    """Read-only, memory-mapped blacklist of fraudster voiceprints."""
+
+    def __init__(self, path: str, nprobe: int = 8):
+        self.path = path
+        self.nprobe = nprobe
+        self.matrix = np.load(path, mmap_mode="r")
+        with open(_sidecar(path, "ids.json"), "r", encoding="utf-8") as f:
+            self.ids = json.load(f)
+
+        self.centroids = self.offsets = None
+        centroids_path = _sidecar(path, "centroids.npy")
+        if os.path.exists(centroids_path):
+            self.centroids = np.load(centroids_path)
+            self.offsets = np.load(_sidecar(path, "offsets.npy"))
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _candidate_rows(self, query: np.ndarray):
+        """Row ranges of the nprobe closest clusters, or None for a full scan (nprobe <= 0)."""
+        if self.centroids is None or not 0 < self.nprobe < len(self.centroids):
+            return None
+        nearest = np.argpartition(-(self.centroids @ query), self.nprobe - 1)[: self.nprobe]
+        return np.concatenate([
+            np.arange(self.offsets[c], self.offsets[c + 1]) for c in np.sort(nearest)
+        ])
+
+    def search(self, embedding: np.ndarray, k: int = 5, exact: bool = False) -> list:
+        """
+        Top-k most similar blacklisted voices.
+
+        Returns:
+            [{"id": label, "similarity": cosine}, ...] best first
+        """
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        rows = None if exact else self._candidate_rows(query)
+
+        scores = (self.matrix if rows is None else self.matrix[rows]) @ query
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        row_ids = top if rows is None else rows[top]
+        return [
+            {"id": self.ids[int(row)], "similarity": round(float(scores[i]), 4)}
+            for i, row in zip(top, row_ids)
+        ]
+
+
+def _load_blacklist():
+    if not VOICE_BLACKLIST_PATH or not os.path.exists(VOICE_BLACKLIST_PATH):
+        return None
+    blacklist = VoiceBlacklist(VOICE_BLACKLIST_PATH, nprobe=VOICE_BLACKLIST_NPROBE)
+    clusters = 0 if blacklist.centroids is None else len(blacklist.centroids)
+    print(f"✓ Mapped voice blacklist: {len(blacklist)} entries, {clusters} clusters")
+    return blacklist
+
+
+_blacklist = _load_blacklist()
+
+
+def get_voice_blacklist():
+    """The process-wide blacklist, or None when none is configured."""
+    return _blacklist
+
+
+def check_voice_blacklist(embedding: np.ndarray, k: int = 3) -> dict:
+    """
+    Screen a caller's voice embedding against the blacklist.
+
+    Returns:
+        {
+            "checked": bool,
+            "matched": bool,
+            "similarity": best cosine similarity,
+            "matches": top-k hits,
+            "search_ms": ms
+        }
+    """
+    if _blacklist is None:
+        return {"checked": False, "matched": False, "similarity": None, "matches": []}
+
+    start = time.perf_counter()
+    matches = _blacklist.search(embedding, k=k)
+    best = matches[0]["similarity"] if matches else 0.0
+    return {
+        "checked": True,
+        "matched": best >= VOICE_BLACKLIST_THRESHOLD,
+        "similarity": best,
+        "matches": [m for m in matches if m["similarity"] >= VOICE_BLACKLIST_THRESHOLD],
+        "search_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def embed_caller(audio) -> dict:
+    """
+    The caller's voice embedding for screen_embedded_caller(), computed in
+    the transcription worker that already holds the audio.
+
+    Returns:
+        {"voice_embedding": [256 floats]}, {"voice_embedding_error": message},
+        or {} when no blacklist is loaded
+    """
+    if _blacklist is None:
+        return {}
+    from app.utils.voiceprint import embed_voice
+    try:
+        return {"voice_embedding": embed_voice(audio).tolist()}
+    except Exception as e:
+        # Screening reports the error; the transcription still succeeds
+        return {"voice_embedding_error": str(e)}
+
+
+def screen_embedded_caller(result: dict) -> dict:
+    """Screen the embedding embed_caller() added to a worker result, removing it from the result."""
+    embedding = result.pop("voice_embedding", None)
+    error = result.pop("voice_embedding_error", None)
+    if _blacklist is None:
+        return check_voice_blacklist(None)
+    if embedding is None:
+        return {"checked": False, "matched": False, "similarity": None, "matches": [], "error": error or "No voice embedding"}
+    return check_voice_blacklist(np.asarray(embedding, dtype=np.float32))
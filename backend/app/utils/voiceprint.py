@@ -0,0 +1,340 @@
+"""Speaker-embedding voiceprints.
+
+Each enrolled user is stored as one L2-normalised float32 embedding from
+resemblyzer's VoiceEncoder, held in a preallocated matrix that is loaded
+once at startup. Verification embeds the request audio once (on the
+transcription worker pool) and scores it with a dot product (cosine
+similarity on unit vectors).
+
+With VOICEPRINT_INDEX_PATH set, the index is persisted as an .npz
+snapshot plus an append-only journal (<path>.log, one JSON line per
+enrolment holding the user's updated row). Enrolments only append to the
+journal; once it outgrows the index, a background thread rewrites the
+snapshot and starts a new journal.
+"""
+import os
+import json
+import time
+import base64
+import threading
+from typing import Union
+import numpy as np
+from app.config import DEVICE, VOICEPRINT_INDEX_PATH, VOICEPRINT_THRESHOLD
+from app.utils.audio_io import SAMPLE_RATE
+from app.utils.audio_context import AudioContext
+
+EMBEDDING_DIM = 256
+
+# Journal records before the snapshot is rewritten (at least the index size)
+_MIN_COMPACT_RECORDS = 1024
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def load_voice_encoder():
+    """Load the resemblyzer speaker encoder on demand."""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            from resemblyzer import VoiceEncoder
+            print(f"Loading speaker encoder on {DEVICE}...")
+            _encoder = VoiceEncoder(device=DEVICE, verbose=False)
+    return _encoder
+
+
+def embed_voice(audio: Union[str, np.ndarray, AudioContext]) -> np.ndarray:
+    """
+    Compute a unit-length speaker embedding for one utterance.
+
+    Args:
+        audio: Path to audio file, 16 kHz mono float32 samples, or an
+            AudioContext (the embedding is memoized on it)
+
+    Returns:
+        float32 array of shape (256,)
+    """
+    from resemblyzer import preprocess_wav
+
+    if isinstance(audio, AudioContext):
+        return audio.derive("voice_embedding", lambda: embed_voice(audio.samples))
+    if isinstance(audio, str):
+        wav = preprocess_wav(audio)
+    else:
+        wav = preprocess_wav(audio, source_sr=SAMPLE_RATE)
+    if len(wav) == 0:
+        raise ValueError("No speech found in audio")
+
+    embedding = load_voice_encoder().embed_utterance(wav).astype(np.float32)
+    return embedding / (np.linalg.norm(embedding) + 1e-10)
+
+
+class VoiceprintIndex:
+    """One embedding per user in a growable float32 matrix."""
+
+    def __init__(self, capacity: int = 1024, path: str = None):
+        self._matrix = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        self._samples = np.zeros(capacity, dtype=np.int32)
+        self._rows = {}
+        self._user_ids = []
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.path = path
+        self._journal_records = 0
+        self._compacting = False
+
+    def __len__(self):
+        return len(self._user_ids)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._rows
+
+    def enroll(self, user_id: str, embedding: np.ndarray) -> int:
+        """
+        Add or refine a user's voiceprint; returns the number of samples it averages.
+
+        With a path, the updated row is appended to the journal.
+        """
+        with self._lock:
+            row = self._set_row(user_id)
+
+            # Running mean of the enrolment samples, kept on the unit sphere
+            count = self._samples[row]
+            merged = self._matrix[row] * count + embedding
+            self._matrix[row] = merged / (np.linalg.norm(merged) + 1e-10)
+            self._samples[row] = count + 1
+
+            if self.path:
+                self._append_journal(row)
+                if not self._compacting and self._journal_records >= max(_MIN_COMPACT_RECORDS, len(self._user_ids)):
+                    self._compacting = True
+                    threading.Thread(target=self._compact, name="voiceprint-compact", daemon=True).start()
+            return int(self._samples[row])
+
+    def _set_row(self, user_id: str) -> int:
+        row = self._rows.get(user_id)
+        if row is None:
+            row = len(self._user_ids)
+            if row == len(self._matrix):
+                self._grow()
+            self._rows[user_id] = row
+            self._user_ids.append(user_id)
+        return row
+
+    def _append_journal(self, row: int):
+        record = {
+            "user_id": self._user_ids[row],
+            "samples": int(self._samples[row]),
+            "embedding": base64.b64encode(self._matrix[row].tobytes()).decode("ascii"),
+        }
+        with open(f"{self.path}.log", "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self._journal_records += 1
+
+    def _replay_journal(self, journal_path: str) -> int:
+        """Apply a journal's rows; a torn last line from a crash is skipped."""
+        try:
+            with open(journal_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0
+        applied = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+                user_id, samples = str(record["user_id"]), int(record["samples"])
+                embedding = np.frombuffer(base64.b64decode(record["embedding"]), dtype=np.float32)
+            except (ValueError, TypeError, KeyError):
+                continue
+            if embedding.shape != (EMBEDDING_DIM,):
+                continue
+            row = self._set_row(user_id)
+            self._matrix[row] = embedding
+            self._samples[row] = samples
+            applied += 1
+        return applied
+
+    def _compact(self):
+        try:
+            self.save(self.path)
+        except OSError as e:
+            print(f"⚠ Voiceprint snapshot failed, journal kept: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def score(self, user_id: str, embedding: np.ndarray):
+        """Cosine similarity against one user's voiceprint, or None if not enrolled."""
+        row = self._rows.get(user_id)
+        if row is None:
+            return None
+        return float(self._matrix[row] @ embedding)
+
+    def score_all(self, embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity against every enrolled voiceprint."""
+        return self._matrix[: len(self._user_ids)] @ embedding
+
+    def user_id_at(self, row: int) -> str:
+        return self._user_ids[row]
+
+    def save(self, path: str):
+        """
+        Write the index atomically as .npz and drop the journal it covers.
+
+        Only the copy of the rows holds the lock; enrolments arriving while
+        the file is written go to a fresh journal.
+        """
+        journal, covered = f"{path}.log", f"{path}.log.old"
+        with self._save_lock:
+            with self._lock:
+                n = len(self._user_ids)
+                user_ids = np.array(self._user_ids, dtype=str)
+                embeddings = self._matrix[:n].copy()
+                samples = self._samples[:n].copy()
+                if os.path.exists(journal) and not os.path.exists(covered):
+                    os.replace(journal, covered)
+                self._journal_records = 0
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, user_ids=user_ids, embeddings=embeddings, samples=samples)
+            os.replace(tmp_path, path)
+            try:
+                os.remove(covered)
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def load(cls, path: str) -> "VoiceprintIndex":
+        """The snapshot at path (if any) with its journals replayed on top."""
+        user_ids = []
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                user_ids = [str(user_id) for user_id in data["user_ids"]]
+                embeddings, samples = data["embeddings"], data["samples"]
+        index = cls(capacity=max(1024, len(user_ids) * 2), path=path)
+        n = len(user_ids)
+        if n:
+            index._matrix[:n] = embeddings
+            index._samples[:n] = samples
+        index._user_ids = user_ids
+        index._rows = {user_id: row for row, user_id in enumerate(user_ids)}
+        # A journal left by an interrupted snapshot predates the current one
+        index._replay_journal(f"{path}.log.old")
+        index._journal_records = index._replay_journal(f"{path}.log")
+        return index
+
+    def _grow(self):
+        capacity = len(self._matrix) * 2
+        matrix = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        matrix[: len(self._matrix)] = self._matrix
+        samples = np.zeros(capacity, dtype=np.int32)
+        samples[: len(self._samples)] = self._samples
+        self._matrix, self._samples = matrix, samples
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_voiceprint_index() -> VoiceprintIndex:
+    """The enrolled voiceprints, loaded on first use (never in pool workers)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            if VOICEPRINT_INDEX_PATH:
+                _index = VoiceprintIndex.load(VOICEPRINT_INDEX_PATH)
+                print(f"✓ Loaded {len(_index)} voiceprints from {VOICEPRINT_INDEX_PATH}")
+            else:
+                _index = VoiceprintIndex()
+        return _index
+
+
+def embed_voice_job(audio: Union[str, np.ndarray, AudioContext]) -> dict:
+    """
+    embed_voice() as a transcription-pool job.
+
+    Returns:
+        {"embedding": [256 floats]} or {"error": message}
+    """
+    try:
+        return {"embedding": embed_voice(audio).tolist()}
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+def _embed_on_pool(audio) -> tuple:
+    """(embedding, None) computed on a pool worker, or (None, error)."""
+    from app.utils.transcription_pool import submit_voice_embedding
+    result = submit_voice_embedding(audio)
+    if "error" in result:
+        return None, result["error"]
+    return np.asarray(result["embedding"], dtype=np.float32), None
+
+
+def enroll_speaker(user_id: str, audio: Union[str, np.ndarray, AudioContext]) -> dict:
+    """
+    Enrol (or add a sample to) a user's voiceprint.
+
+    Returns:
+        {"enrolled": bool, "samples": n, "embed_ms": ms, "total_ms": ms}
+
+    Raises:
+        TranscriptionUnavailable, TranscriptionTimeout: the embedding job
+            was not run
+    """
+    start = time.perf_counter()
+    embedding, error = _embed_on_pool(audio)
+    if error:
+        return {"enrolled": False, "error": error}
+    embed_ms = (time.perf_counter() - start) * 1000
+
+    samples = get_voiceprint_index().enroll(user_id, embedding)
+
+    return {
+        "enrolled": True,
+        "user_id": user_id,
+        "samples": samples,
+        "embed_ms": round(embed_ms, 2),
+        "total_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def verify_voiceprint(user_id: str, audio: Union[str, np.ndarray, AudioContext]) -> dict:
+    """
+    Check request audio against a user's enrolled voiceprint.
+
+    Returns:
+        {
+            "enrolled": bool,
+            "passed": bool,
+            "similarity": -1..1,
+            "threshold": float,
+            "embed_ms": ms,
+            "score_ms": ms
+        }
+
+    Raises:
+        TranscriptionUnavailable, TranscriptionTimeout: the embedding job
+            was not run
+    """
+    index = get_voiceprint_index()
+    if user_id not in index:
+        return {"enrolled": False, "passed": False, "error": "No voiceprint enrolled for user"}
+
+    start = time.perf_counter()
+    embedding, error = _embed_on_pool(audio)
+    if error:
+        return {"enrolled": True, "passed": False, "error": error}
+    embed_ms = (time.perf_counter() - start) * 1000
+
+    score_start = time.perf_counter()
+    similarity = index.score(user_id, embedding)
+    score_ms = (time.perf_counter() - score_start) * 1000
+
+    return {
+        "enrolled": True,
+        "passed": similarity >= VOICEPRINT_THRESHOLD,
+        "similarity": round(similarity, 4),
+        "threshold": VOICEPRINT_THRESHOLD,
+        "embed_ms": round(embed_ms, 2),
+        "score_ms": round(score_ms, 4),
+    }
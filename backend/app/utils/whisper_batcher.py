@@ -0,0 +1,120 @@
+"""Dynamic micro-batching for short Whisper clips.
+
+Clips that arrive within a few milliseconds of each other are padded to
+Whisper's 30 s window and decoded in a single encoder/decoder pass. Each
+caller still gets its own result back through a future.
+"""
+import math
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+import torch
+import whisper
+from app.config import DEVICE, WHISPER_MODEL, WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT_MS
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+MAX_CLIP_SECONDS = whisper.audio.CHUNK_LENGTH
+
+_batchers = {}
+_batcher_lock = threading.Lock()
+
+
+class WhisperBatcher:
+    """Collects clips from many threads and decodes them together."""
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 10):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.options = whisper.DecodingOptions(
+            language="en",
+            without_timestamps=True,
+            fp16=(DEVICE == "cuda"),
+        )
+        self.batches_run = 0
+        self.clips_decoded = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="whisper-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio: np.ndarray, mel=None) -> Future:
+        """
+        Queue a 16 kHz float32 clip (at most 30 s) for decoding.
+
+        mel is the clip's padded log-mel spectrogram if the caller already
+        has it (see AudioContext.log_mel); otherwise it is computed here.
+        """
+        future = Future()
+        self._queue.put((audio, mel, future))
+        return future
+
+    def transcribe(self, audio: np.ndarray, timeout: float = None, mel=None) -> dict:
+        """Decode one clip and block until its batch has run."""
+        return self.submit(audio, mel).result(timeout=timeout)
+
+    def _collect(self) -> list:
+        """Block for the first clip, then gather more until full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self._decode([(audio, mel) for audio, mel, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _decode(self, clips: list) -> list:
+        """Decode (samples, mel or None) pairs in one pass."""
+        n_mels = self.model.dims.n_mels
+        mels = torch.stack([
+            mel if mel is not None else
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(clip)), n_mels=n_mels)
+            for clip, mel in clips
+        ]).to(self.model.device)
+
+        with torch.no_grad():
+            decoded = whisper.decode(self.model, mels, self.options)
+
+        self.batches_run += 1
+        self.clips_decoded += len(clips)
+
+        return [
+            {
+                "text": result.text.strip(),
+                "language": result.language or "en",
+                "duration": round(len(clip) / SAMPLE_RATE, 2),
+                "confidence": float(min(math.exp(result.avg_logprob), 1.0)),
+            }
+            for (clip, _), result in zip(clips, decoded)
+        ]
+
+
+def get_batcher(model_name: str = WHISPER_MODEL):
+    """Return the process-wide batcher for a model, or None when batching is disabled."""
+    if WHISPER_BATCH_SIZE <= 1:
+        return None
+    with _batcher_lock:
+        batcher = _batchers.get(model_name)
+        if batcher is None:
+            from app.utils.ml_utils import load_models
+            batcher = WhisperBatcher(load_models(model_name), WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT_MS)
+            _batchers[model_name] = batcher
+        return batcher
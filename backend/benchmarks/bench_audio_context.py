@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request decode and feature work with and without a shared
+AudioContext.
+
+Runs the audio-side stages of a liveness + transcription request (VAD,
+the cascade's two log-mel spectrograms, the challenge decoder's log-mel,
+stress features and, with --embed, the blacklist and voiceprint
+embeddings). "separate" gives every stage its own decode, as when each
+stage loaded the audio itself; "shared" runs them all on one context.
+No Whisper inference is run.
+
+Usage (from backend/):
+    python benchmarks/bench_audio_context.py [--seconds 6] [--rate 44100] [--runs 20] [--embed]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import soundfile as sf
+from app.utils.audio_context import AudioContext
+from app.utils.acoustic_stress import acoustic_stress
+
+
+def make_wav(seconds: float, rate: int) -> bytes:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    voiced = np.sin(2 * np.pi * (150 + 25 * np.sin(2 * np.pi * 0.6 * t)) * t)
+    gate = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float32)
+    samples = 0.3 * gate * voiced * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)) + 0.002 * rng.standard_normal(t.size)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples.astype(np.float32), rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def stages(embed: bool) -> list:
+    steps = [
+        lambda ctx: ctx.speech(),                      # VAD before transcription
+        lambda ctx: ctx.log_mel(80),                   # cascade fast model
+        lambda ctx: ctx.log_mel(80),                   # cascade full model
+        lambda ctx: ctx.log_mel(80),                   # challenge decoder
+        lambda ctx: acoustic_stress(ctx.samples, 12, rms=ctx.rms()),
+    ]
+    if embed:
+        from app.utils.voiceprint import embed_voice
+        steps += [embed_voice, embed_voice]            # blacklist screen, voiceprint check
+    return steps
+
+
+def run_request(payload: bytes, steps: list, shared: bool) -> dict:
+    contexts = []
+    ctx = None
+    for step in steps:
+        if ctx is None or not shared:
+            ctx = AudioContext.from_bytes(payload, "audio/wav")
+            contexts.append(ctx)
+        step(ctx)
+    stats = [c.stats() for c in contexts]
+    return {
+        "decodes": len(contexts),
+        "allocations": sum(s["allocations"] for s in stats),
+        "allocated_mb": sum(s["allocated_bytes"] for s in stats) / 2**20,
+    }
+
+
+def measure(payload: bytes, steps: list, shared: bool, runs: int) -> dict:
+    run_request(payload, steps, shared)  # warm-up
+    wall = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        counts = run_request(payload, steps, shared)
+        wall.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    run_request(payload, steps, shared)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        **counts,
+        "peak_mb": peak / 2**20,
+        "p50": np.percentile(wall, 50),
+        "p95": np.percentile(wall, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--embed", action="store_true", help="include speaker embeddings (loads resemblyzer)")
+    args = parser.parse_args()
+
+    payload = make_wav(args.seconds, args.rate)
+    steps = stages(args.embed)
+    print(f"{len(steps)} stages, {args.seconds:.1f} s clip at {args.rate} Hz\n")
+    print(f"{'mode':>9} {'decodes':>8} {'arrays':>7} {'alloc MB':>9} {'peak MB':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for shared in (False, True):
+        r = measure(payload, steps, shared, args.runs)
+        mode = "shared" if shared else "separate"
+        print(f"{mode:>9} {r['decodes']:8d} {r['allocations']:7d} {r['allocated_mb']:9.2f} "
+              f"{r['peak_mb']:8.2f} {r['p50']:8.2f} {r['p95']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
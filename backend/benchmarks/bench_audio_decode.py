@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request audio ingest overhead.
+
+Compares the old path (write the upload to a temp file, then let Whisper
+decode it through an ffmpeg subprocess) with in-process decoding of the
+request body via audio_io.decode_audio_bytes. No model inference is run.
+
+Usage (from backend/):
+    python benchmarks/bench_audio_decode.py [--seconds 4] [--rate 44100] [--runs 50]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import soundfile as sf
+import whisper
+from app.utils.audio_io import decode_audio_bytes
+
+
+def make_wav(seconds: float, rate: int) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    samples = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    buffer = io.BytesIO()
+    sf.write(buffer, samples.astype(np.float32), rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def via_tempfile_ffmpeg(payload: bytes) -> np.ndarray:
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+        f.write(payload)
+        path = f.name
+    try:
+        return whisper.load_audio(path)
+    finally:
+        os.remove(path)
+
+
+def via_in_process(payload: bytes) -> np.ndarray:
+    return decode_audio_bytes(payload, "audio/wav")
+
+
+def timed(fn, payload: bytes, runs: int) -> list:
+    fn(payload)  # warm-up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=4)
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = make_wav(args.seconds, args.rate)
+    print(f"{args.seconds}s WAV @ {args.rate} Hz ({len(payload) / 1024:.0f} KiB), {args.runs} runs\n")
+
+    a = via_tempfile_ffmpeg(payload)
+    b = via_in_process(payload)
+    print(f"output samples: ffmpeg={len(a)} in-process={len(b)}\n")
+
+    results = {
+        "temp file + ffmpeg": timed(via_tempfile_ffmpeg, payload, args.runs),
+        "in-process decode": timed(via_in_process, payload, args.runs),
+    }
+    for name, samples in results.items():
+        print(f"{name:>20}: p50 {np.percentile(samples, 50):7.2f} ms   p95 {np.percentile(samples, 95):7.2f} ms")
+
+    saved = np.median(results["temp file + ffmpeg"]) - np.median(results["in-process decode"])
+    print(f"\nper-request overhead saved (median): {saved:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
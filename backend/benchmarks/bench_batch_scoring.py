@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Throughput of bulk scam-check / risk scoring versus worker processes.
+
+Scores a synthetic set of stored transcripts through batch_scoring.score_batch
+with 0 (inline), 1, 2 and 4 workers and reports items per second. Pool
+start-up is excluded by running one small warm-up batch per pool first.
+
+Usage (from backend/):
+    python benchmarks/bench_batch_scoring.py [--items 50000] [--workers 0 1 2 4] [--kind risk]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.batch_scoring import score_batch, shutdown_batch_pools
+from app.utils.phrase_dictionary import get_phrase_dictionary
+
+SPEECH = (
+    "hello yes i am calling about my account i think there was a payment "
+    "please help me the card was used somewhere i was worried so i called "
+    "the bank and they said to wait a day before i send money to my brother"
+).split()
+
+
+def synthetic_items(n: int, kind: str) -> list:
+    rng = random.Random(0)
+    phrases = list(get_phrase_dictionary().scam_phrases)
+    items = []
+    for _ in range(n):
+        words = [rng.choice(SPEECH) for _ in range(rng.randint(20, 60))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(phrases))
+        text = " ".join(words)
+        if kind == "scam":
+            items.append({"text": text})
+        else:
+            items.append({
+                "transcript": text,
+                "amount": rng.choice([500, 5_000, 20_000, 75_000, 150_000]),
+                "is_liveness_passed": rng.random() > 0.1,
+                "stress_level": rng.choice(["low", "low", "medium", "high"]),
+            })
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--kind", choices=["scam", "risk"], default="risk")
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items, args.kind)
+    print(f"{args.items} {args.kind} items, chunk size {args.chunk_size}\n")
+    print(f"{'workers':>7} {'seconds':>8} {'items/s':>9} {'speed-up':>9}")
+
+    baseline = None
+    for workers in args.workers:
+        for _ in score_batch(args.kind, items[: args.chunk_size * max(workers, 1)], workers, args.chunk_size):
+            pass  # warm-up: start the pool and load the dictionary
+
+        start = time.perf_counter()
+        count = sum(1 for _ in score_batch(args.kind, items, workers, args.chunk_size))
+        seconds = time.perf_counter() - start
+        rate = count / seconds
+        baseline = baseline or rate
+        print(f"{workers:>7} {seconds:8.2f} {rate:9.0f} {rate / baseline:8.2f}x")
+
+    shutdown_batch_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Effect of the decision cache on a retry-heavy risk evaluation stream.
+
+Generates --evaluations distinct evaluations (transcript, amount, ...)
+and sends each one plus a geometric number of retries (mean --retries),
+interleaved the way concurrent clients would. The stream is scored once
+directly with calculate_transaction_risk() and once through
+cached_decision(), reporting the hit rate, the latency of hits and
+misses, total time saved, and that every replay equals the first answer
+for its inputs.
+
+Usage (from backend/):
+    python benchmarks/bench_decision_cache.py [--evaluations 20000] [--retries 1.5]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.decision_cache import DecisionCache, decision_key
+from app.utils.security_utils import calculate_transaction_risk, risk_state
+
+WORDS = ("hello please send the money to my account urgently your card is blocked "
+         "share the otp now police case refund lottery prize").split()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evaluations", type=int, default=20_000)
+    parser.add_argument("--retries", type=float, default=1.5, help="mean retries per evaluation")
+    parser.add_argument("--ttl", type=float, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    evaluations = [
+        {
+            "amount": rng.choice([500, 2500, 15000, 60000, 150000]),
+            "transcript": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))),
+            "is_liveness_passed": rng.random() > 0.1,
+            "stress_level": rng.choice(["low", "medium", "high"]),
+            "voice_blacklist_similarity": None,
+            "user_id": None,
+            "recipient_account": None,
+        }
+        for _ in range(args.evaluations)
+    ]
+    # Each evaluation is sent once plus Geometric retries, shuffled within a short window
+    p = 1 / (1 + args.retries)
+    stream = []
+    for i in range(args.evaluations):
+        stream.extend([i] * int(np.random.default_rng(i).geometric(p)))
+    window = 64
+    for start in range(0, len(stream), window):
+        chunk = stream[start:start + window]
+        rng.shuffle(chunk)
+        stream[start:start + window] = chunk
+
+    start = time.perf_counter()
+    for i in stream:
+        calculate_transaction_risk(**evaluations[i])
+    direct_s = time.perf_counter() - start
+
+    cache = DecisionCache(max_entries=10_000, ttl=args.ttl)
+    first, hit_us, miss_us, mismatches = {}, [], [], 0
+    start = time.perf_counter()
+    for i in stream:
+        t0 = time.perf_counter()
+        key = decision_key("risk_evaluate", {**evaluations[i], "state": risk_state(evaluations[i]["user_id"])})
+        result = cache.get("risk_evaluate", key)
+        hit = result is not None
+        if not hit:
+            result = calculate_transaction_risk(**evaluations[i])
+            cache.put(key, result)
+        (hit_us if hit else miss_us).append((time.perf_counter() - t0) * 1e6)
+        mismatches += first.setdefault(i, result) != result
+    cached_s = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"{len(stream)} requests for {args.evaluations} evaluations "
+          f"({len(stream) / args.evaluations - 1:.2f} retries each)")
+    print(f"hit rate {stats['hit_rate']:.1%}, {stats['entries']} entries, {stats['evictions']} evictions")
+    print(f"hit  p50 {np.percentile(hit_us, 50):7.1f} us   miss p50 {np.percentile(miss_us, 50):7.1f} us")
+    print(f"direct {direct_s:.2f} s, cached {cached_s:.2f} s ({direct_s / cached_s:.2f}x), "
+          f"replays differing from the first answer: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
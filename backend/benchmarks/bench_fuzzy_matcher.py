@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Recall and throughput of fuzzy scam-phrase matching on mangled transcripts.
+
+Builds a corpus of synthetic call transcripts. Half contain one scam phrase
+garbled the way ASR output tends to be: letters spelled out, digit
+look-alikes, dropped, doubled or swapped letters, merged or split words.
+The rest are clean. Reports recall of the exact automaton alone and with
+the fuzzy pass, the false-positive rate on clean transcripts, the share of
+a corpus of legitimate banking sentences, many a few edits away from a
+scam phrase, that the fuzzy pass flags, and per transcript latency as the
+phrase list grows. The flagged legitimate sentences are listed at the end.
+
+Usage (from backend/):
+    python benchmarks/bench_fuzzy_matcher.py [--sizes 12 1000 10000] [--transcripts 500]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.phrase_matcher import PhraseMatcher
+from app.utils.fuzzy_matcher import FuzzyPhraseMatcher
+from app.utils.phrase_dictionary import get_phrase_dictionary
+
+SCAM_PHRASES = list(get_phrase_dictionary().scam_phrases)
+
+FILLER = (
+    "hello yes i am calling about my payment i think there was a problem "
+    "with the card yesterday so i wanted to check the balance and the last "
+    "few transactions before i send money to my brother"
+).split()
+
+DECOY_WORDS = (
+    "account bank card otp kyc link password identity blocked suspended "
+    "verify update confirm urgent action refund prize customer details"
+).split()
+
+# Legitimate things customers and agents say, many close to a scam phrase
+LEGIT_SENTENCES = [
+    "my account is locked after three wrong pin attempts",
+    "please update your passport details at the branch",
+    "i need the verification for bank transfer limits",
+    "click this linkedin post to see our new branch",
+    "my kyc expires next week so i will visit the branch",
+    "the account is unblocked now thank you",
+    "i want to confirm your address before we post the card",
+    "can you update your postal address in the app",
+    "please verify the identity documents you uploaded",
+    "i shared the otp screen with nobody",
+    "there was unusual activity on my credit report",
+    "my savings account is suspended interest wise",
+    "the account was blocked by me when i lost my card",
+    "click here to download the statement pdf",
+    "urgent payment of the electricity bill is due today",
+    "i would like to update my password hint question",
+    "the bank sent verification from the official app",
+    "my wife's account is locked too",
+    "can i confirm the details of my standing order",
+    "i received the kyc form and sent it back",
+    "this link is for the loan calculator on your website",
+    "my card is locked for online payments",
+    "please confirm the amount before i transfer",
+    "the branch said my account is blocked for cheques only",
+    "i want to verify my identity in person",
+    "is the passport details update mandatory",
+    "the action required is signing the loan papers",
+    "my fixed deposit account is closed",
+    "share the statement with my accountant",
+    "please update your pass book at the kiosk",
+    "i clicked the link in the banking app itself",
+    "the account is locked because of the court order",
+    "my daughter's kyc expires in march",
+    "can you tell me the unusual charges on this statement",
+    "verification for bank account opening takes two days",
+    "the official app asked me to update my profile photo",
+    "i want to unblock my account please",
+    "how do i share my account number with my employer",
+    "your cheque book is ready for collection",
+    "confirm your delivery address for the new card",
+]
+
+LOOKALIKES = {"o": "0", "i": "1", "e": "3", "s": "5"}
+
+
+def spell_out(phrase, rng):
+    words = phrase.split()
+    i = rng.randrange(len(words))
+    words[i] = " ".join(words[i])
+    return " ".join(words)
+
+
+def lookalike(phrase, rng):
+    spots = [i for i, ch in enumerate(phrase) if ch in LOOKALIKES]
+    if not spots:
+        return phrase
+    i = rng.choice(spots)
+    return phrase[:i] + LOOKALIKES[phrase[i]] + phrase[i + 1:]
+
+
+def drop_char(phrase, rng):
+    spots = [i for i, ch in enumerate(phrase) if ch != " "]
+    i = rng.choice(spots[1:-1] or spots)
+    return phrase[:i] + phrase[i + 1:]
+
+
+def double_char(phrase, rng):
+    i = rng.randrange(len(phrase))
+    return phrase[:i] + phrase[i] + phrase[i:]
+
+
+def swap_chars(phrase, rng):
+    i = rng.randrange(len(phrase) - 1)
+    return phrase[:i] + phrase[i + 1] + phrase[i] + phrase[i + 2:]
+
+
+def merge_words(phrase, rng):
+    return phrase.replace(" ", "", 1)
+
+
+MANGLERS = [spell_out, lookalike, drop_char, double_char, swap_chars, merge_words]
+
+
+def synthetic_phrases(n, rng):
+    phrases = list(SCAM_PHRASES[:n])
+    seen = set(phrases)
+    while len(phrases) < n:
+        phrase = " ".join(rng.choice(DECOY_WORDS) for _ in range(rng.randint(2, 4)))
+        if phrase not in seen:
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases
+
+
+def corpus(n, rng):
+    """(transcript, planted phrase or None) pairs; half are clean."""
+    items = []
+    for i in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(20, 50))]
+        planted = None
+        if i % 2 == 0:
+            planted = rng.choice(SCAM_PHRASES)
+            words.insert(rng.randrange(len(words) + 1), rng.choice(MANGLERS)(planted, rng))
+        items.append((" ".join(words), planted))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[len(SCAM_PHRASES), 1_000, 10_000])
+    parser.add_argument("--transcripts", type=int, default=500)
+    args = parser.parse_args()
+
+    items = corpus(args.transcripts, random.Random(0))
+    planted = [(text, phrase) for text, phrase in items if phrase]
+    clean = [text for text, phrase in items if not phrase]
+
+    print(f"{len(planted)} mangled, {len(clean)} clean transcripts\n")
+    print(f"{'phrases':>8} {'build ms':>9} {'exact recall':>13} {'fuzzy recall':>13} "
+          f"{'clean FP':>9} {'legit FP':>9} {'p50 us':>8} {'p95 us':>8} {'per sec':>9}")
+    flagged = []
+    for size in args.sizes:
+        phrases = synthetic_phrases(size, random.Random(size))
+        start = time.perf_counter()
+        exact = PhraseMatcher({"scam": phrases})
+        fuzzy = FuzzyPhraseMatcher(phrases)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def detect(text):
+            found = exact.find(text)["scam"]
+            return found + [m["phrase"] for m in fuzzy.find(text, exclude=found)]
+
+        exact_hits = sum(phrase in exact.find(text)["scam"] for text, phrase in planted)
+        fuzzy_hits = sum(phrase in detect(text) for text, phrase in planted)
+        false_pos = sum(bool(detect(text)) for text in clean)
+        legit_hits = [(text, fuzzy.find(text, exclude=exact.find(text)["scam"])) for text in LEGIT_SENTENCES]
+        legit_hits = [(text, [m["phrase"] for m in found]) for text, found in legit_hits if found]
+        if size == len(SCAM_PHRASES):
+            flagged = legit_hits
+
+        latencies = []
+        for text, _ in items:
+            t0 = time.perf_counter()
+            detect(text)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+
+        print(f"{size:>8} {build_ms:9.1f} {exact_hits / len(planted):13.3f} {fuzzy_hits / len(planted):13.3f} "
+              f"{false_pos / len(clean):9.3f} {len(legit_hits) / len(LEGIT_SENTENCES):9.3f} "
+              f"{np.percentile(latencies, 50):8.1f} {np.percentile(latencies, 95):8.1f} "
+              f"{len(items) / (sum(latencies) / 1e6):9.0f}")
+
+    print(f"\nlegitimate sentences fuzzy-matched with the {len(SCAM_PHRASES)} dictionary phrases:")
+    for text, found in flagged:
+        print(f"  {text!r}: {', '.join(found)}")
+
+
+if __name__ == "__main__":
+    main()
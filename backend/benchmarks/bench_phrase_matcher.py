@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-pass phrase matching against per-phrase substring checks.
+
+For 10, 1k and 10k synthetic scam phrases (plus the stress and filler
+vocabularies), compares the old approach - one `in` check per phrase, one
+padded string per filler word - with one scan of a compiled
+PhraseMatcher. Both must report the same hits.
+
+Usage (from backend/):
+    python benchmarks/bench_phrase_matcher.py [--sizes 10 1000 10000] [--transcripts 200]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.phrase_matcher import PhraseMatcher
+from app.utils.phrase_dictionary import get_phrase_dictionary
+
+_dictionary = get_phrase_dictionary()
+SCAM_PHRASES = list(_dictionary.scam_phrases)
+STRESS_KEYWORDS = _dictionary.stress_keywords
+FILLER_WORDS = list(_dictionary.filler_words)
+
+WORDS = (
+    "account bank otp kyc verify identity password link blocked suspended urgent "
+    "transfer money card number pin code customer support refund prize lottery "
+    "details confirm update expired security team call back today now sir madam"
+).split()
+
+SPEECH = (
+    "hello yes i am calling about my account i think um there was a payment "
+    "please help me you know the card was basically used somewhere i was worried "
+    "so i called the bank and they said to wait like a day"
+).split()
+
+
+def synthetic_phrases(n: int, rng: random.Random) -> list:
+    phrases = list(SCAM_PHRASES[:n])
+    seen = set(phrases)
+    while len(phrases) < n:
+        phrase = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4)))
+        if phrase not in seen:
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases
+
+
+def synthetic_transcripts(n: int, phrases: list, rng: random.Random) -> list:
+    transcripts = []
+    for _ in range(n):
+        words = [rng.choice(SPEECH) for _ in range(rng.randint(20, 60))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        transcripts.append(" ".join(words))
+    return transcripts
+
+
+def naive(text: str, phrases: list) -> dict:
+    text_lower = text.lower()
+    padded = f" {text_lower.strip()} "
+    return {
+        "scam": [p for p in phrases if p in text_lower],
+        "stress": [k for k in STRESS_KEYWORDS if k in text_lower],
+        "filler": [w for w in FILLER_WORDS if f" {w} " in padded],
+    }
+
+
+def timed_us(fn, transcripts: list) -> tuple:
+    samples = []
+    for text in transcripts:
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--transcripts", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'phrases':>8} {'states':>8} {'build ms':>9} {'naive p50':>10} {'naive p95':>10} "
+          f"{'ac p50':>8} {'ac p95':>8}  (us per transcript)")
+    for size in args.sizes:
+        rng = random.Random(size)
+        phrases = synthetic_phrases(size, rng)
+        transcripts = synthetic_transcripts(args.transcripts, phrases, rng)
+
+        start = time.perf_counter()
+        matcher = PhraseMatcher(
+            {"scam": phrases, "stress": list(STRESS_KEYWORDS), "filler": FILLER_WORDS},
+            whole_word=("filler",),
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for text in transcripts:
+            assert matcher.find(text) == naive(text, phrases), text
+
+        n50, n95 = timed_us(lambda text: naive(text, phrases), transcripts)
+        a50, a95 = timed_us(matcher.find, transcripts)
+        print(f"{size:>8} {matcher.states:>8} {build_ms:9.1f} {n50:10.1f} {n95:10.1f} {a50:8.1f} {a95:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency of the hashed n-gram scam classifier.
+
+Trains on synthetic call transcripts built from scam and everyday banking
+script templates, then scores a held-out set written with templates the
+model never saw. Reports held-out accuracy next to the keyword detector,
+single-transcript latency (fresh TextContext each time) and batch
+throughput over the memory-mapped weights.
+
+Usage (from backend/):
+    python benchmarks/bench_scam_classifier.py [--train 4000] [--test 1000] [--features 18]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.text_context import TextContext
+from app.utils.security_utils import detect_scam_phrases
+from app.utils.scam_classifier import ScamClassifier, train_scam_classifier
+
+SLOTS = {
+    "org": ["the bank", "your bank", "the cyber cell", "customer care", "the tax department", "the courier company"],
+    "thing": ["account", "card", "kyc", "sim", "wallet", "pan card"],
+    "secret": ["otp", "pin", "password", "cvv", "verification code"],
+    "amount": ["five thousand", "twenty thousand", "one lakh", "ninety nine rupees", "two thousand"],
+    "person": ["my brother", "my landlord", "the school", "my mother", "the electrician"],
+}
+
+SCAM_TRAIN = [
+    "hello this is {org} your {thing} has been suspended please share the {secret} to reactivate it",
+    "sir your {thing} will be blocked today tell me the {secret} you just received",
+    "we are calling from {org} you have won a prize pay {amount} processing fee now",
+    "your {thing} kyc is pending read out the {secret} or the {thing} will be closed",
+    "madam this is urgent a case is filed against you transfer {amount} to a safe account",
+    "install the remote support app and give me the {secret} so i can fix your {thing}",
+]
+SCAM_TEST = [
+    "good morning i am an officer from {org} your {thing} shows suspicious activity kindly confirm the {secret}",
+    "to stop the penalty you must move {amount} into the verification account immediately",
+    "your parcel is held by {org} pay {amount} customs and read me the {secret}",
+    "this is {org} refund department share your {thing} number and {secret} to receive the refund",
+]
+LEGIT_TRAIN = [
+    "hi i want to send {amount} to {person} for the rent this month",
+    "can you tell me the balance of my {thing} please",
+    "i would like to pay {person} {amount} for the repairs",
+    "please transfer {amount} to {person} today thank you",
+    "i lost my {thing} yesterday can you help me block it",
+    "what is the status of the payment i made to {person}",
+]
+LEGIT_TEST = [
+    "hello i am calling to check whether {amount} reached {person}",
+    "i need to update the address on my {thing} with {org}",
+    "send {amount} to {person} as usual for the fees",
+    "how do i set a new {secret} for my {thing} at the branch",
+]
+
+
+def fill(template: str, rng: random.Random) -> str:
+    return template.format(**{slot: rng.choice(values) for slot, values in SLOTS.items()})
+
+
+def corpus(n: int, scam_templates: list, legit_templates: list, seed: int):
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(n):
+        scam = i % 2 == 0
+        texts.append(fill(rng.choice(scam_templates if scam else legit_templates), rng))
+        labels.append(int(scam))
+    return texts, np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train", type=int, default=4_000)
+    parser.add_argument("--test", type=int, default=1_000)
+    parser.add_argument("--features", type=int, default=18, help="log2 of the hashed feature space")
+    parser.add_argument("--runs", type=int, default=2_000)
+    args = parser.parse_args()
+
+    train_texts, train_labels = corpus(args.train, SCAM_TRAIN, LEGIT_TRAIN, seed=0)
+    test_texts, test_labels = corpus(args.test, SCAM_TEST, LEGIT_TEST, seed=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scam_model.npy")
+        start = time.perf_counter()
+        train_scam_classifier(train_texts, train_labels, path, n_features=2 ** args.features)
+        train_s = time.perf_counter() - start
+        model = ScamClassifier(path)
+        size_mb = os.path.getsize(path) / 2**20
+
+        probabilities = model.predict_proba_batch(test_texts)
+        model_acc = np.mean((probabilities >= model.threshold) == test_labels)
+        keyword_acc = np.mean([detect_scam_phrases(t)["detected"] for t in test_texts] == test_labels)
+
+        print(f"trained on {args.train} transcripts in {train_s:.2f} s, "
+              f"{2 ** args.features} features ({size_mb:.1f} MB mapped)")
+        print(f"held-out accuracy (unseen templates): classifier {model_acc:.3f}, keywords {keyword_acc:.3f}\n")
+
+        latencies = []
+        for i in range(args.runs):
+            text = TextContext(test_texts[i % len(test_texts)])
+            t0 = time.perf_counter()
+            model.predict_proba(text)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+        print(f"single transcript: p50 {np.percentile(latencies, 50):.1f} us, "
+              f"p95 {np.percentile(latencies, 95):.1f} us\n")
+
+        print(f"{'batch':>6} {'ms':>8} {'per sec':>9}")
+        for size in (1, 16, 256, 1024):
+            batch = (test_texts * (size // len(test_texts) + 1))[:size]
+            rounds = max(1, 4096 // size)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                model.predict_proba_batch([TextContext(t) for t in batch])
+            seconds = (time.perf_counter() - start) / rounds
+            print(f"{len(batch):>6} {seconds * 1000:8.3f} {len(batch) / seconds:9.0f}")
+        del model
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request text analysis with and without a shared TextContext.
+
+Runs the transcript-side stages of a liveness + transfer request
+(verify_speaker, validate_challenge, detect_emotion, detect_scam_phrases
+and the transaction risk score). "separate" gives every analyzer its own
+context, as when each one lowercased, tokenized and scanned the text
+itself; "shared" runs them all on one context. No Whisper inference is run.
+
+Usage (from backend/):
+    python benchmarks/bench_text_context.py [--words 40] [--runs 2000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.text_context import TextContext
+from app.utils.ml_utils import verify_speaker, detect_emotion, detect_scam_phrases
+from app.utils.security_utils import validate_challenge, calculate_transaction_risk
+
+SPEECH = (
+    "hello yes um i am calling about my account i think there was a payment "
+    "please help me the card was used somewhere urgent i was worried so i "
+    "called the bank and they said to wait before i send money to my brother"
+).split()
+
+CHALLENGE = "green mango"
+
+STAGES = [
+    lambda text: verify_speaker(text, CHALLENGE),
+    lambda text: validate_challenge(text, CHALLENGE),
+    lambda text: detect_emotion(text),
+    lambda text: detect_scam_phrases(text),
+    lambda text: calculate_transaction_risk(75_000, text, True, "low"),
+]
+
+
+def make_transcript(words: int) -> str:
+    rng = random.Random(0)
+    tokens = [rng.choice(SPEECH) for _ in range(words)]
+    tokens.insert(words // 2, "Green Mango")
+    tokens.insert(words // 3, "share OTP")
+    return " ".join(tokens)
+
+
+def run_request(transcript: str, shared: bool) -> dict:
+    contexts = []
+    ctx = None
+    for stage in STAGES:
+        if ctx is None or not shared:
+            ctx = TextContext(transcript)
+            contexts.append(ctx)
+        stage(ctx)
+    stats = [c.stats() for c in contexts]
+    return {
+        "contexts": len(contexts),
+        "derived": sum(s["derived"] for s in stats),
+        "reuse_hits": sum(s["reuse_hits"] for s in stats),
+    }
+
+
+def measure(transcript: str, shared: bool, runs: int) -> dict:
+    run_request(transcript, shared)  # warm-up: load the dictionary
+    wall = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        counts = run_request(transcript, shared)
+        wall.append((time.perf_counter() - start) * 1e6)
+
+    tracemalloc.start()
+    run_request(transcript, shared)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        **counts,
+        "peak_kb": peak / 2**10,
+        "p50": np.percentile(wall, 50),
+        "p95": np.percentile(wall, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    transcript = make_transcript(args.words)
+    print(f"{len(STAGES)} analyzers, {len(transcript.split())}-word transcript\n")
+    print(f"{'mode':>9} {'contexts':>9} {'derived':>8} {'reused':>7} {'peak KB':>8} {'p50 us':>8} {'p95 us':>8}")
+    for shared in (False, True):
+        r = measure(transcript, shared, args.runs)
+        mode = "shared" if shared else "separate"
+        print(f"{mode:>9} {r['contexts']:9d} {r['derived']:8d} {r['reuse_hits']:7d} "
+              f"{r['peak_kb']:8.1f} {r['p50']:8.1f} {r['p95']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
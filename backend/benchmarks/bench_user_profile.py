@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Update/query cost, memory and accuracy of behavioural profiles at scale.
+
+Fills a ProfileStore with --users users, each with --transfers past
+transfers to a handful of their own recipients, then times record() and
+features() on random users and reports the per-user arrays plus the
+growth in process RSS (which includes the user-id index). A sample of
+users is checked against exact mean/std z-scores from the raw amounts,
+known recipients must never look new, and the share of unseen recipients
+that look known measures the Bloom filter's false-positive rate.
+
+Usage (from backend/):
+    python benchmarks/bench_user_profile.py [--users 2000000] [--transfers 8] [--ops 200000]
+"""
+import os
+import sys
+import math
+import time
+import argparse
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.user_profile import ProfileStore, _MIN_STD
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2_000_000)
+    parser.add_argument("--transfers", type=int, default=8, help="past transfers per user")
+    parser.add_argument("--recipients", type=int, default=4, help="distinct recipients per user")
+    parser.add_argument("--ops", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ids = [f"user_{i}" for i in range(args.users)]
+    # Each user sends amounts around their own typical level
+    levels = rng.normal(8, 1.0, args.users)
+    amounts = np.round(np.exp(levels[:, None] + rng.normal(0, 0.4, (args.users, args.transfers))), 2)
+    recipients = rng.integers(0, args.recipients, (args.users, args.transfers))
+    hours = rng.integers(8, 22, (args.users, args.transfers)) * 3600.0
+
+    rss_before = rss_mb()
+    store = ProfileStore(max_users=args.users)
+    start = time.perf_counter()
+    for u in range(args.users):
+        uid = ids[u]
+        for k in range(args.transfers):
+            store.record(uid, amounts[u, k], f"ACC{u}_{recipients[u, k]}", now=hours[u, k])
+    fill_s = time.perf_counter() - start
+    n_records = args.users * args.transfers
+    stats = store.stats()
+    print(f"{stats['users']} users, {n_records} transfers loaded in {fill_s:.1f} s "
+          f"({n_records / fill_s:,.0f} records/s)")
+    print(f"arrays {stats['allocated_mb']:.1f} MB ({stats['bytes_per_user']} B/user), "
+          f"RSS growth incl. user index {rss_mb() - rss_before:.1f} MB\n")
+
+    # record() is timed on a separate store so the accuracy check below
+    # sees only the loaded history
+    picks = rng.integers(0, args.users, args.ops).tolist()
+    feature_us = []
+    for u in picks:
+        t0 = time.perf_counter()
+        store.features(ids[u], 5000.0, f"ACC{u}_0")
+        feature_us.append((time.perf_counter() - t0) * 1e6)
+    probe = ProfileStore(max_users=args.ops)
+    record_us = []
+    for i, u in enumerate(picks):
+        t0 = time.perf_counter()
+        probe.record(ids[u], 5000.0, f"ACC{u}_{i % 7}")
+        record_us.append((time.perf_counter() - t0) * 1e6)
+    for name, lat in (("record", record_us), ("features", feature_us)):
+        print(f"{name:>8}: p50 {np.percentile(lat, 50):5.1f} us, p95 {np.percentile(lat, 95):5.1f} us, "
+              f"{len(lat) / (sum(lat) / 1e6):,.0f}/s")
+
+    sample = rng.choice(args.users, min(20_000, args.users), replace=False).tolist()
+    z_error, missed_known, false_known, unseen = 0.0, 0, 0, 0
+    for u in sample:
+        x = np.log1p(amounts[u])
+        std = max(float(x.std(ddof=1)), _MIN_STD)
+        probe_amount = float(amounts[u].max()) * 3
+        exact_z = (math.log1p(probe_amount) - x.mean()) / std
+        got = store.features(ids[u], probe_amount)
+        z_error = max(z_error, abs(got["amount_z"] - exact_z))
+        for r in set(recipients[u].tolist()):
+            missed_known += store.features(ids[u], 1.0, f"ACC{u}_{r}")["new_recipient"]
+        for r in range(args.recipients, args.recipients + 5):
+            unseen += 1
+            false_known += not store.features(ids[u], 1.0, f"ACC{u}_{r}")["new_recipient"]
+    print(f"\nsample of {len(sample)} users: max |z - exact z| {z_error:.2e}, "
+          f"known recipients flagged new {missed_known}, "
+          f"unseen recipients looking known {false_known / unseen:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Update/query cost and memory of the per-user velocity store at scale.
+
+Fills a VelocityStore with --users active users over a simulated day of
+transfers, then times record() and query() on random users and reports
+the per-user arrays plus the growth in process RSS (which includes the
+user-id index). A sample of users is checked against exact sliding-window
+counts and sums computed from the raw events.
+
+Usage (from backend/):
+    python benchmarks/bench_velocity.py [--users 1000000] [--transfers 3] [--ops 200000]
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.velocity import VelocityStore, window_label
+
+DAY = 86400.0
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--transfers", type=int, default=3, help="transfers per user over the simulated day")
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--max-events", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_events = args.users * args.transfers
+    users = rng.integers(0, args.users, n_events)
+    times = np.sort(rng.uniform(0, DAY, n_events))
+    amounts = np.round(rng.lognormal(8, 1.2, n_events), 2)
+    ids = [f"user_{i}" for i in range(args.users)]
+    events = list(zip(users.tolist(), times.tolist(), amounts.tolist()))
+
+    rss_before = rss_mb()
+    store = VelocityStore(max_events=args.max_events, max_users=args.users)
+    start = time.perf_counter()
+    for u, t, a in events:
+        store.record(ids[u], a, now=t)
+    fill_s = time.perf_counter() - start
+    stats = store.stats()
+    print(f"{stats['users']} users, {n_events} transfers loaded in {fill_s:.1f} s "
+          f"({n_events / fill_s:,.0f} records/s)")
+    print(f"arrays {stats['allocated_mb']:.1f} MB ({stats['bytes_per_user']} B/user), "
+          f"RSS growth incl. user index {rss_mb() - rss_before:.1f} MB\n")
+
+    now = DAY
+    picks = rng.integers(0, args.users, args.ops).tolist()
+    record_us, query_us = [], []
+    for i, u in enumerate(picks):
+        t0 = time.perf_counter()
+        if i % 2:
+            store.record(ids[u], 1000.0, now=now)
+            record_us.append((time.perf_counter() - t0) * 1e6)
+        else:
+            store.query(ids[u], now=now)
+            query_us.append((time.perf_counter() - t0) * 1e6)
+    for name, lat in (("record", record_us), ("query", query_us)):
+        print(f"{name:>7}: p50 {np.percentile(lat, 50):5.1f} us, p95 {np.percentile(lat, 95):5.1f} us, "
+              f"{len(lat) / (sum(lat) / 1e6):,.0f}/s")
+
+    # Exact check on a sample; the probe transfers above happened at `now`
+    probes = {}
+    for i, u in enumerate(picks):
+        if i % 2:
+            probes[u] = probes.get(u, 0) + 1
+    sample = rng.choice(args.users, 200, replace=False).tolist()
+    wrong = 0
+    for u in sample:
+        got = store.query(ids[u], now=now)
+        mine = users == u
+        for w in store.windows:
+            inside = mine & (times > now - w)
+            count = int(inside.sum()) + probes.get(u, 0)
+            total = float(amounts[inside].sum()) + 1000.0 * probes.get(u, 0)
+            if count <= args.max_events:
+                wrong += got[w][0] != count or abs(got[w][1] - total) > 1e-6 * max(total, 1)
+            else:
+                wrong += got[w][0] != args.max_events
+    print(f"\nsample of {len(sample)} users x {len(store.windows)} windows "
+          f"({', '.join(window_label(w) for w in store.windows)}): {wrong} mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark 1:N voice blacklist search at 10k, 100k and 1M entries.
+
+For each size a random blacklist is written to a temp directory, opened
+memory-mapped, and searched with a full matmul scan and with the
+clustered pre-filter. Recall@k of the pre-filter is measured against the
+exact scan.
+
+Usage (from backend/):
+    python benchmarks/bench_voice_blacklist.py [--sizes 10000 100000 1000000] [--queries 50]
+
+The 1M case writes ~1 GB of embeddings to the temp directory.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.voice_blacklist import VoiceBlacklist, build_blacklist
+from app.utils.voiceprint import EMBEDDING_DIM
+
+
+def clustered_embeddings(n: int, n_speakers: int, seed: int) -> np.ndarray:
+    """Embeddings that bunch around speaker centres, like real voiceprints."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_speakers, EMBEDDING_DIM)).astype(np.float32)
+    labels = rng.integers(0, n_speakers, n)
+    embeddings = np.empty((n, EMBEDDING_DIM), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(start + 100_000, n)
+        noise = 0.6 * rng.standard_normal((end - start, EMBEDDING_DIM)).astype(np.float32)
+        embeddings[start:end] = centres[labels[start:end]] + noise
+    return embeddings
+
+
+def bench(blacklist: VoiceBlacklist, queries: np.ndarray, k: int, exact: bool) -> tuple:
+    blacklist.search(queries[0], k, exact=exact)  # fault pages in
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(blacklist.search(query, k, exact=exact))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 95), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} {'clusters':>8} {'exact p50':>10} {'exact p95':>10} "
+          f"{'ivf p50':>9} {'ivf p95':>9} {'recall@k':>9}  (ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            embeddings = clustered_embeddings(size, n_speakers=max(size // 50, 10), seed=size)
+            n_clusters = int(np.sqrt(size))
+            path = os.path.join(tmp, f"blacklist_{size}.npy")
+            build_blacklist(embeddings, [f"fraud_{i}" for i in range(size)], path, n_clusters=n_clusters)
+            del embeddings
+
+            blacklist = VoiceBlacklist(path, nprobe=args.nprobe)
+            rng = np.random.default_rng(0)
+            picks = rng.integers(0, size, args.queries)
+            queries = np.asarray(blacklist.matrix[np.sort(picks)])
+            queries = queries + 0.2 * rng.standard_normal(queries.shape).astype(np.float32)
+
+            e50, e95, exact = bench(blacklist, queries, args.k, exact=True)
+            i50, i95, approx = bench(blacklist, queries, args.k, exact=False)
+            recall = np.mean([
+                len({hit["id"] for hit in a} & {hit["id"] for hit in e}) / args.k
+                for a, e in zip(approx, exact)
+            ])
+            print(f"{size:>9} {n_clusters:>8} {e50:10.3f} {e95:10.3f} {i50:9.3f} {i95:9.3f} {recall:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for voiceprint enrolment and verification.
+
+Measures the speaker-embedding step on a synthetic clip, then the index
+update (enrolment) and the scoring step (verification) at several index
+sizes.
+
+Usage (from backend/):
+    python benchmarks/bench_voiceprint.py [clip.wav] [--runs 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.voiceprint import VoiceprintIndex, embed_voice, EMBEDDING_DIM
+from app.utils.audio_io import SAMPLE_RATE
+
+
+def synthetic_clip(seconds: float = 3.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    voiced = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / SAMPLE_RATE) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    return (0.2 * envelope * voiced + 0.005 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def random_unit_vectors(n: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def timed_ms(fn, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clip", nargs="?")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    audio = args.clip or synthetic_clip()
+    embed_voice(audio)  # loads the encoder once
+
+    p50, p95 = timed_ms(lambda: embed_voice(audio), args.runs)
+    print(f"embedding (per request):      p50 {p50:8.2f} ms   p95 {p95:8.2f} ms\n")
+
+    query = embed_voice(audio)
+    print(f"{'index size':>10} {'enrol p50 ms':>13} {'verify p50 ms':>14} {'1:N scan p50 ms':>16}")
+    for size in (1_000, 10_000, 100_000):
+        index = VoiceprintIndex(capacity=size + args.runs + 1)
+        for i, vector in enumerate(random_unit_vectors(size, seed=size)):
+            index.enroll(f"user_{i}", vector)
+
+        counter = iter(range(10 ** 9))
+        enrol, _ = timed_ms(lambda: index.enroll(f"new_{next(counter)}", query), args.runs)
+        verify, _ = timed_ms(lambda: index.score("user_0", query), args.runs)
+        scan, _ = timed_ms(lambda: index.score_all(query), args.runs)
+        print(f"{size:>10} {enrol:13.4f} {verify:14.4f} {scan:16.4f}")
+
+    print("\nEnd-to-end latency is dominated by the embedding step above.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark Whisper micro-batching against one-at-a-time transcription.
+
+Usage (from backend/):
+    python benchmarks/bench_whisper_batching.py [clip.wav ...]
+    python benchmarks/bench_whisper_batching.py --clips 32 --batch-size 8 --wait-ms 10
+
+Without clip paths, synthetic 2-5 s clips are generated. Runs on CPU.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import whisper
+from app.config import WHISPER_MODEL
+from app.utils.whisper_batcher import WhisperBatcher, SAMPLE_RATE
+
+
+def synthetic_clips(count: int, seed: int = 0) -> list:
+    """Voiced-ish tone bursts between 2 and 5 seconds long."""
+    rng = np.random.default_rng(seed)
+    clips = []
+    for _ in range(count):
+        seconds = rng.uniform(2, 5)
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        pitch = rng.uniform(110, 220)
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+        clip = envelope * np.sin(2 * np.pi * pitch * t) + 0.01 * rng.standard_normal(t.size)
+        clips.append((0.3 * clip).astype(np.float32))
+    return clips
+
+
+def run_sequential(model, clips: list) -> float:
+    start = time.perf_counter()
+    for clip in clips:
+        model.transcribe(clip, language="en", fp16=False)
+    return time.perf_counter() - start
+
+
+def run_batched(model, clips: list, batch_size: int, wait_ms: float) -> float:
+    batcher = WhisperBatcher(model, batch_size, wait_ms)
+    batcher.transcribe(clips[0])  # warm-up
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clips)) as pool:
+        list(pool.map(batcher.transcribe, clips))
+    elapsed = time.perf_counter() - start
+
+    print(f"  batches run: {batcher.batches_run - 1}, "
+          f"mean batch size: {(batcher.clips_decoded - 1) / max(batcher.batches_run - 1, 1):.1f}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="audio files to use instead of synthetic clips")
+    parser.add_argument("--clips", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=10)
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    args = parser.parse_args()
+
+    if args.paths:
+        clips = [whisper.load_audio(path) for path in args.paths]
+    else:
+        clips = synthetic_clips(args.clips)
+
+    print(f"Loading Whisper model ({args.model}) on cpu...")
+    model = whisper.load_model(args.model, device="cpu")
+    model.transcribe(clips[0], language="en", fp16=False)  # warm-up
+
+    print(f"\n{len(clips)} clips, batch size {args.batch_size}, max wait {args.wait_ms} ms\n")
+
+    sequential = run_sequential(model, clips)
+    print(f"one-at-a-time: {sequential:.2f}s  ({len(clips) / sequential:.2f} clips/sec)")
+
+    batched = run_batched(model, clips, args.batch_size, args.wait_ms)
+    print(f"micro-batched: {batched:.2f}s  ({len(clips) / batched:.2f} clips/sec)")
+
+    print(f"\nspeedup: {sequential / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
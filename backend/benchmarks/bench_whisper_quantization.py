@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Accuracy vs latency benchmark for int8-quantized Whisper on CPU.
+
+Runs the same fixed clip set through the fp32 model and the dynamically
+quantized int8 model, and reports word error rate, per-clip latency and
+model weight size for each.
+
+Usage (from backend/):
+    python benchmarks/bench_whisper_quantization.py manifest.tsv [--model base]
+
+The manifest is a tab-separated file of "<audio path>\\t<reference text>"
+lines; relative paths are resolved against the manifest's directory.
+"""
+import io
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+import whisper
+from app.config import WHISPER_MODEL
+from app.utils.ml_utils import quantize_model
+
+
+def load_manifest(path: str) -> list:
+    base = os.path.dirname(os.path.abspath(path))
+    clips = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            audio_path, reference = line.split("\t", 1)
+            if not os.path.isabs(audio_path):
+                audio_path = os.path.join(base, audio_path)
+            clips.append((whisper.load_audio(audio_path), reference))
+    return clips
+
+
+def normalize(text: str) -> list:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference: list, hypothesis: list) -> int:
+    """Levenshtein distance over words."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def model_size_mb(model) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def evaluate(model, clips: list) -> dict:
+    model.transcribe(clips[0][0], language="en", fp16=False)  # warm-up
+    errors = words = 0
+    latencies = []
+    for audio, reference in clips:
+        start = time.perf_counter()
+        result = model.transcribe(audio, language="en", fp16=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ref = normalize(reference)
+        errors += word_errors(ref, normalize(result["text"]))
+        words += len(ref)
+    return {
+        "wer": errors / max(words, 1),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "total_s": sum(latencies) / 1000,
+        "size_mb": model_size_mb(model),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest")
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 = torch default)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    clips = load_manifest(args.manifest)
+    print(f"{len(clips)} clips, model {args.model}, cpu threads {torch.get_num_threads()}\n")
+
+    fp32 = whisper.load_model(args.model, device="cpu")
+    results = {"fp32": evaluate(fp32, clips)}
+
+    int8 = quantize_model(whisper.load_model(args.model, device="cpu"))
+    results["int8"] = evaluate(int8, clips)
+
+    print(f"{'mode':>6} {'WER':>7} {'p50 ms':>9} {'p95 ms':>9} {'total s':>8} {'size MB':>8}")
+    for mode, r in results.items():
+        print(f"{mode:>6} {r['wer']:7.2%} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['total_s']:8.2f} {r['size_mb']:8.1f}")
+
+    base, quant = results["fp32"], results["int8"]
+    print(f"\nint8 speedup: {base['total_s'] / quant['total_s']:.2f}x, "
+          f"WER delta: {(quant['wer'] - base['wer']) * 100:+.2f} pts, "
+          f"size: {quant['size_mb'] / base['size_mb']:.0%} of fp32")
+
+
+if __name__ == "__main__":
+    main()
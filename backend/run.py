@@ -20,15 +20,25 @@ if __name__ == "__main__":
     Available endpoints:
     - GET  /api/health
     - GET  /api/status
+    - GET  /api/ready
     - POST /api/voice/transcribe
+    - POST /api/voice/stream
+    - POST /api/voice/stream/<session_id>/chunk
+    - POST /api/voice/stream/<session_id>/finish
     - POST /api/voice/liveness
+    - POST /api/voice/enroll
+    - POST /api/voice/verify
     - POST /api/voice/emotion
     - GET  /api/banking/balance
     - GET  /api/banking/transactions
     - POST /api/banking/transfer
     - POST /api/banking/transfer/validate
     - POST /api/risk/evaluate
+    - POST /api/risk/evaluate/batch
     - POST /api/risk/scam-check
+    - POST /api/risk/scam-check/batch
+    - POST /api/risk/phrases/reload
+    - POST /api/risk/mule-accounts/reload
     
     Press CTRL+C to quit
     """)
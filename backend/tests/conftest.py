@@ -0,0 +1,17 @@
+"""
+Shared test setup.
+
+Tests run from backend/ without the speech models: torch, whisper and
+librosa are replaced by stub modules when they are not installed, and
+tests patch the functions that would use them.
+"""
+import os
+import sys
+import importlib.util
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _name in ("torch", "whisper", "librosa"):
+    if importlib.util.find_spec(_name) is None:
+        sys.modules[_name] = MagicMock(name=_name)
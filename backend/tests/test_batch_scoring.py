@@ -0,0 +1,50 @@
+"""Tests for chunked bulk scoring."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.utils import batch_scoring
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    """Run the pool path on threads; the worker functions are the same."""
+    executor = ThreadPoolExecutor(3)
+    monkeypatch.setattr(batch_scoring, "_get_executor", lambda workers: executor)
+    yield executor
+    executor.shutdown()
+
+
+def strip(results: list) -> list:
+    return [{k: v for k, v in r.items() if k != "timestamp"} for r in results]
+
+
+def risk_lines(n: int) -> list:
+    return [
+        json.dumps({
+            "transcript": f"please share otp {i}",
+            "amount": 1000 * i,
+            "user_id": f"user_{i % 3}" if i % 2 else None,
+            "recipient_account": "1234",
+        }).encode()
+        for i in range(n)
+    ] + [b"{not json"]
+
+
+def test_pool_matches_inline_scoring_in_order(thread_pool):
+    items = risk_lines(30)
+
+    pooled = list(batch_scoring.score_batch("risk", items, workers=3, chunk_size=4))
+
+    assert [r["index"] for r in pooled] == list(range(len(items)))
+    assert strip(pooled) == strip(batch_scoring.score_batch("risk", items, workers=0))
+    assert "error" in pooled[-1]
+
+
+def test_user_item_without_state_is_an_error():
+    checksum = batch_scoring.get_phrase_dictionary().checksum
+    items = risk_lines(2)
+
+    results = batch_scoring._score_chunk("risk", 0, items[:2], checksum, None, [None, None])
+
+    assert "error" not in results[0]
+    assert results[1]["error"] == "velocity and profile state unavailable for user"
@@ -0,0 +1,48 @@
+import pytest
+
+from app.utils.fuzzy_matcher import FuzzyPhraseMatcher
+
+PHRASES = [
+    "account is blocked",
+    "share otp",
+    "kyc expired",
+    "verification from bank",
+    "update your password",
+    "click this link",
+]
+
+
+@pytest.fixture
+def matcher():
+    return FuzzyPhraseMatcher(PHRASES)
+
+
+def found(matcher, text):
+    return [m["phrase"] for m in matcher.find(text)]
+
+
+@pytest.mark.parametrize("text, phrase", [
+    ("please share o t p now", "share otp"),
+    ("just shareotp with me", "share otp"),
+    ("your acount is blocked", "account is blocked"),
+    ("your kyc expird yesterday", "kyc expired"),
+    ("click this lnk", "click this link"),
+    ("update your pasword", "update your password"),
+])
+def test_garbled_phrases_match(matcher, text, phrase):
+    assert found(matcher, text) == [phrase]
+
+
+@pytest.mark.parametrize("text", [
+    "my account is locked",
+    "please update your passport details",
+    "click this linkedin post",
+    "kyc expires next week",
+])
+def test_legitimate_sentences_do_not_match(matcher, text):
+    assert found(matcher, text) == []
+
+
+def test_exact_hits_are_excluded(matcher):
+    assert found(matcher, "share otp") == ["share otp"]
+    assert matcher.find("share otp", exclude=["share otp"]) == []
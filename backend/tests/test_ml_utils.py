@@ -0,0 +1,72 @@
+"""Tests for the text and audio analyzers in ml_utils."""
+import numpy as np
+import pytest
+from app.utils import ml_utils
+from app.utils.audio_context import AudioContext
+from app.utils.text_context import TextContext
+
+
+@pytest.fixture
+def fake_acoustic_stress(monkeypatch):
+    calls = []
+
+    def acoustic_stress(samples, word_count=None, rms=None):
+        calls.append({"samples": samples, "word_count": word_count, "rms": rms})
+        return {"score": 0.5, "speaking_rate": 3.0, "timings_ms": {"energy": 0.1, "pitch": 0.2, "rate": 0.1}}
+
+    monkeypatch.setattr(ml_utils, "acoustic_stress", acoustic_stress)
+    return calls
+
+
+def audio_context(seconds: float = 1.0) -> AudioContext:
+    audio = AudioContext(np.zeros(int(16000 * seconds), dtype=np.float32))
+    audio.derive("rms", lambda: np.full(32, 0.1, dtype=np.float32))
+    return audio
+
+
+def test_detect_emotion_with_text_and_audio_contexts(fake_acoustic_stress):
+    text = TextContext("please help me this is urgent")
+    audio = audio_context()
+
+    result = ml_utils.detect_emotion(text, audio)
+
+    assert len(fake_acoustic_stress) == 1
+    call = fake_acoustic_stress[0]
+    assert call["word_count"] == len(text.tokens)
+    assert call["samples"] is audio.samples
+    assert call["rms"] is audio.rms()
+    assert result["acoustic"]["score"] == 0.5
+    assert result["combined_score"] == pytest.approx(0.5 * result["raw_score"] + 4 * 0.5, abs=1e-3)
+    assert result["stress_level"] in ("low", "medium", "high")
+
+
+def test_detect_emotion_with_raw_samples(fake_acoustic_stress):
+    result = ml_utils.detect_emotion("hello there", np.zeros(16000, dtype=np.float32))
+
+    assert fake_acoustic_stress[0]["word_count"] == 2
+    assert "acoustic" in result
+
+
+def test_detect_emotion_without_audio_skips_acoustic_stress(fake_acoustic_stress):
+    result = ml_utils.detect_emotion("hello there")
+
+    assert fake_acoustic_stress == []
+    assert "acoustic" not in result
+
+
+def test_detect_emotion_with_empty_audio(fake_acoustic_stress):
+    result = ml_utils.detect_emotion("hello there", audio_context(0))
+
+    assert fake_acoustic_stress == []
+    assert "acoustic" not in result
+
+
+def test_detect_emotion_with_worker_acoustic_features(fake_acoustic_stress):
+    acoustic = ml_utils.measure_acoustic_stress("please help me", audio_context())
+    fake_acoustic_stress.clear()
+
+    result = ml_utils.detect_emotion("please help me", acoustic=acoustic)
+
+    assert fake_acoustic_stress == []
+    assert result["acoustic"]["score"] == 0.5
+    assert result["timings_ms"]["pitch"] == 0.2
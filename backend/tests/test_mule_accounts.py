@@ -0,0 +1,45 @@
+"""Tests for building and mapping the mule account index."""
+import os
+import numpy as np
+import pytest
+from app.utils.mule_accounts import MuleAccountIndex, build_mule_index, load_mule_index
+
+
+@pytest.fixture
+def account_file(tmp_path):
+    path = tmp_path / "mules.txt"
+    path.write_text("# reported\n1234-5678-9012\n 9999 0000 1111\n")
+    return str(path)
+
+
+def test_each_version_is_built_into_its_own_directory(account_file):
+    first = load_mule_index(account_file)
+    with open(account_file, "a") as f:
+        f.write("5555\n")
+    second = load_mule_index(account_file)
+
+    assert first.directory != second.directory
+    assert first.check("123456789012")["listed"]
+    assert not first.check("5555")["listed"]
+    assert second.check("5555")["listed"]
+    assert sorted(os.listdir(os.path.dirname(first.directory))) == sorted(
+        os.path.basename(index.directory) for index in (first, second)
+    )
+
+
+def test_mismatched_bloom_filter_is_rejected(account_file):
+    meta = build_mule_index(account_file)
+    directory = meta.pop("directory")
+    np.save(os.path.join(directory, "bloom.npy"), np.zeros(1, dtype=np.uint8))
+
+    with pytest.raises(ValueError):
+        MuleAccountIndex(directory, meta)
+
+
+def test_unwritable_index_raises(account_file, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(os, "makedirs", fail)
+    with pytest.raises(ValueError):
+        load_mule_index(account_file)
@@ -0,0 +1,48 @@
+"""Tests for loading and hot-reloading the phrase dictionary."""
+import json
+import os
+import pytest
+from app.utils import phrase_dictionary
+
+
+def write(tmp_path, data) -> str:
+    path = tmp_path / "phrases.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.mark.parametrize("data", [
+    ["share otp"],
+    {"scam": "share otp"},
+    {"scam": ["share otp", 7]},
+    {"scam": ["share otp"], "stress": {"urgent": "high"}},
+    {"scam": ["share otp"], "filler": [None]},
+])
+def test_malformed_files_raise_value_error(tmp_path, data):
+    with pytest.raises(ValueError):
+        phrase_dictionary.load_phrase_dictionary(write(tmp_path, data))
+
+
+def test_reload_keeps_the_active_version_on_a_bad_file(tmp_path, monkeypatch):
+    active = phrase_dictionary.get_phrase_dictionary()
+    monkeypatch.setattr(phrase_dictionary, "PHRASES_PATH", write(tmp_path, {"scam": [1, 2]}))
+
+    status = phrase_dictionary.reload_phrases(force=True)
+
+    assert phrase_dictionary.get_phrase_dictionary() is active
+    assert status["last_error"]
+
+
+def test_compiled_cache_is_written_to_the_cache_dir_only(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    path = write(tmp_path, {"scam": ["share otp"], "stress": {"urgent": 2}})
+    monkeypatch.setattr(phrase_dictionary, "PHRASES_CACHE_DIR", str(cache_dir))
+
+    dictionary = phrase_dictionary.load_phrase_dictionary(path)
+    assert not dictionary.from_cache
+    assert not cache_dir.exists()
+
+    phrase_dictionary._save_compiled(path, dictionary)
+    assert os.listdir(cache_dir) == ["phrases.matcher.pkl"]
+    assert sorted(os.listdir(tmp_path)) == ["cache", "phrases.json"]
+    assert phrase_dictionary.load_phrase_dictionary(path).from_cache
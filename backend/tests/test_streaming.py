@@ -0,0 +1,35 @@
+"""Tests for streaming transcription sessions."""
+import numpy as np
+import pytest
+from app.config import STREAM_WINDOW_SECONDS, STREAM_STEP_SECONDS
+from app.utils import streaming
+from app.utils.audio_io import SAMPLE_RATE
+
+STEP = int(STREAM_STEP_SECONDS * SAMPLE_RATE)
+WINDOW = int(STREAM_WINDOW_SECONDS * SAMPLE_RATE)
+
+
+@pytest.fixture
+def decoded_windows(monkeypatch):
+    """Window lengths passed to the pool, which decodes every window to no segments."""
+    windows = []
+
+    def submit_stream_window(samples, prompt=None, timeout=None):
+        windows.append(len(samples))
+        return {"segments": []}
+
+    monkeypatch.setattr(streaming, "submit_stream_window", submit_stream_window)
+    return windows
+
+
+def test_silence_does_not_grow_the_window(decoded_windows):
+    windows = decoded_windows
+    session = streaming.StreamingSession("user")
+
+    for _ in range(int(3 * STREAM_WINDOW_SECONDS / STREAM_STEP_SECONDS)):
+        session.add_chunk(np.zeros(STEP, dtype=np.float32))
+
+    assert max(windows) <= WINDOW
+    assert len(session._audio) <= WINDOW
+    assert session.text == ""
+
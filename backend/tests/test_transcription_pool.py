@@ -0,0 +1,78 @@
+"""Tests for worker pool recovery and the pool-level clip batcher."""
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pytest
+from app.utils import transcription_pool as pool
+
+
+class FakeExecutor:
+    """Executor whose jobs fail as if their worker died, or succeed."""
+
+    def __init__(self, broken: bool):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("worker died"))
+        else:
+            future.set_result({"text": "ok"})
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def executors(monkeypatch):
+    """Each new pool comes from the queue; the first one is broken."""
+    created = []
+    queue = [FakeExecutor(broken=True), FakeExecutor(broken=False)]
+
+    def get_executor():
+        if pool._executor is None:
+            pool._executor = queue.pop(0)
+            created.append(pool._executor)
+        return pool._executor
+
+    monkeypatch.setattr(pool, "TRANSCRIBE_WORKERS", 2)
+    monkeypatch.setattr(pool, "_executor", None)
+    monkeypatch.setattr(pool, "_get_executor", get_executor)
+    return created
+
+
+def test_dead_worker_fails_only_its_request(executors):
+    samples = np.zeros(1600, dtype=np.float32)
+
+    with pytest.raises(pool.TranscriptionWorkerLost):
+        pool.submit_stream_window(samples)
+
+    assert executors[0].shut_down
+    assert pool.submit_stream_window(samples)["text"] == "ok"
+    assert len(executors) == 2
+    assert pool._busy == 0
+
+
+def test_failing_clip_fails_only_its_own_future(monkeypatch):
+    def transcribe_job(audio, challenge_phrase=None):
+        if audio == "bad":
+            raise RuntimeError("decode failed")
+        return {"text": audio}
+
+    monkeypatch.setattr(pool, "_transcribe_job", transcribe_job)
+    results = pool._run_batch([("a", None), ("bad", None), ("c", None)], [0.0] * 3)
+
+    batch = [((), 0.0, Future()) for _ in results]
+    for _, _, future in batch:
+        future.set_running_or_notify_cancel()
+    job = Future()
+    job.set_result(results)
+    pool._ClipBatcher._deliver(None, batch, job)
+
+    assert batch[0][2].result()["text"] == "a"
+    assert batch[0][2].result()["timing"]["batch_size"] == 3
+    with pytest.raises(RuntimeError, match="decode failed"):
+        batch[1][2].result()
+    assert batch[2][2].result()["text"] == "c"
@@ -0,0 +1,21 @@
+"""Tests for the fraudster voice blacklist search."""
+import numpy as np
+import pytest
+from app.utils.voice_blacklist import VoiceBlacklist, build_blacklist
+
+
+@pytest.fixture
+def blacklist_path(tmp_path):
+    embeddings = np.random.default_rng(0).standard_normal((200, 256)).astype(np.float32)
+    path = str(tmp_path / "blacklist.npy")
+    build_blacklist(embeddings, [f"fraudster_{i}" for i in range(200)], path, n_clusters=8)
+    return path, embeddings
+
+
+@pytest.mark.parametrize("nprobe", [0, -1, 8, 100])
+def test_non_positive_or_large_nprobe_scans_every_row(blacklist_path, nprobe):
+    path, embeddings = blacklist_path
+    blacklist = VoiceBlacklist(path, nprobe=nprobe)
+
+    assert blacklist.search(embeddings[17], k=3) == blacklist.search(embeddings[17], k=3, exact=True)
+    assert blacklist.search(embeddings[17], k=1)[0]["id"] == "fraudster_17"
@@ -0,0 +1,62 @@
+"""Tests for persisting the voiceprint index."""
+import os
+import threading
+import numpy as np
+import pytest
+from app.utils import voiceprint
+from app.utils.voiceprint import VoiceprintIndex, EMBEDDING_DIM
+
+
+def unit(seed: int) -> np.ndarray:
+    vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "voiceprints.npz")
+
+
+def test_enrolments_are_journaled_and_replayed(path):
+    index = VoiceprintIndex.load(path)
+    index.enroll("alice", unit(1))
+    index.enroll("bob", unit(2))
+    index.enroll("alice", unit(3))
+
+    assert not os.path.exists(path)
+    reloaded = VoiceprintIndex.load(path)
+    assert len(reloaded) == 2
+    assert reloaded.score("alice", index._matrix[0]) == pytest.approx(1.0, abs=1e-5)
+    assert reloaded._samples[0] == 2
+
+
+def test_snapshot_stores_user_ids_without_pickle(path):
+    index = VoiceprintIndex.load(path)
+    index.enroll("alice", unit(1))
+    index.save(path)
+
+    assert not os.path.exists(f"{path}.log")
+    with np.load(path, allow_pickle=False) as data:
+        assert data["user_ids"].dtype.kind == "U"
+    assert "alice" in VoiceprintIndex.load(path)
+
+
+def test_journal_is_compacted_in_the_background(path, monkeypatch):
+    monkeypatch.setattr(voiceprint, "_MIN_COMPACT_RECORDS", 4)
+    index = VoiceprintIndex.load(path)
+    for i in range(4):
+        index.enroll(f"user_{i}", unit(i))
+
+    for thread in [t for t in threading.enumerate() if t.name == "voiceprint-compact"]:
+        thread.join()
+    assert os.path.exists(path)
+    assert len(VoiceprintIndex.load(path)) == 4
+
+
+def test_torn_journal_line_is_skipped(path):
+    index = VoiceprintIndex.load(path)
+    index.enroll("alice", unit(1))
+    with open(f"{path}.log", "a") as f:
+        f.write('{"user_id": "bob", "samp')
+
+    assert len(VoiceprintIndex.load(path)) == 1